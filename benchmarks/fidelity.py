@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Harness di regressione per fedeltà e throughput del round trip
+creazione -> ricostruzione.
+
+Uso (dalla root del repository):
+    python -m benchmarks.fidelity                      # corpus di casi limite + progetto sintetico
+    python -m benchmarks.fidelity percorso/progetto    # progetto esistente
+    python -m benchmarks.fidelity --output fidelity.json --min-fidelity 95
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_project import generate_fidelity_corpus, generate_project
+from core.config import MAX_LINE_WIDTH
+from core.pdf_converter import PDFConverter
+from core.project_recreator import ProjectRecreator
+
+# Numero massimo di righe differenti riportate per ciascun file
+MAX_REPORTED_LINES = 10
+
+
+def _expected_files(project_path, file_manager):
+    """
+    Restituisce i file che il convertitore dovrebbe includere nel PDF, con le stesse
+    regole della creazione (esclusioni, regole gitignore, file binari e troppo grandi)
+    """
+    return {relative_path.as_posix(): file_path
+            for file_path, relative_path in file_manager.iter_project_files(project_path)}
+
+
+def _mismatching_lines(original, rebuilt):
+    """Restituisce i numeri di riga (1-based) che differiscono tra due contenuti"""
+    original_lines = original.decode('utf-8', errors='replace').splitlines(keepends=True)
+    rebuilt_lines = rebuilt.decode('utf-8', errors='replace').splitlines(keepends=True)
+    mismatches = []
+    for index in range(max(len(original_lines), len(rebuilt_lines))):
+        left = original_lines[index] if index < len(original_lines) else None
+        right = rebuilt_lines[index] if index < len(rebuilt_lines) else None
+        if left != right:
+            mismatches.append(index + 1)
+            if len(mismatches) >= MAX_REPORTED_LINES:
+                break
+    return mismatches
+
+
+def compare_trees(expected, rebuilt_root):
+    """Confronta byte per byte i file attesi con quelli ricostruiti"""
+    identical = []
+    mismatched = {}
+    missing = []
+    total_bytes = 0
+
+    for relative, original_path in expected.items():
+        original = original_path.read_bytes()
+        total_bytes += len(original)
+        rebuilt_path = rebuilt_root / relative
+        if not rebuilt_path.is_file():
+            # I file vuoti non vengono ricostruiti: contano come mancanti
+            missing.append(relative)
+            continue
+        rebuilt = rebuilt_path.read_bytes()
+        if rebuilt == original:
+            identical.append(relative)
+        else:
+            mismatched[relative] = {
+                'original_bytes': len(original),
+                'rebuilt_bytes': len(rebuilt),
+                'lines': _mismatching_lines(original, rebuilt)
+            }
+
+    total = len(expected)
+    return {
+        'files': total,
+        'identical': len(identical),
+        'fidelity_percent': (len(identical) / total * 100) if total else 100.0,
+        'bytes': total_bytes,
+        'mismatched': mismatched,
+        'missing': missing
+    }
+
+
+def run_roundtrip_check(project_path, work_dir):
+    """
+    Esegue create_project_pdf e recreate_project_structure sul progetto
+    e restituisce fedeltà, file differenti e tempi per fase.
+    """
+    project_path = Path(project_path)
+    work_dir = Path(work_dir)
+    pdf_path = work_dir / f'{project_path.name}_Snapshot.pdf'
+    output_dir = work_dir / 'ricostruito'
+
+    converter = PDFConverter()
+    recreator = ProjectRecreator()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        converter.create_project_pdf(project_path, pdf_path, open_after_creation=False, profile=True)
+        create_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rebuilt_root = recreator.recreate_project_structure(pdf_path, output_dir, profile=True, use_cache=False)
+        recreate_seconds = time.perf_counter() - start
+
+    expected = _expected_files(project_path, converter.file_manager)
+    if rebuilt_root:
+        result = compare_trees(expected, Path(rebuilt_root))
+    else:
+        result = compare_trees(expected, output_dir / '__ricostruzione_fallita__')
+
+    total_seconds = create_seconds + recreate_seconds
+    result['timings'] = {
+        'create_seconds': create_seconds,
+        'recreate_seconds': recreate_seconds,
+        'total_seconds': total_seconds,
+        'create_phases': converter.instrumentation.as_dict()['spans'],
+        'recreate_phases': recreator.instrumentation.as_dict()['spans']
+    }
+    result['throughput_mb_s'] = (result['bytes'] / (1024 * 1024) / total_seconds) if total_seconds else 0.0
+    result['pdf_bytes'] = pdf_path.stat().st_size
+    return result
+
+
+def print_result(name, result):
+    """Stampa il risultato di un controllo"""
+    print(f"\n📁 {name}")
+    print(f"   🎯 Fedeltà: {result['fidelity_percent']:.1f}% "
+          f"({result['identical']}/{result['files']} file identici)")
+    timings = result['timings']
+    print(f"   ⏱️  Creazione {timings['create_seconds']:.3f}s, "
+          f"ricostruzione {timings['recreate_seconds']:.3f}s, "
+          f"{result['throughput_mb_s']:.2f} MB/s")
+    for side in ('create', 'recreate'):
+        for phase, data in timings[f'{side}_phases'].items():
+            print(f"      - {side}.{phase}: {data['seconds']:.3f}s")
+    for relative, details in sorted(result['mismatched'].items()):
+        print(f"   ❌ {relative}: righe {details['lines']} "
+              f"({details['original_bytes']} -> {details['rebuilt_bytes']} byte)")
+    for relative in result['missing']:
+        print(f"   ⚠️  Mancante: {relative}")
+
+
+def main(argv=None):
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description='Controllo fedeltà round trip PySyncroNet')
+    parser.add_argument('projects', nargs='*', help='Cartelle di progetto da verificare')
+    parser.add_argument('--synthetic-files', type=int, default=50,
+                        help='File del progetto sintetico (senza progetti espliciti)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='File JSON in cui salvare i risultati')
+    parser.add_argument('--min-fidelity', type=float,
+                        help='Esce con errore se la fedeltà è inferiore (percentuale)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='syncronet_fidelity_') as temp_dir:
+        temp_dir = Path(temp_dir)
+        projects = [Path(p) for p in args.projects]
+
+        if not projects:
+            corpus_path = temp_dir / 'corpus' / 'fidelity_corpus'
+            generate_fidelity_corpus(corpus_path, MAX_LINE_WIDTH)
+            synthetic_path = temp_dir / 'corpus' / 'synthetic_project'
+            generate_project(synthetic_path, file_count=args.synthetic_files, seed=args.seed,
+                             emoji_ratio=0.01, line_length=(10, 2 * MAX_LINE_WIDTH))
+            projects = [corpus_path, synthetic_path]
+
+        for index, project_path in enumerate(projects):
+            work_dir = temp_dir / f'run_{index}'
+            work_dir.mkdir()
+            result = run_roundtrip_check(project_path, work_dir)
+            results[str(project_path.name)] = result
+            print_result(project_path.name, result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Risultati salvati in: {args.output}")
+
+    if args.min_fidelity is not None:
+        worst = min(result['fidelity_percent'] for result in results.values())
+        if worst < args.min_fidelity:
+            print(f"\n❌ Fedeltà {worst:.1f}% inferiore alla soglia {args.min_fidelity:.1f}%")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
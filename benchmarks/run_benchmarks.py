@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Suite di benchmark per i percorsi di creazione e ricostruzione.
+
+Uso (dalla root del repository):
+    python -m benchmarks.run_benchmarks --files 200 --output benchmarks/results/base.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/base.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.synthetic_project import generate_project
+from core.file_manager import FileManager
+from core.pdf_converter import PDFConverter
+from core.project_recreator import ProjectRecreator
+from core.snapshot_cache import SnapshotCache
+
+
+def _git_commit():
+    """Restituisce il commit corrente del repository, se disponibile"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _measure(func, repeat):
+    """Esegue func più volte in silenzio e restituisce i tempi in secondi"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def _summary(timings, **extra):
+    """Riassume una serie di misure"""
+    summary = {
+        'best': min(timings),
+        'mean': statistics.mean(timings),
+        'runs': timings
+    }
+    summary.update(extra)
+    return summary
+
+
+def bench_walk(project_path, repeat):
+    """Misura il walk del FileManager con le esclusioni di default"""
+    file_manager = FileManager()
+    timings, count = _measure(lambda: file_manager.count_project_files(project_path), repeat)
+    return _summary(timings, files=count)
+
+
+def bench_encode(project_path, repeat):
+    """Misura _encode_all_unicode_chars sul testo di tutti i file del progetto"""
+    converter = PDFConverter()
+    texts = [p.read_text(encoding='utf-8') for p in sorted(Path(project_path).rglob('file_*'))]
+    chars = sum(len(t) for t in texts)
+
+    def run():
+        for text in texts:
+            converter._encode_all_unicode_chars(text)
+
+    timings, _ = _measure(run, repeat)
+    return _summary(timings, chars=chars)
+
+
+def bench_add_file(project_path, repeat):
+    """Misura _add_file_to_pdf (lettura, pulizia e layout FPDF) senza output"""
+    project_path = Path(project_path)
+    files = sorted(project_path.rglob('file_*'))
+
+    def run():
+        converter = PDFConverter()
+        converter.pdf.add_page()
+        for file_path in files:
+            converter._add_file_to_pdf(file_path, file_path.relative_to(project_path))
+        return converter.pdf.page
+
+    timings, pages = _measure(run, repeat)
+    return _summary(timings, files=len(files), pages=pages)
+
+
+def bench_create(project_path, pdf_path, repeat):
+    """Misura create_project_pdf completo, incluso output()"""
+    converter = PDFConverter()
+    timings, result = _measure(
+        lambda: converter.create_project_pdf(project_path, pdf_path, open_after_creation=False),
+        repeat
+    )
+    return _summary(timings, files=result[0], pdf_bytes=Path(pdf_path).stat().st_size)
+
+
+def bench_extract(pdf_path, repeat):
+    """Misura extract_pdf_content"""
+    timings, text = _measure(lambda: ProjectRecreator().extract_pdf_content(pdf_path), repeat)
+    return _summary(timings, chars=len(text or '')), text
+
+
+def bench_parse(pdf_text, repeat):
+    """Misura parse_files_from_pdf sul testo già estratto"""
+    timings, files_data = _measure(lambda: ProjectRecreator().parse_files_from_pdf(pdf_text), repeat)
+    return _summary(timings, files=len(files_data))
+
+
+def bench_warm_restore(pdf_path, work_dir, repeat):
+    """Misura load_snapshot con la cache degli snapshot già popolata"""
+    recreator = ProjectRecreator()
+    recreator.snapshot_cache = SnapshotCache(Path(work_dir) / 'snapshots')
+    recreator.load_snapshot(pdf_path)
+
+    def run():
+        files_data, _ = recreator.load_snapshot(pdf_path)
+        total = sum(len(content) for content in files_data.values())
+        files_data.close()
+        return total
+
+    timings, chars = _measure(run, repeat)
+    return _summary(timings, chars=chars)
+
+
+def bench_roundtrip(project_path, work_dir, repeat):
+    """Misura il ciclo completo creazione -> ricostruzione"""
+    pdf_path = Path(work_dir) / 'roundtrip_Snapshot.pdf'
+    output_dir = Path(work_dir) / 'roundtrip_output'
+
+    def run():
+        PDFConverter().create_project_pdf(project_path, pdf_path, open_after_creation=False)
+        return ProjectRecreator().recreate_project_structure(pdf_path, output_dir, use_cache=False)
+
+    timings, _ = _measure(run, repeat)
+    return _summary(timings)
+
+
+def run_suite(args):
+    """Genera il progetto sintetico ed esegue tutti i benchmark"""
+    with tempfile.TemporaryDirectory(prefix='syncronet_bench_') as work_dir:
+        work_dir = Path(work_dir)
+        project_path = work_dir / 'bench_project'
+        project_info = generate_project(
+            project_path,
+            file_count=args.files,
+            seed=args.seed,
+            size_distribution=args.size_distribution,
+            mean_lines=args.mean_lines,
+            line_length=(args.min_line_length, args.max_line_length),
+            non_ascii_ratio=args.non_ascii_ratio,
+            emoji_ratio=args.emoji_ratio,
+            max_depth=args.max_depth,
+            noise_files_per_dir=args.noise_files
+        )
+        print(f"📁 Progetto sintetico: {project_info['files']} file, "
+              f"{project_info['bytes'] / 1024:.1f} KB, {project_info['noise_files']} file di rumore")
+
+        pdf_path = work_dir / 'bench_Snapshot.pdf'
+        results = {}
+        results['file_manager_walk'] = bench_walk(project_path, args.repeat)
+        results['encode_all_unicode_chars'] = bench_encode(project_path, args.repeat)
+        results['add_file_to_pdf'] = bench_add_file(project_path, args.repeat)
+        results['create_project_pdf'] = bench_create(project_path, pdf_path, args.repeat)
+        results['extract_pdf_content'], pdf_text = bench_extract(pdf_path, args.repeat)
+        results['parse_files_from_pdf'] = bench_parse(pdf_text, args.repeat)
+        results['warm_restore'] = bench_warm_restore(pdf_path, work_dir, args.repeat)
+        results['roundtrip'] = bench_roundtrip(project_path, work_dir, args.repeat)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args).copy(),
+            'project': project_info
+        },
+        'results': results
+    }
+
+
+def compare_results(current, baseline):
+    """Stampa il confronto tra due esecuzioni (tempo migliore)"""
+    print(f"\n📊 Confronto con commit {baseline['meta'].get('commit')}:")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old:
+            print(f"  {name:28s} {result['best']:.4f}s (nuovo)")
+            continue
+        delta = (result['best'] - old['best']) / old['best'] * 100 if old['best'] else 0.0
+        print(f"  {name:28s} {old['best']:.4f}s -> {result['best']:.4f}s ({delta:+.1f}%)")
+
+
+def main(argv=None):
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description='Benchmark PySyncroNet')
+    parser.add_argument('--files', type=int, default=100, help='Numero di file da generare')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--size-distribution', default='lognormal',
+                        choices=['fixed', 'uniform', 'lognormal', 'pareto'])
+    parser.add_argument('--mean-lines', type=int, default=60)
+    parser.add_argument('--min-line-length', type=int, default=10)
+    parser.add_argument('--max-line-length', type=int, default=120)
+    parser.add_argument('--non-ascii-ratio', type=float, default=0.02)
+    parser.add_argument('--emoji-ratio', type=float, default=0.005)
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--noise-files', type=int, default=10,
+                        help='File per ogni cartella esclusa di rumore')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='File JSON in cui salvare i risultati')
+    parser.add_argument('--compare', help='File JSON di una esecuzione precedente')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args)
+
+    for name, result in results['results'].items():
+        print(f"⏱️  {name:28s} best {result['best']:.4f}s  mean {result['mean']:.4f}s")
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Risultati salvati in: {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(results, json.load(f))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Generatore deterministico di progetti sintetici per i benchmark
+"""
+
+import random
+from pathlib import Path
+
+# Token ASCII usati per comporre righe simili a codice sorgente
+ASCII_TOKENS = [
+    'def', 'class', 'return', 'import', 'self', 'value', 'result', 'data',
+    'for', 'in', 'if', 'else:', 'None', 'True', 'False', '=', '+', '==',
+    '(', ')', '[', ']', '{', '}', ',', ':', 'print', 'config', 'path',
+    '"testo"', "'chiave'", '0', '1', '42', '# commento', 'lambda', 'x', 'y'
+]
+
+# Caratteri non ASCII (latin-1 e oltre) e emoji, mappate e non mappate
+NON_ASCII_CHARS = ['à', 'è', 'é', 'ì', 'ò', 'ù', 'ç', 'ñ', 'ß', '€', '°', '±']
+EMOJI_CHARS = ['🚀', '📁', '📄', '🔧', '💾', '🌐', '✨', '✅', '❌', '😀', '🎉', '🧪']
+
+FILE_EXTENSIONS = ['.py', '.js', '.md', '.txt', '.json', '.html', '.css', '.java']
+
+# Cartelle escluse di default usate come rumore nel progetto
+DEFAULT_NOISE_DIRS = ('node_modules', '__pycache__', '.git', 'build', 'venv')
+
+
+def _sample_line_count(rng, size_distribution, mean_lines):
+    """Estrae il numero di righe di un file secondo la distribuzione richiesta"""
+    if size_distribution == 'fixed':
+        return mean_lines
+    if size_distribution == 'uniform':
+        return rng.randint(1, max(1, mean_lines * 2))
+    if size_distribution == 'pareto':
+        # Coda lunga: pochi file molto grandi
+        return max(1, int(mean_lines * (rng.paretovariate(2.0) - 0.5)))
+    # Default: lognormale con mediana circa pari a mean_lines
+    return max(1, int(rng.lognormvariate(0, 0.8) * mean_lines))
+
+
+def _generate_line(rng, min_length, max_length, non_ascii_ratio, emoji_ratio):
+    """Genera una singola riga con indentazione e caratteri speciali"""
+    target_length = rng.randint(min_length, max_length)
+    indent = ' ' * (4 * rng.randint(0, 3))
+    parts = [indent]
+    length = len(indent)
+
+    while length < target_length:
+        roll = rng.random()
+        if roll < emoji_ratio:
+            token = rng.choice(EMOJI_CHARS)
+        elif roll < emoji_ratio + non_ascii_ratio:
+            token = rng.choice(NON_ASCII_CHARS)
+        else:
+            token = rng.choice(ASCII_TOKENS)
+        parts.append(token + ' ')
+        length += len(token) + 1
+
+    return ''.join(parts).rstrip()
+
+
+def _generate_file_content(rng, line_count, line_length, non_ascii_ratio, emoji_ratio):
+    """Genera il contenuto completo di un file"""
+    min_length, max_length = line_length
+    lines = []
+    for _ in range(line_count):
+        # Circa una riga su otto è vuota, come nel codice reale
+        if rng.random() < 0.125:
+            lines.append('')
+        else:
+            lines.append(_generate_line(rng, min_length, max_length, non_ascii_ratio, emoji_ratio))
+    return '\n'.join(lines) + '\n'
+
+
+def _random_directory(rng, root, max_depth):
+    """Restituisce una sottocartella casuale entro la profondità massima"""
+    depth = rng.randint(0, max_depth)
+    parts = [f'pkg_{rng.randint(0, 3)}' for _ in range(depth)]
+    return root.joinpath(*parts)
+
+
+def generate_project(root, file_count=100, seed=42, size_distribution='lognormal',
+                     mean_lines=60, line_length=(10, 120), non_ascii_ratio=0.02,
+                     emoji_ratio=0.005, max_depth=3, noise_dirs=DEFAULT_NOISE_DIRS,
+                     noise_files_per_dir=10):
+    """
+    Genera un progetto sintetico deterministico nella cartella root.
+    A parità di parametri e seed il contenuto generato è identico byte per byte.
+    Restituisce un dizionario con le statistiche del progetto generato.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    total_bytes = 0
+    total_lines = 0
+
+    for index in range(file_count):
+        directory = _random_directory(rng, root, max_depth)
+        directory.mkdir(parents=True, exist_ok=True)
+        extension = rng.choice(FILE_EXTENSIONS)
+        line_count = _sample_line_count(rng, size_distribution, mean_lines)
+        content = _generate_file_content(rng, line_count, line_length, non_ascii_ratio, emoji_ratio)
+
+        data = content.encode('utf-8')
+        (directory / f'file_{index:05d}{extension}').write_bytes(data)
+        total_bytes += len(data)
+        total_lines += line_count
+
+    # Rumore: cartelle escluse che il walk deve attraversare o scartare
+    noise_files = 0
+    for noise_dir in noise_dirs:
+        directory = _random_directory(rng, root, max(0, max_depth - 1)) / noise_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        for index in range(noise_files_per_dir):
+            content = _generate_file_content(rng, 20, line_length, 0, 0)
+            (directory / f'noise_{index:04d}.js').write_text(content, encoding='utf-8')
+            noise_files += 1
+
+    return {
+        'root': str(root),
+        'files': file_count,
+        'noise_files': noise_files,
+        'bytes': total_bytes,
+        'lines': total_lines
+    }
+
+
+def generate_fidelity_corpus(root, max_line_width=100):
+    """
+    Genera un corpus di casi limite per il controllo di fedeltà del round trip:
+    righe più lunghe di MAX_LINE_WIDTH, tab, CRLF, emoji, caratteri non-BMP
+    e righe che assomigliano alla struttura del PDF.
+    Restituisce la lista dei percorsi relativi generati.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    long_word = 'x' * (max_line_width * 3 + 7)
+    long_sentence = ' '.join(f'parola{i}' for i in range(max_line_width // 2))
+
+    cases = {
+        'long_lines.py': (
+            f'VALUE = "{long_word}"\n'
+            f'text = "{long_sentence}"\n'
+            f'call(argomento_molto_lungo_{"_" * max_line_width}, altro)\n'
+            f'{"a" * (max_line_width - 1)}_{"b" * max_line_width}\n'
+        ),
+        'exact_width.txt': f'{"c" * max_line_width}\n{"d" * (max_line_width + 1)}\n',
+        'tabs.py': 'def f():\n\tif True:\n\t\treturn "\tin stringa"\n\n\t    misto\n',
+        'crlf.txt': 'prima riga\r\nseconda riga\r\n\r\nultima\r\n',
+        'emoji.md': '# Titolo 🚀\n\n- ✅ fatto\n- ❌ non fatto\n- 📁 cartella 💾\n- 🎉 festa\n',
+        'non_bmp.txt': 'Emoticon 😀 e matematica 𝔘𝔫𝔦𝔠𝔬𝔡𝔢\nCJK esteso 𠀀 fine\n',
+        'latin.txt': 'Perché così è più già\nEuro € e grado °\n',
+        'trailing_spaces.txt': 'spazi finali   \nriga normale\n    \n',
+        'no_final_newline.txt': 'nessun a capo finale',
+        'pdf_like.txt': 'File: finto.py\n  12|non è un numero di riga\nProgetto: finto\n',
+        'nested/deep/module.py': 'import os\n\n\nclass A:\n    pass\n',
+    }
+
+    for relative, content in cases.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content.encode('utf-8'))
+
+    return sorted(cases)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+PySyncroNet - Interfaccia a riga di comando
+Esegue creazione e ricostruzione senza interfaccia grafica
+"""
+
+import argparse
+import sys
+
+from core.config import (BATCH_TIMEOUT, BATCH_WORKERS, METRICS_PORT, MINIFIED_POLICIES, RENDER_WORKER_KEY_ENV,
+                         RENDER_WORKER_PORT, SERVICE_PORT, SERVICE_QUEUE_SIZE, SERVICE_WORKERS, WATCH_DEBOUNCE,
+                         WATCH_FULL_SCAN_INTERVAL, WATCH_MAX_DELTAS, WATCH_POLL_INTERVAL)
+from core.instrumentation import CAPTURE_MODES
+from core.integrity import VERIFY_WORKERS
+from core.output_sinks import OUTPUT_FORMATS
+
+
+def _cmd_create(args):
+    """Crea il PDF di un progetto"""
+    from core.pdf_converter import PDFConverter
+
+    converter = PDFConverter()
+    files_processed, pdf_path = converter.create_project_pdf(
+        args.project,
+        args.output,
+        open_after_creation=False,
+        profile=args.profile,
+        profile_capture=args.capture,
+        max_file_size=args.max_file_size,
+        minified_policy=args.minified,
+        workers=args.workers,
+        source='git' if args.git else 'directory',
+        revision=args.revision,
+        remote_workers=args.remote_workers.split(',') if args.remote_workers else None
+    )
+    print(f"✅ PDF creato: {pdf_path} ({files_processed} file)")
+    if converter.instrumentation.enabled:
+        print(converter.instrumentation.summary())
+    return 0
+
+
+def _cmd_plan(args):
+    """Stima pagine, dimensione e durata della creazione senza creare il PDF"""
+    import json
+    from core.pdf_converter import PDFConverter
+    from core.planner import exclusion_pattern
+
+    exclusions = {'patterns': [exclusion_pattern(path.rstrip('/'), path.endswith('/'))
+                               for path in args.exclude or []]}
+    plan = PDFConverter().plan_project_pdf(args.project, exclusions, max_file_size=args.max_file_size,
+                                           minified_policy=args.minified)
+    if args.json:
+        print(json.dumps(plan.as_dict(), indent=2, ensure_ascii=False))
+    else:
+        print(plan.summary(args.top))
+    return 0
+
+
+def _cmd_delta(args):
+    """Crea un PDF delta rispetto a uno snapshot precedente"""
+    from core.pdf_converter import PDFConverter
+
+    files_processed, pdf_path = PDFConverter().create_delta_pdf(args.base, args.project, args.output)
+    print(f"✅ Delta creato: {pdf_path} ({files_processed} file)")
+    return 0
+
+
+def _cmd_watch(args):
+    """Tiene aggiornato lo snapshot del progetto finché non viene interrotto (Ctrl+C)"""
+    from core.watcher import ProjectWatcher
+
+    watcher = ProjectWatcher(args.project, args.output, interval=args.interval, debounce=args.debounce,
+                             max_deltas=args.max_deltas, full_scan_interval=args.full_scan_interval)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        print(f"⏹️ Watch interrotto: catena in {watcher.output_dir} ({len(watcher.chain)} PDF)")
+    return 0
+
+
+def _cmd_batch(args):
+    """Crea i PDF di molti progetti in processi separati"""
+    from core.batch import BatchJob, BatchRunner, STATUS_OK, discover_projects, load_batch_file
+
+    jobs = load_batch_file(args.config) if args.config else []
+    for parent in args.discover or []:
+        jobs.extend(BatchJob(path, timeout=args.timeout) for path in discover_projects(parent))
+    jobs.extend(BatchJob(path, timeout=args.timeout) for path in args.projects)
+    if not jobs:
+        print("❌ Nessun progetto da convertire")
+        return 2
+    results = BatchRunner(args.output, workers=args.workers).run(jobs)
+    return 0 if all(result['status'] == STATUS_OK for result in results) else 1
+
+
+def _cmd_serve(args):
+    """Avvia il servizio HTTP locale di creazione e ricostruzione"""
+    from core.service import SnapshotService
+
+    service = SnapshotService(port=args.port, workers=args.workers, queue_size=args.queue_size)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("⏹️ Servizio fermato")
+    return 0
+
+
+def _cmd_worker(args):
+    """Avvia un worker di impaginazione per la creazione distribuita"""
+    from core.distributed import parse_address, serve_render_worker
+
+    try:
+        serve_render_worker(parse_address(args.listen))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("⏹️ Worker fermato")
+    return 0
+
+
+def _cmd_recreate(args):
+    """Ricostruisce un progetto da un PDF o da una catena base + delta"""
+    from core.project_recreator import ProjectRecreator
+
+    recreator = ProjectRecreator()
+    output_path = recreator.recreate_project_structure(
+        args.pdf if len(args.pdf) > 1 else args.pdf[0],
+        args.output,
+        profile=args.profile,
+        profile_capture=args.capture,
+        output_format=args.format,
+        use_cache=not args.no_cache,
+        resume=args.resume
+    )
+    if not output_path:
+        return 1
+    if recreator.instrumentation.enabled:
+        print(recreator.instrumentation.summary())
+    return 0
+
+
+def _cmd_verify(args):
+    """Verifica una cartella esistente con il manifest di integrità del PDF"""
+    from core.project_recreator import ProjectRecreator
+
+    verification = ProjectRecreator().verify_project(args.pdf, args.directory, workers=args.workers)
+    if verification is None:
+        return 2
+    print("✅ Verifica superata" if verification.ok else "❌ Verifica non superata")
+    return 0 if verification.ok else 1
+
+
+def _cmd_cache(args):
+    """Mostra o svuota la cache degli snapshot analizzati"""
+    from core.snapshot_cache import SnapshotCache
+
+    cache = SnapshotCache()
+    if args.purge:
+        removed, freed = cache.purge()
+        print(f"🗑️ Cache svuotata: {removed} snapshot, {freed / 1024 / 1024:.1f} MB liberati")
+    else:
+        count, size = cache.stats()
+        print(f"📦 Cache snapshot: {count} voci, {size / 1024 / 1024:.1f} MB "
+              f"(limite {cache.max_bytes / 1024 / 1024:.0f} MB) in {cache.cache_dir}")
+    return 0
+
+
+def _add_profile_arguments(parser):
+    """Aggiunge le opzioni di profilazione comuni"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Raccoglie tempi per fase e contatori e li scrive nel report')
+    parser.add_argument('--capture', choices=CAPTURE_MODES,
+                        help='Salva un dump cProfile/tracemalloc accanto all\'output')
+
+
+def _add_metrics_argument(parser):
+    """Aggiunge l'endpoint locale delle metriche per i comandi di lunga durata"""
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=METRICS_PORT, metavar='PORTA',
+                        help=f'Espone /metrics su 127.0.0.1 (porta predefinita {METRICS_PORT})')
+
+
+def build_parser():
+    """Costruisce il parser degli argomenti"""
+    parser = argparse.ArgumentParser(prog='pysyncronet', description='PySyncroNet da riga di comando')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help='Crea un PDF da un progetto')
+    create_parser.add_argument('project', help='Cartella del progetto o archivio zip/tar(.gz/.xz/.bz2)')
+    create_parser.add_argument('-o', '--output', help='PDF di output (default: saved/<progetto>_Snapshot.pdf)')
+    create_parser.add_argument('--max-file-size', type=int,
+                               help='Dimensione massima (byte) dei file di testo inclusi (default: nessun limite)')
+    create_parser.add_argument('-j', '--workers', type=int, default=1,
+                               help='Processi per l\'impaginazione parallela (default: 1)')
+    create_parser.add_argument('--git', action='store_true',
+                               help='Include solo i file tracciati dall\'indice git (git ls-files)')
+    create_parser.add_argument('--revision', metavar='REV',
+                               help='Snapshot di un commit o tag git, senza checkout')
+    create_parser.add_argument('--remote-workers', metavar='HOST:PORTA,...',
+                               help='Impagina su worker avviati con "worker", anche su altri host')
+    create_parser.add_argument('--minified', choices=MINIFIED_POLICIES,
+                               help='Gestione dei file minificati: layout compatto, troncamento o esclusione')
+    _add_profile_arguments(create_parser)
+    create_parser.set_defaults(func=_cmd_create)
+
+    plan_parser = subparsers.add_parser('plan', help='Stima pagine, dimensione e durata prima di creare il PDF')
+    plan_parser.add_argument('project', help='Cartella del progetto')
+    plan_parser.add_argument('--exclude', action='append', metavar='PERCORSO',
+                             help='Esclude un file o una cartella (con / finale) del progetto (ripetibile)')
+    plan_parser.add_argument('--max-file-size', type=int,
+                             help='Dimensione massima (byte) dei file di testo inclusi (default: nessun limite)')
+    plan_parser.add_argument('--minified', choices=MINIFIED_POLICIES,
+                             help='Gestione dei file minificati: layout compatto, troncamento o esclusione')
+    plan_parser.add_argument('--top', type=int, default=10, help='File e cartelle più pesanti da elencare')
+    plan_parser.add_argument('--json', action='store_true', help='Stampa la stima in JSON')
+    plan_parser.set_defaults(func=_cmd_plan)
+
+    delta_parser = subparsers.add_parser('delta', help='Crea un PDF con i soli file cambiati dalla base')
+    delta_parser.add_argument('project', help='Cartella del progetto')
+    delta_parser.add_argument('--base', required=True,
+                              help='PDF base (completo o delta) o file .json con il manifest')
+    delta_parser.add_argument('-o', '--output', help='PDF di output (default: saved/<progetto>_Delta_<data>.pdf)')
+    delta_parser.set_defaults(func=_cmd_delta)
+
+    batch_parser = subparsers.add_parser('batch', help='Crea i PDF di molti progetti in parallelo')
+    batch_parser.add_argument('projects', nargs='*', help='Cartelle o archivi dei progetti')
+    batch_parser.add_argument('--discover', action='append', metavar='CARTELLA',
+                              help='Converte ogni sottocartella o archivio della cartella (ripetibile)')
+    batch_parser.add_argument('--config', help='File JSON con progetti, esclusioni e timeout per progetto')
+    batch_parser.add_argument('-o', '--output', help='Cartella dei PDF e del riepilogo (default: saved/batch_<data>)')
+    batch_parser.add_argument('-j', '--workers', type=int, default=BATCH_WORKERS,
+                              help=f'Progetti convertiti in parallelo (default: {BATCH_WORKERS})')
+    batch_parser.add_argument('--timeout', type=float, default=BATCH_TIMEOUT,
+                              help=f'Secondi massimi per progetto (default: {BATCH_TIMEOUT})')
+    _add_metrics_argument(batch_parser)
+    batch_parser.set_defaults(func=_cmd_batch)
+
+    worker_parser = subparsers.add_parser('worker', help='Worker di impaginazione per create --remote-workers')
+    worker_parser.add_argument('--listen', default=f'127.0.0.1:{RENDER_WORKER_PORT}', metavar='HOST:PORTA',
+                               help=f'Indirizzo di ascolto (default: 127.0.0.1:{RENDER_WORKER_PORT}); '
+                                    f'chiave condivisa in {RENDER_WORKER_KEY_ENV}')
+    worker_parser.set_defaults(func=_cmd_worker)
+
+    serve_parser = subparsers.add_parser('serve', help='Servizio HTTP locale con coda di job')
+    serve_parser.add_argument('--port', type=int, default=SERVICE_PORT,
+                              help=f'Porta su 127.0.0.1 (default: {SERVICE_PORT})')
+    serve_parser.add_argument('-j', '--workers', type=int, default=SERVICE_WORKERS,
+                              help=f'Job eseguiti in parallelo (default: {SERVICE_WORKERS})')
+    serve_parser.add_argument('--queue-size', type=int, default=SERVICE_QUEUE_SIZE,
+                              help=f'Job in coda oltre i quali si risponde 429 (default: {SERVICE_QUEUE_SIZE})')
+    serve_parser.set_defaults(func=_cmd_serve)
+
+    watch_parser = subparsers.add_parser('watch', help='Tiene aggiornato lo snapshot mentre il progetto cambia')
+    watch_parser.add_argument('project', help='Cartella del progetto')
+    watch_parser.add_argument('-o', '--output', help='Cartella della catena di PDF (default: saved/<progetto>_Watch)')
+    watch_parser.add_argument('--interval', type=float, default=WATCH_POLL_INTERVAL,
+                              help=f'Secondi tra due controlli (default: {WATCH_POLL_INTERVAL})')
+    watch_parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                              help=f'Secondi senza modifiche prima di aggiornare (default: {WATCH_DEBOUNCE})')
+    watch_parser.add_argument('--max-deltas', type=int, default=WATCH_MAX_DELTAS,
+                              help=f'Delta prima di un nuovo snapshot completo (default: {WATCH_MAX_DELTAS})')
+    watch_parser.add_argument('--full-scan-interval', type=float, default=WATCH_FULL_SCAN_INTERVAL,
+                              help=f'Secondi tra due controlli completi di tutti i file '
+                                   f'(default: {WATCH_FULL_SCAN_INTERVAL})')
+    _add_metrics_argument(watch_parser)
+    watch_parser.set_defaults(func=_cmd_watch)
+
+    recreate_parser = subparsers.add_parser('recreate', help='Ricostruisce un progetto da un PDF')
+    recreate_parser.add_argument('pdf', nargs='+',
+                                 help='PDF generato da SyncroNet, oppure snapshot completo seguito dai delta')
+    recreate_parser.add_argument('output', help='Cartella di output (o percorso dell\'archivio)')
+    recreate_parser.add_argument('--format', choices=[f for f in OUTPUT_FORMATS if f != 'memory'],
+                                 default='directory',
+                                 help='Scrive una cartella (default) o direttamente un archivio zip/tar')
+    recreate_parser.add_argument('--resume', action='store_true',
+                                 help='Riprende una ricostruzione interrotta saltando i file già scritti')
+    recreate_parser.add_argument('--no-cache', action='store_true',
+                                 help='Rianalizza il PDF senza usare la cache degli snapshot')
+    _add_profile_arguments(recreate_parser)
+    recreate_parser.set_defaults(func=_cmd_recreate)
+
+    verify_parser = subparsers.add_parser('verify', help='Verifica una cartella con il manifest del PDF')
+    verify_parser.add_argument('pdf', help='PDF generato da SyncroNet')
+    verify_parser.add_argument('directory', help='Cartella del progetto da verificare')
+    verify_parser.add_argument('-j', '--workers', type=int, default=VERIFY_WORKERS,
+                               help=f'Thread di hashing (default: {VERIFY_WORKERS})')
+    verify_parser.set_defaults(func=_cmd_verify)
+
+    cache_parser = subparsers.add_parser('cache', help='Cache degli snapshot già analizzati')
+    cache_parser.add_argument('--purge', action='store_true', help='Svuota la cache')
+    cache_parser.set_defaults(func=_cmd_cache)
+
+    return parser
+
+
+def main(argv=None):
+    """Punto di ingresso da riga di comando"""
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'metrics_port', None) is not None:
+        from core.metrics import start_metrics_server
+        start_metrics_server(args.metrics_port)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Modulo per la creazione in batch degli snapshot di molti progetti: ogni progetto
+gira in un processo separato con profilo di esclusioni e timeout propri, quindi un
+errore o un blocco non interrompe gli altri
+"""
+
+import datetime
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from pathlib import Path
+from core.config import BATCH_TIMEOUT, BATCH_WORKERS, DEFAULT_EXCLUSIONS
+from core.integrity import MANIFEST_KEY
+from core.journal import atomic_write_text
+from core.metrics import REGISTRY, write_metrics_file
+from core.sources import is_archive, project_name
+
+# Esiti dei progetti
+STATUS_OK = 'ok'
+STATUS_ERROR = 'errore'
+STATUS_TIMEOUT = 'timeout'
+
+# Secondi di attesa dei risultati tra due controlli dei timeout
+_POLL_INTERVAL = 0.5
+
+
+class BatchJob:
+    """Progetto da convertire con il suo profilo"""
+
+    def __init__(self, path, exclusions=None, timeout=BATCH_TIMEOUT, options=None, name=None):
+        self.path = str(path)
+        self.name = name or project_name(path)
+        # Esclusioni personalizzate {'dirs', 'files', 'extensions'}, come in create_project_pdf
+        self.exclusions = exclusions
+        # Secondi massimi per il progetto (None: nessun limite)
+        self.timeout = timeout
+        # Altre opzioni di create_project_pdf (max_file_size, minified_policy, source, ...)
+        self.options = options or {}
+
+
+def discover_projects(parent):
+    """Sottocartelle e archivi zip/tar di parent in ordine di nome, senza cartelle nascoste o escluse"""
+    projects = []
+    for child in sorted(Path(parent).iterdir()):
+        if child.name.startswith('.') or child.name in DEFAULT_EXCLUSIONS['dirs']:
+            continue
+        if child.is_dir() or is_archive(child):
+            projects.append(child)
+    return projects
+
+
+def load_batch_file(batch_file):
+    """
+    Legge un file JSON di batch e restituisce la lista di BatchJob:
+    {"defaults": {"timeout": 600, "exclusions": {...}, "options": {...}},
+     "discover": ["cartella con i progetti", ...],
+     "projects": ["percorso", {"path": "percorso", "timeout": 60, "exclusions": {...}}, ...]}
+    I valori di un progetto sostituiscono quelli di defaults; le opzioni vengono unite.
+    """
+    with open(batch_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    base_dir = Path(batch_file).parent
+    defaults = config.get('defaults', {})
+
+    def make_job(spec):
+        if isinstance(spec, str):
+            spec = {'path': spec}
+        path = Path(spec['path'])
+        return BatchJob(
+            path if path.is_absolute() else base_dir / path,
+            exclusions=spec.get('exclusions', defaults.get('exclusions')),
+            timeout=spec.get('timeout', defaults.get('timeout', BATCH_TIMEOUT)),
+            options={**defaults.get('options', {}), **spec.get('options', {})},
+            name=spec.get('name')
+        )
+
+    jobs = []
+    for parent in config.get('discover', []):
+        parent = Path(parent)
+        jobs.extend(make_job({'path': str(path)})
+                    for path in discover_projects(parent if parent.is_absolute() else base_dir / parent))
+    jobs.extend(make_job(spec) for spec in config.get('projects', []))
+    return jobs
+
+
+def _run_job(index, job, pdf_path, log_path, results):
+    """Processo di un progetto: l'output va nel suo log, l'esito nella coda dei risultati"""
+    started = time.perf_counter()
+    result = {'project': job.name, 'path': job.path, 'pdf': str(pdf_path), 'log': str(log_path)}
+    metrics_before = REGISTRY.snapshot()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        sys.stdout = sys.stderr = log
+        try:
+            from core.pdf_converter import PDFConverter
+            converter = PDFConverter()
+            files_processed, _ = converter.create_project_pdf(job.path, pdf_path, job.exclusions,
+                                                              open_after_creation=False, **job.options)
+            manifest = converter.pdf.snapshot_metadata.get(MANIFEST_KEY, {})
+            result.update(status=STATUS_OK, files=files_processed, pages=converter.pdf.page,
+                          source_bytes=sum(entry['size'] for entry in manifest.values()),
+                          pdf_bytes=os.path.getsize(pdf_path))
+        except Exception as e:
+            traceback.print_exc()
+            result.update(status=STATUS_ERROR, error=str(e))
+        log.flush()
+    result['duration'] = time.perf_counter() - started
+    # Le metriche del progetto vengono unite a quelle del processo principale
+    result['metrics'] = REGISTRY.since(metrics_before)
+    results.put((index, result))
+
+
+class BatchRunner:
+    """
+    Esegue create_project_pdf per ogni BatchJob con al massimo workers processi attivi.
+    Un processo che supera il timeout del suo progetto viene terminato; un processo
+    che termina senza esito (crash) viene registrato come errore. Alla fine scrive
+    un riepilogo unico (BATCH_REPORT.txt e batch_summary.json) nella cartella di output.
+    """
+
+    def __init__(self, output_dir=None, workers=BATCH_WORKERS, progress_callback=None):
+        if output_dir is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = Path("saved") / f"batch_{timestamp}"
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers)
+        # Chiamata con (progetti completati, totale, esito) dopo ogni progetto
+        self.progress_callback = progress_callback
+        self.results = []
+
+    def _output_names(self, jobs):
+        """Nomi dei PDF unici anche per progetti omonimi in cartelle diverse"""
+        names = []
+        used = set()
+        for job in jobs:
+            name = job.name or 'progetto'
+            candidate = name
+            suffix = 2
+            while candidate in used:
+                candidate = f"{name}_{suffix}"
+                suffix += 1
+            used.add(candidate)
+            names.append(candidate)
+        return names
+
+    def run(self, jobs):
+        """Converte tutti i progetti e restituisce la lista degli esiti nell'ordine dei job"""
+        jobs = list(jobs)
+        log_dir = self.output_dir / 'logs'
+        log_dir.mkdir(parents=True, exist_ok=True)
+        names = self._output_names(jobs)
+        context = multiprocessing.get_context()
+        results_queue = context.Queue()
+        results = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+        # {indice: (processo, istante di avvio)}
+        running = {}
+        completed = 0
+        batch_started = time.perf_counter()
+
+        print(f"📦 Batch di {len(jobs)} progetti su {self.workers} processi -> {self.output_dir}")
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    index = pending.pop(0)
+                    process = context.Process(
+                        target=_run_job,
+                        args=(index, jobs[index], self.output_dir / f"{names[index]}_Snapshot.pdf",
+                              log_dir / f"{names[index]}.log", results_queue)
+                    )
+                    process.start()
+                    running[index] = (process, time.monotonic())
+
+                # Lo stato dei processi va letto prima di svuotare la coda: un processo
+                # terminato ha già consegnato il suo esito, se ne aveva uno
+                alive = {index: process.is_alive() for index, (process, _) in running.items()}
+                try:
+                    index, result = results_queue.get(timeout=_POLL_INTERVAL)
+                    REGISTRY.merge(result.pop('metrics', {}))
+                    results[index] = result
+                    while True:
+                        index, result = results_queue.get_nowait()
+                        REGISTRY.merge(result.pop('metrics', {}))
+                        results[index] = result
+                except queue.Empty:
+                    pass
+
+                now = time.monotonic()
+                for index, (process, started) in list(running.items()):
+                    job = jobs[index]
+                    if results[index] is None:
+                        timed_out = job.timeout is not None and now - started > job.timeout
+                        if alive[index] and not timed_out:
+                            continue
+                        if alive[index]:
+                            process.terminate()
+                            failure = (STATUS_TIMEOUT, f"superati {job.timeout} secondi")
+                        else:
+                            failure = (STATUS_ERROR, f"processo terminato con codice {process.exitcode}")
+                        results[index] = {'project': job.name, 'path': job.path, 'status': failure[0],
+                                          'error': failure[1], 'duration': now - started,
+                                          'log': str(log_dir / f"{names[index]}.log")}
+                    process.join()
+                    del running[index]
+                    completed += 1
+                    self._report_progress(completed, len(jobs), results[index])
+        finally:
+            for process, _ in running.values():
+                process.terminate()
+                process.join()
+
+        self.results = results
+        self.write_summary(results, time.perf_counter() - batch_started)
+        write_metrics_file()
+        return results
+
+    def _report_progress(self, completed, total, result):
+        if result['status'] == STATUS_OK:
+            print(f"✅ [{completed}/{total}] {result['project']}: {result['files']} file, "
+                  f"{result['pages']} pagine, {result['duration']:.1f}s")
+        else:
+            print(f"❌ [{completed}/{total}] {result['project']}: {result['status']} ({result['error']})")
+        if self.progress_callback:
+            self.progress_callback(completed, total, result)
+
+    def write_summary(self, results, duration):
+        """Scrive il riepilogo aggregato: tabella testuale e JSON"""
+        succeeded = [result for result in results if result['status'] == STATUS_OK]
+        totals = {
+            'projects': len(results),
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'files': sum(result['files'] for result in succeeded),
+            'pages': sum(result['pages'] for result in succeeded),
+            'source_bytes': sum(result['source_bytes'] for result in succeeded),
+            'pdf_bytes': sum(result['pdf_bytes'] for result in succeeded),
+            'duration': duration
+        }
+        atomic_write_text(self.output_dir / 'batch_summary.json',
+                          json.dumps({'totals': totals, 'projects': results}, indent=2, ensure_ascii=False))
+
+        lines = [
+            "CREAZIONE PDF IN BATCH",
+            "======================",
+            "",
+            f"Data: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Progetti: {totals['projects']} (riusciti {totals['succeeded']}, falliti {totals['failed']})",
+            f"File: {totals['files']}",
+            f"Pagine: {totals['pages']}",
+            f"Byte sorgente: {totals['source_bytes']}",
+            f"Byte PDF: {totals['pdf_bytes']}",
+            f"Durata totale: {duration:.1f}s",
+            "",
+            f"{'PROGETTO':<32} {'ESITO':<8} {'FILE':>7} {'PAGINE':>7} {'BYTE':>12} {'PDF':>12} {'SECONDI':>8}",
+        ]
+        for result in results:
+            if result['status'] == STATUS_OK:
+                lines.append(f"{result['project'][:32]:<32} {result['status']:<8} {result['files']:>7} "
+                             f"{result['pages']:>7} {result['source_bytes']:>12} {result['pdf_bytes']:>12} "
+                             f"{result['duration']:>8.1f}")
+            else:
+                lines.append(f"{result['project'][:32]:<32} {result['status']:<8} {'':>7} {'':>7} {'':>12} "
+                             f"{'':>12} {result['duration']:>8.1f}  {result['error']}")
+        report_path = self.output_dir / 'BATCH_REPORT.txt'
+        atomic_write_text(report_path, '\n'.join(lines) + '\n')
+        print(f"📊 Riepilogo: {totals['succeeded']}/{totals['projects']} progetti, {totals['files']} file, "
+              f"{totals['pages']} pagine in {duration:.1f}s -> {report_path}")
+        return report_path
@@ -119,5 +119,117 @@ APP_CONFIG = {
     'repository': 'https://github.com/Sigmanih/PySyncroNet'
 }
 
-SUPPORTED_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'ascii', 'utf-16', 'utf-32']
-MAX_LINE_WIDTH = 100
\ No newline at end of file
+# Creator scritto nei metadati dei PDF generati: permette al ricostruttore
+# di riconoscerli e di leggerne direttamente i content stream
+PDF_CREATOR = f"SyncroNet {APP_CONFIG['version']}"
+
+# Versione del flusso di metadati incorporato nei PDF (vedi core/pdf_document.py)
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Carattere al posto del pipe nel margine delle righe di continuazione
+WRAP_CONTINUATION_MARKER = '\xbb'
+
+# File minificati o generati (bundle .min.js, mappe, JSON su una riga):
+# righe mediamente lunghissime e pochissimi spazi
+MINIFIED_MIN_SIZE = 4 * 1024
+MINIFIED_MIN_AVG_LINE_LENGTH = 300
+MINIFIED_MAX_WHITESPACE_RATIO = 0.10
+
+# Politica per i file minificati: 'compact' (carattere ridotto, righe più larghe),
+# 'truncate' (solo i primi MINIFIED_TRUNCATE_BYTES byte) o 'skip' (elencati nel report)
+MINIFIED_POLICIES = ('compact', 'truncate', 'skip')
+MINIFIED_FILE_POLICY = 'compact'
+MINIFIED_TRUNCATE_BYTES = 64 * 1024
+
+# Layout compatto: Courier 6pt, caratteri per riga e altezza riga (mm)
+COMPACT_FONT_SIZE = 6
+COMPACT_LINE_WIDTH = 140
+COMPACT_LINE_HEIGHT = 3
+
+# Ordine di prova per le codifiche senza BOM: cp1252 prima di latin-1,
+# che decodifica qualsiasi sequenza di byte
+SUPPORTED_ENCODINGS = ['utf-8', 'utf-16', 'utf-32', 'cp1252', 'latin-1', 'iso-8859-1', 'ascii']
+MAX_LINE_WIDTH = 100
+
+# Dimensione massima di un file di testo incluso nel PDF (byte); None = nessun limite.
+# Il limite viene controllato prima dello streaming: i file più grandi vengono saltati
+# come troppo grandi. Per default non c'è limite, così anche un dump SQL da 1 GB viene
+# impaginato a blocchi (--max-file-size lo reimposta per una singola esecuzione)
+MAX_TEXT_FILE_SIZE = None
+
+# Oltre questa dimensione i file di testo vengono letti e impaginati a blocchi
+# (la memoria per la lettura resta costante; le pagine del PDF restano in memoria fino al salvataggio)
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Regole di esclusione globali con sintassi .gitignore (modificabili dalla scheda Esclusioni),
+# applicate in aggiunta ai file .gitignore/.syncroignore del progetto
+GLOBAL_IGNORE_FILE = 'saved/.syncroignore'
+
+# Cartella delle cache persistenti (codifiche rilevate, ecc.): generata, ignorata da git
+CACHE_DIR = 'saved/.cache'
+
+# Cache degli snapshot già analizzati, indicizzata per SHA-256 del PDF:
+# oltre la dimensione massima vengono eliminate le voci usate meno di recente
+SNAPSHOT_CACHE_DIR = 'saved/.cache/snapshots'
+SNAPSHOT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Modalità watch: secondi tra due controlli, secondi senza modifiche prima di aggiornare
+# lo snapshot e delta accumulati prima di ricreare uno snapshot completo
+WATCH_POLL_INTERVAL = 2.0
+WATCH_DEBOUNCE = 1.0
+WATCH_MAX_DELTAS = 20
+# Tra un controllo completo e l'altro vengono rielencate solo le cartelle con mtime cambiato
+# e ricontrollati i file delle cartelle modificate di recente: una modifica sul posto in una
+# cartella inattiva (e un cambio delle regole gitignore) viene vista entro questi secondi
+WATCH_FULL_SCAN_INTERVAL = 30.0
+
+# Creazione in batch: progetti convertiti in parallelo (un processo ciascuno)
+# e secondi massimi per progetto prima che il suo processo venga terminato
+BATCH_WORKERS = 4
+BATCH_TIMEOUT = 30 * 60
+
+# Servizio HTTP locale: indirizzo (solo localhost), processi dei job in esecuzione,
+# job in coda oltre i quali le richieste ricevono 429 e cartella dei risultati
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 2
+SERVICE_QUEUE_SIZE = 16
+SERVICE_JOBS_DIR = 'saved/service'
+# Token segreto generato a ogni avvio del servizio: ogni richiesta deve inviarlo
+# nell'intestazione 'Authorization: Bearer <token>'
+SERVICE_TOKEN_FILE = 'saved/service/token'
+# Job conclusi (completati, falliti, annullati) conservati con i loro risultati: oltre
+# questi secondi o questo numero i più vecchi vengono eliminati insieme alla loro cartella
+SERVICE_JOB_RETENTION = 24 * 60 * 60
+SERVICE_MAX_FINISHED_JOBS = 200
+
+# Impaginazione distribuita: porta predefinita dei worker, secondi di attesa di un gruppo
+# prima di considerare perso il worker e variabile d'ambiente con la chiave condivisa
+RENDER_WORKER_PORT = 6100
+RENDER_WORKER_TIMEOUT = 300
+RENDER_WORKER_KEY_ENV = 'SYNCRONET_WORKER_KEY'
+
+# Metriche in formato testo Prometheus: file scritto alla fine di ogni operazione
+# (per il textfile collector) e porta dell'endpoint locale facoltativo /metrics
+METRICS_FILE = 'saved/metrics/syncronet.prom'
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9477
+
+# Stima della capacità prima della creazione: file campionati per estensione (più i
+# più grandi del progetto) e byte letti dall'inizio di ciascuno
+PLANNER_SAMPLE_FILES = 8
+PLANNER_SAMPLE_LARGEST = 20
+PLANNER_SAMPLE_BYTES = 64 * 1024
+# Esecuzioni precedenti usate per calibrare durata e dimensione del PDF
+PLANNER_HISTORY_FILE = 'saved/.cache/planner_history.json'
+PLANNER_HISTORY_SIZE = 50
+# Valori iniziali per pagina, sostituiti dalla calibrazione dopo la prima creazione
+PLANNER_SECONDS_PER_PAGE = 0.0025
+PLANNER_BYTES_PER_PAGE = 2000
+
+# Statistiche dei progetti: cache per cartella (invalidata dall'mtime della cartella),
+# thread per il conteggio delle righe e numero di file più grandi elencati
+STATS_CACHE_DIR = 'saved/.cache/project_stats'
+STATS_WORKERS = 4
+STATS_LARGEST_FILES = 10
@@ -0,0 +1,125 @@
+"""
+Modulo per gli snapshot delta: confronto del progetto con il manifest di uno
+snapshot precedente e applicazione di una catena base + delta
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+import PyPDF2
+from core.integrity import MANIFEST_KEY, digest_file, manifest_id
+from core.pdf_document import read_snapshot_metadata
+
+# Chiave dei metadati di un PDF delta
+DELTA_KEY = 'delta'
+
+# Stato dei file impaginati nel delta
+DELTA_ADDED = 'aggiunto'
+DELTA_MODIFIED = 'modificato'
+
+
+def _posix(path):
+    return str(path).replace('\\', '/')
+
+
+def load_base_manifest(base):
+    """
+    Restituisce (manifest, identificativo dello stato) della base: un dizionario
+    (manifest o metadati dello snapshot), un file .json con il manifest oppure
+    un PDF di SyncroNet, completo o delta. Del PDF vengono letti solo i metadati.
+    """
+    if isinstance(base, dict):
+        data = base
+    elif Path(base).suffix.lower() == '.json':
+        with open(base, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        with open(base, 'rb') as f:
+            metadata = read_snapshot_metadata(PyPDF2.PdfReader(f))
+        manifest = metadata.get(MANIFEST_KEY)
+        if manifest is None:
+            raise ValueError(f"Il PDF '{base}' non contiene un manifest: ricrealo con questa versione di SyncroNet")
+        return manifest, metadata.get('snapshot_id') or manifest_id(manifest)
+
+    # Metadati completi ({'manifest': {...}, ...}) o direttamente il manifest
+    inner = data.get(MANIFEST_KEY)
+    if isinstance(inner, dict) and 'size' not in inner:
+        return inner, data.get('snapshot_id') or manifest_id(inner)
+    return data, manifest_id(data)
+
+
+def compute_delta(base_manifest, included_files):
+    """
+    Confronta i file inclusi, (percorso, percorso relativo), con il manifest base.
+    I file con dimensione e mtime invariati non vengono letti; se cambia solo mtime
+    l'hash conferma se il contenuto è lo stesso.
+    Restituisce (file da impaginare come (percorso, percorso relativo, stato),
+    voci del manifest invariate, percorsi eliminati).
+    """
+    changed = []
+    unchanged = {}
+    seen = set()
+    for file_path, relative_path in included_files:
+        key = Path(relative_path).as_posix()
+        seen.add(key)
+        base_entry = base_manifest.get(key)
+        if base_entry is None:
+            changed.append((file_path, relative_path, DELTA_ADDED))
+            continue
+
+        stat_result = os.stat(file_path)
+        if stat_result.st_size == base_entry['size'] and stat_result.st_mtime_ns == base_entry.get('mtime_ns'):
+            unchanged[key] = base_entry
+            continue
+        if stat_result.st_size == base_entry['size'] and base_entry.get('sha256') and not base_entry.get('partial'):
+            sha256, _ = digest_file(file_path)
+            if sha256 == base_entry['sha256']:
+                unchanged[key] = dict(base_entry, mtime_ns=stat_result.st_mtime_ns)
+                continue
+        changed.append((file_path, relative_path, DELTA_MODIFIED))
+
+    deleted = sorted(set(base_manifest) - seen)
+    return changed, unchanged, deleted
+
+
+class SnapshotChain(Mapping):
+    """
+    Mappa {percorso: contenuto} dello stato ottenuto applicando in ordine uno
+    snapshot completo e i suoi delta. I contenuti restano nelle mappe dei singoli
+    PDF (anche in cache con mmap) e vengono letti solo quando richiesti.
+    """
+
+    def __init__(self):
+        # {percorso posix: (mappa del PDF, chiave originale)}
+        self._sources = {}
+        self._layers = []
+
+    def apply(self, files_data, deleted=(), replace=False):
+        """Applica un livello: rimuove i percorsi eliminati e sovrascrive i file presenti"""
+        self._layers.append(files_data)
+        if replace:
+            # Uno snapshot completo sostituisce lo stato precedente
+            self._sources.clear()
+        for path in deleted:
+            self._sources.pop(_posix(path), None)
+        for path in files_data:
+            self._sources[_posix(path)] = (files_data, path)
+
+    def __getitem__(self, path):
+        files_data, original_path = self._sources[path]
+        return files_data[original_path]
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def close(self):
+        """Chiude le mappe dei PDF che lo prevedono (snapshot in cache)"""
+        for files_data in self._layers:
+            close = getattr(files_data, 'close', None)
+            if close is not None:
+                close()
+        self._layers = []
@@ -0,0 +1,241 @@
+"""
+Modulo per l'impaginazione distribuita: il coordinatore invia gruppi di file ai
+worker, anche su altri host, tramite multiprocessing.connection e unisce le pagine
+restituite nell'ordine dei file. I gruppi di un worker che cade o non risponde
+vengono riassegnati agli altri (o impaginati localmente se non ne resta nessuno).
+
+I worker devono usare la stessa versione di SyncroNet e di FPDF del coordinatore:
+le pagine vengono unite così come sono, con gli stessi riferimenti ai font.
+"""
+
+import ipaddress
+import os
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, wait
+from core.config import RENDER_WORKER_KEY_ENV, RENDER_WORKER_PORT, RENDER_WORKER_TIMEOUT
+from core.sources import FileEntry, MemoryEntry, as_entry
+
+# Chiave usata se la variabile d'ambiente non è impostata: adatta solo a worker locali
+DEFAULT_WORKER_KEY = 'syncronet-local'
+
+# Tentativi per gruppo prima di interrompere la creazione
+MAX_GROUP_ATTEMPTS = 3
+
+# Secondi di attesa delle risposte tra due controlli dei timeout
+_WAIT_INTERVAL = 1.0
+
+_CONNECTION_ERRORS = (OSError, EOFError, AuthenticationError)
+
+
+def worker_authkey():
+    """Chiave condivisa tra coordinatore e worker (variabile d'ambiente RENDER_WORKER_KEY_ENV)"""
+    return os.environ.get(RENDER_WORKER_KEY_ENV, DEFAULT_WORKER_KEY).encode('utf-8')
+
+
+def is_loopback_host(host):
+    """Indica se l'host è raggiungibile solo dalla macchina locale (127.0.0.0/8, ::1, localhost)"""
+    host = str(host).strip('[]')
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address, default_host='127.0.0.1'):
+    """Converte 'host:porta' (o solo 'porta') in (host, porta)"""
+    host, _, port = str(address).rpartition(':')
+    return host or default_host, int(port)
+
+
+class _UnreadableEntry(MemoryEntry):
+    """File che il coordinatore non è riuscito a leggere: il worker registra l'errore"""
+
+    __slots__ = ('error',)
+
+    def __init__(self, label, relative_path, error):
+        super().__init__(label, relative_path, b'')
+        self.error = error
+
+    def open(self):
+        raise OSError(self.error)
+
+
+def _load_group(files):
+    """
+    Legge in memoria i file di un gruppo: i worker remoti non vedono il disco del
+    coordinatore. Restituisce (file, {percorso posix: mtime_ns} dei file su disco).
+    """
+    loaded = []
+    mtimes = {}
+    for file_path, relative_path in files:
+        entry = as_entry(file_path, relative_path)
+        try:
+            if isinstance(entry, FileEntry):
+                mtimes[entry.relative_path.as_posix()] = os.stat(entry.path).st_mtime_ns
+            with entry.open() as f:
+                data = f.read()
+        except OSError as e:
+            loaded.append((_UnreadableEntry(str(entry), relative_path, str(e)), relative_path))
+            continue
+        loaded.append((MemoryEntry(str(entry), relative_path, data), relative_path))
+    return loaded, mtimes
+
+
+def _handle_coordinator(connection):
+    """Serve un coordinatore fino alla chiusura della connessione"""
+    from core.pdf_converter import _init_render_worker, _render_file_group
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        command = message[0]
+        if command == 'init':
+            _init_render_worker(message[1])
+        elif command == 'render':
+            _, group_index, files = message
+            print(f"🖨️ Gruppo {group_index}: {len(files)} file")
+            try:
+                reply = ('result', group_index, _render_file_group(files))
+            except Exception as e:
+                reply = ('error', group_index, str(e))
+            try:
+                connection.send(reply)
+            except (EOFError, OSError):
+                return
+        elif command == 'close':
+            return
+
+
+def serve_render_worker(address=('127.0.0.1', RENDER_WORKER_PORT), authkey=None):
+    """
+    Worker di impaginazione: attende i coordinatori sull'indirizzo indicato e ne
+    impagina i gruppi di file, un coordinatore alla volta. Per usare più core di un
+    host si avviano più worker su porte diverse.
+    La connessione deserializza con pickle ciò che riceve: con la chiave predefinita
+    (pubblica) il worker accetta solo indirizzi di loopback, altrimenti solleva ValueError.
+    """
+    authkey = authkey or worker_authkey()
+    if authkey == DEFAULT_WORKER_KEY.encode('utf-8') and not is_loopback_host(address[0]):
+        raise ValueError(f"Worker su {address[0]} raggiungibile dalla rete con la chiave predefinita: "
+                         f"imposta una chiave segreta in {RENDER_WORKER_KEY_ENV}")
+    with Listener(address, authkey=authkey) as listener:
+        print(f"🛠️ Worker di impaginazione in ascolto su {address[0]}:{listener.address[1]}")
+        while True:
+            try:
+                connection = listener.accept()
+            except _CONNECTION_ERRORS as e:
+                print(f"⚠️ Connessione rifiutata: {e}")
+                continue
+            print(f"🔗 Coordinatore connesso: {listener.last_accepted}")
+            with connection:
+                _handle_coordinator(connection)
+            print("🔌 Coordinatore disconnesso")
+
+
+class RenderCoordinator:
+    """Distribuisce i gruppi di file ai worker e consegna i risultati nell'ordine dei gruppi"""
+
+    def __init__(self, addresses, authkey=None, timeout=RENDER_WORKER_TIMEOUT):
+        self.addresses = list(addresses)
+        self.authkey = authkey or worker_authkey()
+        # Secondi massimi per un gruppo prima di considerare perso il worker
+        self.timeout = timeout
+
+    def _connect(self, options):
+        connections = {}
+        for address in self.addresses:
+            try:
+                connection = Client(parse_address(address), authkey=self.authkey)
+                connection.send(('init', options))
+            except _CONNECTION_ERRORS as e:
+                print(f"⚠️ Worker {address} non raggiungibile: {e}")
+                continue
+            connections[connection] = address
+        return connections
+
+    def render(self, groups, options, on_group):
+        """
+        Impagina i gruppi e chiama on_group(risultato, mtime dei file, remoto) nell'ordine
+        dei gruppi. Un gruppo fallito MAX_GROUP_ATTEMPTS volte interrompe la creazione.
+        """
+        connections = self._connect(options)
+        pending = deque(range(len(groups)))
+        attempts = [0] * len(groups)
+        # {connessione: (indice del gruppo, mtime dei file, istante di invio)}
+        in_flight = {}
+        completed = {}
+        next_index = 0
+        local_ready = False
+
+        def requeue(connection, index, reason, drop=True):
+            in_flight.pop(connection, None)
+            if drop:
+                address = connections.pop(connection)
+                connection.close()
+                print(f"⚠️ Worker {address} perso ({reason}): gruppo {index} riassegnato")
+            else:
+                print(f"⚠️ Errore nel gruppo {index} ({reason}): nuovo tentativo")
+            attempts[index] += 1
+            if attempts[index] >= MAX_GROUP_ATTEMPTS:
+                raise RuntimeError(f"Impaginazione del gruppo {index} fallita {attempts[index]} volte")
+            pending.appendleft(index)
+
+        try:
+            while next_index < len(groups):
+                for connection in list(connections):
+                    if connection in in_flight or not pending:
+                        continue
+                    index = pending.popleft()
+                    files, mtimes = _load_group(groups[index])
+                    try:
+                        connection.send(('render', index, files))
+                    except (OSError, ValueError) as e:
+                        requeue(connection, index, e)
+                        continue
+                    in_flight[connection] = (index, mtimes, time.monotonic())
+
+                if not connections and pending:
+                    # Nessun worker disponibile: il coordinatore impagina da sé
+                    from core.pdf_converter import _init_render_worker, _render_file_group
+                    if not local_ready:
+                        print("⚠️ Nessun worker disponibile: impaginazione locale dei gruppi rimanenti")
+                        _init_render_worker(options)
+                        local_ready = True
+                    index = pending.popleft()
+                    completed[index] = (_render_file_group(groups[index]), {}, False)
+
+                if in_flight:
+                    for connection in wait(list(in_flight), timeout=_WAIT_INTERVAL):
+                        index, mtimes, _ = in_flight[connection]
+                        try:
+                            reply = connection.recv()
+                        except (EOFError, OSError) as e:
+                            requeue(connection, index, str(e) or 'connessione chiusa')
+                            continue
+                        if reply[0] == 'result':
+                            del in_flight[connection]
+                            completed[index] = (reply[2], mtimes, True)
+                        else:
+                            requeue(connection, index, reply[2], drop=False)
+
+                    now = time.monotonic()
+                    for connection, (index, _, sent) in list(in_flight.items()):
+                        if now - sent > self.timeout:
+                            requeue(connection, index, f"nessuna risposta in {self.timeout}s")
+
+                while next_index in completed:
+                    on_group(*completed.pop(next_index))
+                    next_index += 1
+        finally:
+            for connection in connections:
+                try:
+                    connection.send(('close',))
+                except (OSError, ValueError):
+                    pass
+                connection.close()
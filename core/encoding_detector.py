@@ -0,0 +1,224 @@
+"""
+Modulo per il rilevamento della codifica dei file a partire dai byte:
+BOM, validità UTF-8 e densità dei byte NUL (UTF-16/32 e file binari)
+"""
+
+import codecs
+import json
+import os
+from pathlib import Path
+from core.config import SUPPORTED_ENCODINGS
+from core.journal import atomic_write_text
+
+# Valore usato nella cache per i file riconosciuti come binari
+BINARY = 'binary'
+
+# L'ordine conta: il BOM UTF-32 LE inizia con il BOM UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Byte analizzati per la densità dei NUL
+SNIFF_SIZE = 4096
+
+# Byte letti dal classificatore testo/binario
+BINARY_SNIFF_SIZE = 8192
+
+# Firme di formati binari comuni
+BINARY_SIGNATURES = (
+    b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'PK\x03\x04', b'%PDF', b'\x7fELF',
+    b'\x1f\x8b', b'\xfd7zXZ', b'7z\xbc\xaf', b'Rar!', b'\xca\xfe\xba\xbe',
+    b'SQLite format 3', b'OggS', b'\x00asm', b'wOFF', b'wOF2'
+)
+
+# Firme brevi o formate da lettere (un file di testo può iniziare così): valgono
+# solo se anche il contenuto ha byte NUL o di controllo
+WEAK_BINARY_SIGNATURES = (b'MZ', b'BZh', b'ID3', b'RIFF')
+
+# Byte di controllo ammessi nei file di testo: tab, a capo, form feed, escape
+_TEXT_CONTROL_BYTES = {0x08, 0x09, 0x0a, 0x0b, 0x0c, 0x0d, 0x1b}
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in _TEXT_CONTROL_BYTES) + b'\x7f'
+
+# Codifiche a byte singolo provate dopo UTF-8, nell'ordine di SUPPORTED_ENCODINGS
+LEGACY_ENCODINGS = [e for e in SUPPORTED_ENCODINGS
+                    if e not in ('utf-8', 'utf-16', 'utf-32', 'ascii')]
+
+
+def _detect_wide_encoding(sample):
+    """
+    Riconosce UTF-16/UTF-32 senza BOM dalla posizione dei byte NUL.
+    Restituisce la codifica, BINARY se i NUL non seguono uno schema, None se non ci sono NUL.
+    """
+    if b'\x00' not in sample:
+        return None
+
+    usable = len(sample) - len(sample) % 4
+    if usable < 4:
+        return BINARY
+
+    # Conta i NUL per posizione modulo 4
+    nul_by_position = [0, 0, 0, 0]
+    for position in range(4):
+        nul_by_position[position] = sample[position:usable:4].count(0)
+    groups = usable // 4
+
+    def mostly_nul(position):
+        return nul_by_position[position] >= groups * 0.9
+
+    def mostly_text(position):
+        return nul_by_position[position] <= groups * 0.1
+
+    # In UTF-32 i due byte più significativi sono quasi sempre NUL
+    if mostly_text(0) and mostly_nul(2) and mostly_nul(3):
+        return 'utf-32-le'
+    if mostly_nul(0) and mostly_nul(1) and mostly_text(3):
+        return 'utf-32-be'
+
+    even_nul = nul_by_position[0] + nul_by_position[2]
+    odd_nul = nul_by_position[1] + nul_by_position[3]
+    pairs = groups * 2
+    if odd_nul >= pairs * 0.7 and even_nul <= pairs * 0.1:
+        return 'utf-16-le'
+    if even_nul >= pairs * 0.7 and odd_nul <= pairs * 0.1:
+        return 'utf-16-be'
+
+    return BINARY
+
+
+def _decodes(data, encoding, partial):
+    """Indica se i byte sono validi nella codifica; con partial tollera una sequenza troncata in coda"""
+    try:
+        if partial:
+            codecs.getincrementaldecoder(encoding)().decode(data, final=False)
+        else:
+            data.decode(encoding)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(data, partial=False):
+    """
+    Rileva la codifica dei byte di un file.
+    Con partial=True data è solo l'inizio del file (lettura a blocchi).
+    Restituisce il nome della codifica oppure BINARY per i file non di testo.
+    """
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding
+
+    wide = _detect_wide_encoding(data[:SNIFF_SIZE])
+    if wide == BINARY:
+        return BINARY
+    if wide is not None:
+        return wide if _decodes(data, wide, partial) else BINARY
+
+    if _decodes(data, 'utf-8', partial):
+        return 'utf-8'
+
+    for encoding in LEGACY_ENCODINGS:
+        if _decodes(data, encoding, partial):
+            return encoding
+
+    return BINARY
+
+
+def _control_ratio(sample):
+    """Frazione dei byte di controllo non ammessi nel testo"""
+    return (len(sample) - len(sample.translate(None, _CONTROL_BYTES))) / len(sample)
+
+
+def is_binary_sample(sample):
+    """Classifica come binario l'inizio di un file (primi KB)"""
+    if not sample:
+        return False
+    for bom, _ in BOMS:
+        if sample.startswith(bom):
+            return False
+    if sample.startswith(BINARY_SIGNATURES):
+        return True
+    if sample.startswith(WEAK_BINARY_SIGNATURES):
+        return b'\x00' in sample or _control_ratio(sample) > 0.01
+
+    wide = _detect_wide_encoding(sample[:SNIFF_SIZE])
+    if wide == BINARY:
+        return True
+    if wide is not None:
+        return False
+
+    # Troppi byte di controllo: non è testo
+    return _control_ratio(sample) > 0.1
+
+
+def sniff_is_binary(file_path, sample_size=BINARY_SNIFF_SIZE):
+    """Legge solo i primi KB del file e indica se è binario"""
+    with open(file_path, 'rb') as file:
+        return is_binary_sample(file.read(sample_size))
+
+
+class EncodingCache:
+    """Cache delle codifiche rilevate, indicizzata per (percorso, mtime, dimensione)"""
+
+    def __init__(self, cache_file=None, max_entries=200000):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_entries = max_entries
+        self.entries = {}
+        self.dirty = False
+        # Voci aggiunte o modificate da questo processo
+        self.updated = {}
+        self.hits = 0
+        self.misses = 0
+        self._loaded = self.cache_file is None
+
+    @staticmethod
+    def make_key(file_path, stat_result):
+        """Costruisce la chiave della cache da un os.stat_result"""
+        return f"{os.path.abspath(file_path)}|{stat_result.st_mtime_ns}|{stat_result.st_size}"
+
+    def get(self, key):
+        """Restituisce la codifica in cache o None"""
+        if not self._loaded:
+            self.load()
+        encoding = self.entries.get(key)
+        if encoding is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return encoding
+
+    def put(self, key, encoding):
+        """Memorizza la codifica rilevata"""
+        if not self._loaded:
+            self.load()
+        if self.entries.get(key) != encoding:
+            self.entries[key] = encoding
+            self.updated[key] = encoding
+            self.dirty = True
+
+    def load(self):
+        """Carica la cache dal disco, ignorando file mancanti o corrotti"""
+        self._loaded = True
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        """Salva la cache su disco se modificata, scartando le voci più vecchie"""
+        if self.cache_file is None or not self.dirty:
+            return
+        if len(self.entries) > self.max_entries:
+            keys = list(self.entries)[-self.max_entries:]
+            self.entries = {key: self.entries[key] for key in keys}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Rename atomico: più processi (batch, impaginazione parallela) possono salvare insieme
+            atomic_write_text(self.cache_file, json.dumps(self.entries))
+            self.dirty = False
+        except OSError as e:
+            print(f"Avviso: impossibile salvare la cache delle codifiche: {e}")
@@ -4,7 +4,31 @@ Modulo per la gestione dei file e sistema di esclusioni
 
 import os
 from pathlib import Path
-from core.config import DEFAULT_EXCLUSIONS
+from core.config import (DEFAULT_EXCLUSIONS, MAX_TEXT_FILE_SIZE, CACHE_DIR, GLOBAL_IGNORE_FILE, MINIFIED_MIN_SIZE,
+                         MINIFIED_MIN_AVG_LINE_LENGTH, MINIFIED_MAX_WHITESPACE_RATIO)
+from core.ignore_rules import IgnoreRuleEngine, load_rules_file, parse_rules
+from core.encoding_detector import BINARY_SNIFF_SIZE, EncodingCache, is_binary_sample, sniff_is_binary
+from core.metrics import SKIPPED_FILES
+
+# Motivi per cui un file non escluso viene comunque saltato
+SKIP_BINARY = 'binario'
+SKIP_TOO_LARGE = 'troppo grande'
+SKIP_MINIFIED = 'minificato'
+
+# Tabella per str.translate che elimina gli spazi bianchi
+_WHITESPACE_TABLE = dict.fromkeys(map(ord, ' \t\r\n\f\v'))
+
+
+def is_minified_content(content):
+    """Riconosce il testo minificato/generato da lunghezza media delle righe e densità di spazi"""
+    size = len(content)
+    if size < MINIFIED_MIN_SIZE:
+        return False
+    if size / (content.count('\n') + 1) < MINIFIED_MIN_AVG_LINE_LENGTH:
+        return False
+    whitespace = size - len(content.translate(_WHITESPACE_TABLE))
+    return whitespace / size <= MINIFIED_MAX_WHITESPACE_RATIO
+
 
 class FileManager:
     """Gestisce le operazioni sui file e il sistema di esclusioni"""
@@ -13,6 +37,15 @@ class FileManager:
         self.excluded_dirs = set(DEFAULT_EXCLUSIONS['dirs'])
         self.excluded_files = set(DEFAULT_EXCLUSIONS['files'])
         self.excluded_extensions = set(DEFAULT_EXCLUSIONS['extensions'])
+        self.max_text_file_size = MAX_TEXT_FILE_SIZE
+        # Regole gitignore: file globale e file .gitignore/.syncroignore del progetto
+        self.global_ignore_file = GLOBAL_IGNORE_FILE
+        self.use_ignore_files = True
+        # Pattern gitignore aggiuntivi (es. '/dist/', '/data/dump.sql') relativi al progetto
+        self.extra_ignore_patterns = []
+        # Verdetti testo/binario per (percorso, mtime, dimensione); il nome cambia con le
+        # regole del classificatore, così i verdetti precedenti vengono ricalcolati
+        self.content_cache = EncodingCache(Path(CACHE_DIR) / 'content_types_v2.json')
     
     def should_exclude(self, file_path, relative_path):
         """Determina se un file/cartella dovrebbe essere escluso"""
@@ -40,44 +73,148 @@ class FileManager:
         
         return False
     
-    def count_project_files(self, project_path):
-        """Conta i file nel progetto considerando le esclusioni"""
-        project_path = Path(project_path)
-        count = 0
+    def classify_file(self, file_path):
+        """
+        Classifica un file non escluso leggendo solo i primi KB.
+        Restituisce None per i file di testo, altrimenti il motivo dello scarto.
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
         
-        for file_path in project_path.rglob('*'):
-            if file_path.is_file():
-                try:
-                    relative_path = file_path.relative_to(project_path)
-                    if not self.should_exclude(file_path, relative_path):
-                        count += 1
-                except ValueError:
-                    continue
+        if self.max_text_file_size is not None and stat_result.st_size > self.max_text_file_size:
+            return SKIP_TOO_LARGE
+        
+        cache_key = EncodingCache.make_key(file_path, stat_result)
+        verdict = self.content_cache.get(cache_key)
+        if verdict is None:
+            try:
+                verdict = 'binary' if sniff_is_binary(file_path) else 'text'
+            except OSError:
+                return None
+            self.content_cache.put(cache_key, verdict)
+        
+        return SKIP_BINARY if verdict == 'binary' else None
+    
+    def create_ignore_engine(self, project_path=None):
+        """Crea il motore di regole gitignore: regole globali più i file di regole del progetto"""
+        global_rules = parse_rules(load_rules_file(self.global_ignore_file), source=self.global_ignore_file)
+        global_rules.extend(parse_rules(self.extra_ignore_patterns, source='esclusioni personalizzate'))
+        return IgnoreRuleEngine(project_path, global_rules, self.use_ignore_files)
+    
+    def classify_entry(self, entry):
+        """Come classify_file, per una voce di sorgente (blob git, membro di archivio)"""
+        if self.max_text_file_size is not None and entry.size > self.max_text_file_size:
+            return SKIP_TOO_LARGE
+        
+        cache_key = entry.cache_key()
+        verdict = self.content_cache.get(cache_key)
+        if verdict is None:
+            try:
+                with entry.open() as file:
+                    verdict = 'binary' if is_binary_sample(file.read(BINARY_SNIFF_SIZE)) else 'text'
+            except OSError:
+                return None
+            self.content_cache.put(cache_key, verdict)
+        
+        return SKIP_BINARY if verdict == 'binary' else None
+    
+    def make_path_filter(self, project_path=None):
+        """
+        Restituisce una funzione che indica se un percorso relativo è incluso
+        (esclusioni e regole gitignore), usata prima di leggere il contenuto
+        """
+        ignore_engine = self.create_ignore_engine(project_path)
+        
+        def is_included(relative_path):
+            if self.should_exclude(relative_path, relative_path):
+                return False
+            return not ignore_engine.is_ignored(relative_path.as_posix())
+        
+        return is_included
+    
+    def filter_entries(self, entries, skipped=None, project_path=None):
+        """
+        Applica esclusioni, regole gitignore e classificazione alle voci di una sorgente
+        (git, archivi). Restituisce (voce, percorso relativo) come iter_project_files.
+        """
+        is_included = self.make_path_filter(project_path)
+        for entry in entries:
+            relative_path = entry.relative_path
+            if not is_included(relative_path):
+                continue
+            
+            reason = self.classify_entry(entry)
+            if reason is not None:
+                SKIPPED_FILES.inc(reason=reason)
+                if skipped is not None:
+                    skipped.append((str(relative_path), reason))
+                continue
+            
+            yield entry, relative_path
         
-        return count
+        self.content_cache.save()
     
-    def get_project_stats(self, project_path):
-        """Restituisce statistiche del progetto"""
+    def iter_project_files(self, project_path, skipped=None, sniff_content=True):
+        """
+        Percorre il progetto in ordine deterministico saltando le cartelle escluse
+        (anche dalle regole gitignore) senza visitarle. Restituisce (percorso, percorso
+        relativo) dei file inclusi; i file di testo troppo grandi o binari vengono
+        aggiunti a skipped come (percorso relativo, motivo).
+        """
         project_path = Path(project_path)
-        total_files = 0
-        total_size = 0
-        extensions = {}
+        ignore_engine = self.create_ignore_engine(project_path)
         
-        for file_path in project_path.rglob('*'):
-            if file_path.is_file():
-                total_files += 1
-                total_size += file_path.stat().st_size
-                ext = file_path.suffix.lower()
-                extensions[ext] = extensions.get(ext, 0) + 1
+        for root, dirs, files in os.walk(project_path):
+            root_path = Path(root)
+            relative_root = root_path.relative_to(project_path)
+            relative_dir = relative_root.as_posix() if relative_root.parts else ''
+            prefix = f"{relative_dir}/" if relative_dir else ''
+            matcher = ignore_engine.matcher_for(relative_dir)
+            
+            # Pruning: le cartelle escluse non vengono attraversate
+            dirs[:] = sorted(d for d in dirs
+                             if d not in self.excluded_dirs and not matcher.is_ignored(prefix + d, True))
+            
+            for name in sorted(files):
+                file_path = root_path / name
+                relative_path = relative_root / name
+                if self.should_exclude(file_path, relative_path):
+                    continue
+                if matcher.is_ignored(prefix + name, False):
+                    continue
+                
+                if sniff_content:
+                    reason = self.classify_file(file_path)
+                    if reason is not None:
+                        SKIPPED_FILES.inc(reason=reason)
+                        if skipped is not None:
+                            skipped.append((str(relative_path), reason))
+                        continue
+                
+                yield file_path, relative_path
         
-        return {
-            'total_files': total_files,
-            'total_size_mb': total_size / (1024 * 1024),
-            'extensions': extensions
-        }
+        if sniff_content:
+            self.content_cache.save()
+    
+    def count_project_files(self, project_path):
+        """Conta i file nel progetto considerando le esclusioni"""
+        return sum(1 for _ in self.iter_project_files(project_path, sniff_content=False))
+    
+    def get_project_stats(self, project_path, refresh=False):
+        """
+        Restituisce statistiche del progetto con le esclusioni correnti: file inclusi,
+        righe, byte per estensione, file più grandi, volume escluso e saltato
+        (vedi core.project_stats.ProjectStatsEngine, con cache per cartella)
+        """
+        from core.project_stats import ProjectStatsEngine
+        return ProjectStatsEngine(self).compute(project_path, refresh)
     
-    def update_exclusions(self, dirs=None, files=None, extensions=None):
+    def update_exclusions(self, dirs=None, files=None, extensions=None, patterns=None):
         """Aggiorna le esclusioni"""
+        if patterns is not None:
+            self.extra_ignore_patterns = list(patterns)
         if dirs is not None:
             self.excluded_dirs = set(dirs)
         if files is not None:
@@ -90,5 +227,6 @@ class FileManager:
         return {
             'dirs': sorted(self.excluded_dirs),
             'files': sorted(self.excluded_files),
-            'extensions': sorted(self.excluded_extensions)
+            'extensions': sorted(self.excluded_extensions),
+            'patterns': list(self.extra_ignore_patterns)
         }
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Modulo per le regole di esclusione con la semantica di .gitignore:
+pattern ancorati, '**', classi di caratteri, regole solo-cartella e negazioni.
+Le regole di ogni cartella vengono compilate una volta e memorizzate in cache.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+
+# File di regole letti in ogni cartella, nell'ordine (le regole successive prevalgono)
+IGNORE_FILE_NAMES = ('.gitignore', '.syncroignore')
+
+
+def _translate_class(pattern, start):
+    """Traduce una classe [..] a partire da start; restituisce (regex, indice successivo) o None"""
+    i = start + 1
+    if i < len(pattern) and pattern[i] in '!^':
+        i += 1
+    if i < len(pattern) and pattern[i] == ']':
+        i += 1
+    end = pattern.find(']', i)
+    if end < 0:
+        return None
+    body = pattern[start + 1:end]
+    negated = body[:1] in ('!', '^')
+    if negated:
+        body = body[1:]
+    body = body.replace('\\', '\\\\')
+    return ('[^/' if negated else '[') + body + ']', end + 1
+
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern, anchored):
+    """Compila un pattern gitignore (senza '!', '/' iniziale e finale) in una regex"""
+    parts = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                j = i + 2
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = j == n or pattern[j] == '/'
+                if at_start and at_end:
+                    if j == n:
+                        # 'dir/**': tutto il contenuto; '**' da solo: tutto
+                        parts.append('.*')
+                    else:
+                        # '**/' iniziale o '/**/': zero o più cartelle
+                        parts.append('(?:.*/)?')
+                        j += 1
+                    i = j
+                    continue
+                i = j
+            else:
+                i += 1
+            parts.append('[^/]*')
+            continue
+        if c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            translated = _translate_class(pattern, i)
+            if translated is not None:
+                parts.append(translated[0])
+                i = translated[1]
+                continue
+            parts.append(re.escape(c))
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            parts.append(re.escape(c))
+        i += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(prefix + ''.join(parts) + r'\Z', re.DOTALL)
+
+
+class IgnoreRule:
+    """Singola regola gitignore, relativa alla cartella base in cui è definita"""
+
+    __slots__ = ('text', 'source', 'line_number', 'pattern', 'negated', 'dir_only', 'base', 'regex')
+
+    def __init__(self, pattern, base='', source=None, line_number=0):
+        self.text = pattern
+        self.source = source
+        self.line_number = line_number
+        self.negated = pattern.startswith('!')
+        if self.negated:
+            pattern = pattern[1:]
+        elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # Un '/' all'inizio o in mezzo ancora il pattern alla cartella base
+        anchored = '/' in pattern
+        self.pattern = pattern.lstrip('/')
+        self.base = f"{base}/" if base else ''
+        self.regex = compile_pattern(self.pattern, anchored)
+
+    def matches(self, relative_path, is_dir):
+        """Verifica la regola su un percorso posix relativo alla radice del progetto"""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not relative_path.startswith(self.base):
+                return False
+            relative_path = relative_path[len(self.base):]
+        return self.regex.match(relative_path) is not None
+
+    def __str__(self):
+        if self.source:
+            return f"{self.text} ({self.source}:{self.line_number})"
+        return self.text
+
+
+def load_rules_file(path):
+    """Legge le righe di un file di regole; lista vuota se il file non esiste"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def save_rules_file(path, text):
+    """Salva il testo delle regole, creando la cartella se necessario"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text.rstrip('\n') + '\n' if text.strip() else '')
+
+
+def parse_rules(lines, base='', source=None):
+    """Converte le righe di un file gitignore in regole"""
+    rules = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip('\n').rstrip('\r')
+        # Gli spazi finali sono ignorati, salvo se preceduti da '\'
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped in ('!', '/'):
+            continue
+        rules.append(IgnoreRule(stripped, base, source, line_number))
+    return rules
+
+
+class IgnoreMatcher:
+    """Regole attive in una cartella: quelle dei genitori seguite dalle proprie"""
+
+    __slots__ = ('rules',)
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def match(self, relative_path, is_dir):
+        """Restituisce l'ultima regola che corrisponde al percorso, o None"""
+        for rule in reversed(self.rules):
+            if rule.matches(relative_path, is_dir):
+                return rule
+        return None
+
+    def is_ignored(self, relative_path, is_dir):
+        """Indica se il percorso è escluso dalle regole (l'ultima che corrisponde decide)"""
+        rule = self.match(relative_path, is_dir)
+        return rule is not None and not rule.negated
+
+
+class IgnoreRuleEngine:
+    """
+    Regole di esclusione di un progetto: regole globali più i file .gitignore e
+    .syncroignore trovati nelle cartelle. I matcher sono calcolati per cartella e
+    memorizzati in cache, così il walk può scartare intere cartelle.
+    """
+
+    def __init__(self, root=None, global_rules=(), read_ignore_files=True):
+        self.root = Path(root) if root is not None else None
+        self.read_ignore_files = read_ignore_files and self.root is not None
+        self.global_rules = list(global_rules)
+        self._matchers = {}
+
+    def _load_directory_rules(self, relative_dir):
+        """Legge i file di regole presenti nella cartella"""
+        rules = []
+        if not self.read_ignore_files:
+            return rules
+        directory = self.root / relative_dir if relative_dir else self.root
+        for name in IGNORE_FILE_NAMES:
+            ignore_file = directory / name
+            try:
+                with open(ignore_file, 'r', encoding='utf-8', errors='replace') as f:
+                    source = f"{relative_dir}/{name}" if relative_dir else name
+                    rules.extend(parse_rules(f, relative_dir, source))
+            except OSError:
+                continue
+        return rules
+
+    def matcher_for(self, relative_dir=''):
+        """Restituisce il matcher della cartella (percorso posix relativo, '' per la radice)"""
+        matcher = self._matchers.get(relative_dir)
+        if matcher is None:
+            if relative_dir:
+                parent = relative_dir.rpartition('/')[0]
+                inherited = self.matcher_for(parent).rules
+            else:
+                inherited = self.global_rules
+            own_rules = self._load_directory_rules(relative_dir)
+            matcher = IgnoreMatcher(inherited + own_rules)
+            self._matchers[relative_dir] = matcher
+        return matcher
+
+    def match(self, relative_path, is_dir=False):
+        """
+        Verifica un percorso qualsiasi, cartelle genitore comprese: un file dentro una
+        cartella esclusa è escluso come in git. Restituisce (escluso, regola decisiva).
+        """
+        parts = PurePosixPath(relative_path).parts
+        for depth in range(1, len(parts) + 1):
+            path = '/'.join(parts[:depth])
+            directory = '/'.join(parts[:depth - 1])
+            part_is_dir = is_dir if depth == len(parts) else True
+            rule = self.matcher_for(directory).match(path, part_is_dir)
+            if rule is not None and not rule.negated:
+                return True, rule
+            if depth == len(parts):
+                return False, rule
+        return False, None
+
+    def is_ignored(self, relative_path, is_dir=False):
+        """Indica se il percorso (posix, relativo alla radice) è escluso"""
+        return self.match(relative_path, is_dir)[0]
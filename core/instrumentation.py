@@ -0,0 +1,181 @@
+"""
+Modulo per la strumentazione delle operazioni: tempi per fase, contatori,
+memoria di picco e cattura opzionale con cProfile/tracemalloc
+"""
+
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CAPTURE_MODES = ('cprofile', 'tracemalloc')
+
+
+class _Span:
+    """Context manager che accumula il tempo trascorso in una fase"""
+
+    __slots__ = ('_spans', '_name', '_start')
+
+    def __init__(self, spans, name):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        entry = self._spans.get(self._name)
+        if entry is None:
+            self._spans[self._name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+        return False
+
+
+class _NullSpan:
+    """Span vuoto condiviso, usato quando la strumentazione è disattivata"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullInstrumentation:
+    """Strumentazione disattivata: ogni chiamata è una no-op"""
+
+    enabled = False
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def count(self, name, value=1):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self, output_path=None):
+        return []
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class Instrumentation:
+    """Raccoglie tempi cumulativi per fase, contatori e memoria di picco"""
+
+    enabled = True
+
+    def __init__(self, capture=None):
+        if capture is not None and capture not in CAPTURE_MODES:
+            raise ValueError(f"Modalità di cattura non valida: {capture}")
+        self.capture = capture
+        self.spans = {}
+        self.counters = {}
+        self.peak_memory_bytes = None
+        self.total_seconds = 0.0
+        self.dump_files = []
+        self._profiler = None
+        self._start_time = None
+
+    def span(self, name):
+        """Restituisce un context manager che misura la fase 'name'"""
+        return _Span(self.spans, name)
+
+    def count(self, name, value=1):
+        """Incrementa il contatore 'name'"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, data):
+        """Somma tempi e contatori raccolti altrove (as_dict di un processo worker)"""
+        for name, span in data['spans'].items():
+            entry = self.spans.setdefault(name, [0.0, 0])
+            entry[0] += span['seconds']
+            entry[1] += span['calls']
+        for name, value in data['counters'].items():
+            self.count(name, value)
+
+    def start(self):
+        """Avvia la misura complessiva e l'eventuale cattura"""
+        if self.capture == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.capture == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+        self._start_time = time.perf_counter()
+
+    def stop(self, output_path=None):
+        """
+        Ferma la misura e salva i dump della cattura accanto a output_path.
+        Restituisce la lista dei file di dump creati.
+        """
+        if self._start_time is not None:
+            self.total_seconds = time.perf_counter() - self._start_time
+
+        dump_base = Path(output_path) if output_path else None
+
+        if self.capture == 'cprofile' and self._profiler is not None:
+            self._profiler.disable()
+            if dump_base is not None:
+                dump_path = dump_base.with_name(dump_base.name + '.prof')
+                self._profiler.dump_stats(str(dump_path))
+                self.dump_files.append(str(dump_path))
+            self._profiler = None
+        elif self.capture == 'tracemalloc':
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                self.peak_memory_bytes = peak
+                if dump_base is not None:
+                    dump_path = dump_base.with_name(dump_base.name + '.tracemalloc')
+                    tracemalloc.take_snapshot().dump(str(dump_path))
+                    self.dump_files.append(str(dump_path))
+                tracemalloc.stop()
+
+        if self.peak_memory_bytes is None and resource is not None:
+            # ru_maxrss è in KB su Linux e in byte su macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak_memory_bytes = peak if sys.platform == 'darwin' else peak * 1024
+
+        return self.dump_files
+
+    def as_dict(self):
+        """Restituisce i dati raccolti in forma serializzabile"""
+        return {
+            'total_seconds': self.total_seconds,
+            'spans': {name: {'seconds': seconds, 'calls': calls}
+                      for name, (seconds, calls) in self.spans.items()},
+            'counters': dict(self.counters),
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'dump_files': list(self.dump_files)
+        }
+
+    def summary(self):
+        """Restituisce un riepilogo testuale, ordinato per tempo decrescente"""
+        lines = [f"Tempo totale: {self.total_seconds:.3f}s"]
+        for name, (seconds, calls) in sorted(self.spans.items(), key=lambda x: x[1][0], reverse=True):
+            share = (seconds / self.total_seconds * 100) if self.total_seconds else 0.0
+            lines.append(f"- {name}: {seconds:.3f}s ({share:.1f}%, {calls} chiamate)")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"- {name}: {value}")
+        if self.peak_memory_bytes is not None:
+            lines.append(f"- Memoria di picco: {self.peak_memory_bytes / (1024 * 1024):.1f} MB")
+        for dump_file in self.dump_files:
+            lines.append(f"- Dump: {dump_file}")
+        return '\n'.join(lines)
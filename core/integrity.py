@@ -0,0 +1,145 @@
+"""
+Modulo per il manifest di integrità: SHA-256 e dimensione in byte di ogni file
+incluso nel PDF, verificati in parallelo dopo il ripristino o su una cartella esistente
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Chiave del manifest nei metadati dello snapshot
+MANIFEST_KEY = 'manifest'
+
+# Thread di hashing: hashlib rilascia il GIL, quindi i thread lavorano in parallelo
+VERIFY_WORKERS = min(8, os.cpu_count() or 1)
+
+# Blocchi letti per l'hash dei file su disco
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def digest_bytes(data):
+    """Restituisce (sha256 esadecimale, dimensione) dei byte"""
+    return hashlib.sha256(data).hexdigest(), len(data)
+
+
+def digest_file(path):
+    """Restituisce (sha256 esadecimale, dimensione) di un file letto a blocchi"""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+def manifest_entry(sha256, size, text_sha256=None, partial=None, mtime_ns=None):
+    """
+    Voce del manifest. text_sha256 è l'hash del testo decodificato in UTF-8 quando
+    differisce dai byte originali (altra codifica o BOM): il ricostruttore scrive UTF-8.
+    partial ('truncate', 'error') indica un file incluso solo in parte nel PDF.
+    mtime_ns permette ai delta di riconoscere i file invariati senza rileggerli.
+    """
+    entry = {'size': size}
+    if mtime_ns is not None:
+        entry['mtime_ns'] = mtime_ns
+    if sha256 is not None:
+        entry['sha256'] = sha256
+    if text_sha256 is not None and text_sha256 != sha256:
+        entry['text_sha256'] = text_sha256
+    if partial:
+        entry['partial'] = partial
+    return entry
+
+
+def manifest_id(manifest):
+    """Identificativo di uno stato del progetto: hash dei percorsi e degli hash dei file"""
+    state = sorted((path, entry.get('sha256'), entry['size']) for path, entry in manifest.items())
+    return hashlib.sha256(json.dumps(state, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class VerificationResult:
+    """Esito della verifica dei file rispetto al manifest"""
+
+    def __init__(self):
+        self.matched = []
+        # Contenuto identico ma ricodificato in UTF-8 (file originale in altra codifica)
+        self.reencoded = []
+        # (percorso, dettaglio)
+        self.mismatched = []
+        self.missing = []
+        # File inclusi solo in parte nel PDF (troncati o illeggibili)
+        self.partial = []
+
+    @property
+    def ok(self):
+        return not self.mismatched and not self.missing
+
+    @property
+    def checked(self):
+        return len(self.matched) + len(self.reencoded) + len(self.mismatched) + len(self.missing)
+
+    def check(self, path, expected, actual):
+        """Confronta una voce del manifest con (sha256, dimensione) del file, None se assente"""
+        if expected.get('partial'):
+            self.partial.append(path)
+        elif actual is None:
+            self.missing.append(path)
+        elif actual[0] == expected.get('sha256'):
+            self.matched.append(path)
+        elif actual[0] == expected.get('text_sha256'):
+            self.reencoded.append(path)
+        elif actual[1] != expected['size']:
+            self.mismatched.append((path, f"{expected['size']} -> {actual[1]} byte"))
+        else:
+            self.mismatched.append((path, "contenuto diverso, stessa dimensione"))
+
+    def summary(self):
+        """Riepilogo testuale per log e report"""
+        lines = [
+            f"File verificati: {self.checked}",
+            f"Identici: {len(self.matched)}",
+            f"Identici ricodificati in UTF-8: {len(self.reencoded)}",
+            f"Diversi: {len(self.mismatched)}",
+            f"Mancanti: {len(self.missing)}",
+            f"Non verificabili (inclusi in parte): {len(self.partial)}",
+        ]
+        for path, detail in self.mismatched:
+            lines.append(f"❌ {path}: {detail}")
+        for path in self.missing:
+            lines.append(f"❓ {path}: mancante")
+        return '\n'.join(lines)
+
+
+def verify_manifest(manifest, digest_for, workers=VERIFY_WORKERS):
+    """
+    Verifica ogni voce del manifest. digest_for(percorso posix) restituisce
+    (sha256, dimensione) oppure None se il file non esiste; viene chiamata
+    da un pool di thread.
+    """
+    def safe_digest(path):
+        try:
+            return digest_for(path)
+        except FileNotFoundError:
+            return None
+
+    result = VerificationResult()
+    paths = sorted(path for path, expected in manifest.items() if not expected.get('partial'))
+    for path in sorted(set(manifest) - set(paths)):
+        result.check(path, manifest[path], None)
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = list(pool.map(safe_digest, paths))
+    else:
+        digests = [safe_digest(path) for path in paths]
+    for path, actual in zip(paths, digests):
+        result.check(path, manifest[path], actual)
+    return result
+
+
+def verify_directory(root, manifest, workers=VERIFY_WORKERS):
+    """Verifica i file di una cartella di progetto rispetto al manifest"""
+    root = Path(root)
+    return verify_manifest(manifest, lambda path: digest_file(root / path), workers)
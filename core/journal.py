@@ -0,0 +1,116 @@
+"""
+Modulo per le scritture atomiche (file temporaneo + rename) e per il journal
+di ricostruzione, che permette di riprendere un ripristino interrotto
+"""
+
+import json
+import os
+from pathlib import Path
+
+# Nome del journal nella cartella del progetto ricostruito
+JOURNAL_FILE_NAME = '.syncronet_journal'
+JOURNAL_VERSION = 1
+
+
+def temporary_path(path):
+    """Percorso temporaneo nella stessa cartella: il rename finale resta atomico"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def atomic_write_text(path, text):
+    """Scrive il file con un nome temporaneo e lo rinomina: mai un file a metà"""
+    temp_path = temporary_path(path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ReconstructionJournal:
+    """
+    Journal JSON Lines nella cartella di output: un'intestazione con l'hash del PDF,
+    la fase di analisi completata e una riga per ogni file scritto. Le righe vengono
+    aggiunte dopo il rename del file, quindi ogni file elencato è completo.
+    """
+
+    def __init__(self, output_path, pdf_sha256, project_name):
+        self.path = Path(output_path) / JOURNAL_FILE_NAME
+        self.pdf_sha256 = pdf_sha256
+        self.project_name = project_name
+        self._file = None
+
+    def _read_completed(self):
+        """
+        File completati secondo il journal esistente; vuoto se di un altro PDF.
+        Restituisce anche la posizione (byte) dopo l'ultima riga completa e valida.
+        """
+        completed = set()
+        valid_end = 0
+        try:
+            with open(self.path, 'rb') as f:
+                line = f.readline()
+                header = json.loads(line)
+                if header.get('journal') != JOURNAL_VERSION or header.get('pdf_sha256') != self.pdf_sha256:
+                    return set(), 0
+                valid_end = f.tell()
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Ultima riga troncata dall'interruzione
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if 'file' in record:
+                        completed.add(record['file'])
+                    valid_end = f.tell()
+        except (OSError, ValueError):
+            pass
+        return completed, valid_end
+
+    def open(self, resume=False):
+        """
+        Apre il journal. Con resume restituisce i file già completati da un'esecuzione
+        interrotta dello stesso PDF; altrimenti il journal riparte da zero.
+        """
+        completed, valid_end = self._read_completed() if resume else (set(), 0)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if completed:
+            # Una riga troncata in coda viene scartata: i nuovi record iniziano su una riga nuova
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'journal': JOURNAL_VERSION, 'pdf_sha256': self.pdf_sha256,
+                          'project': self.project_name})
+            # Le pagine sono già state estratte e analizzate (e salvate nella cache degli snapshot)
+            self._append({'stage': 'parsed'})
+        return completed
+
+    def _append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def record_file(self, relative_path):
+        """Registra un file scritto e rinominato"""
+        self._append({'file': relative_path})
+
+    def close(self, completed=True):
+        """Chiude il journal; a ricostruzione completata senza errori lo elimina"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if completed:
+            _remove_quietly(self.path)
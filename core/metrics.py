@@ -0,0 +1,279 @@
+"""
+Modulo per le metriche in formato testo Prometheus: contatori e istogrammi alimentati
+da creazione, ricostruzione e gestione dei file, scritti in un file .prom alla fine
+di ogni operazione ed esposti facoltativamente su un endpoint locale /metrics
+"""
+
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from core.config import METRICS_FILE, METRICS_HOST, METRICS_PORT
+from core.journal import atomic_write_text
+
+# Limiti superiori (secondi) dei bucket degli istogrammi di durata
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """Contatore monotono con etichette"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def inc(self, value=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(value)}"
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, data):
+        with self._lock:
+            for key, value in data:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def subtract(self, data):
+        """Differenza rispetto a uno snapshot precedente (vedi MetricsRegistry.since)"""
+        before = {tuple(key): value for key, value in data}
+        return [[key, value - before.get(tuple(key), 0)] for key, value in self.snapshot()
+                if value != before.get(tuple(key), 0)]
+
+
+class Histogram:
+    """Istogramma con bucket cumulativi, somma e conteggio per combinazione di etichette"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # {etichette: [conteggi per bucket, somma, conteggio]}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Context manager che osserva la durata del blocco"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items())
+        for key, (bucket_counts, total, count) in items:
+            pairs = list(zip(self.labelnames, key))
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                yield f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(bound))])} {bucket_count}"
+            yield f"{self.name}_bucket{_format_labels(pairs + [('le', '+Inf')])} {count}"
+            yield f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(pairs)} {count}"
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(state[0]), state[1], state[2]] for key, state in self._values.items()]
+
+    def merge(self, data):
+        with self._lock:
+            for key, bucket_counts, total, count in data:
+                state = self._values.setdefault(tuple(key), [[0] * len(self.buckets), 0.0, 0])
+                state[0] = [a + b for a, b in zip(state[0], bucket_counts)]
+                state[1] += total
+                state[2] += count
+
+    def subtract(self, data):
+        before = {tuple(key): (bucket_counts, total, count) for key, bucket_counts, total, count in data}
+        result = []
+        for key, bucket_counts, total, count in self.snapshot():
+            old_counts, old_total, old_count = before.get(tuple(key), ([0] * len(self.buckets), 0.0, 0))
+            if count != old_count:
+                result.append([key, [a - b for a, b in zip(bucket_counts, old_counts)],
+                               total - old_total, count - old_count])
+        return result
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_labels', '_start')
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class MetricsRegistry:
+    """Insieme delle metriche del processo, nell'ordine di registrazione"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Restituisce le metriche nel formato testo di Prometheus"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path=METRICS_FILE):
+        """Scrive le metriche con rename atomico: il collector non legge mai un file a metà"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(path, self.render())
+        return path
+
+    def snapshot(self):
+        """Valori correnti in forma serializzabile (pickle/JSON), per unirli in un altro processo"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def since(self, snapshot):
+        """Incrementi avvenuti dopo lo snapshot indicato"""
+        return {name: metric.subtract(snapshot.get(name, [])) for name, metric in self._metrics.items()}
+
+    def merge(self, snapshot):
+        """Somma i valori raccolti da un altro processo (worker, batch, servizio)"""
+        for name, data in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(data)
+
+
+REGISTRY = MetricsRegistry()
+
+FILES = REGISTRY.counter('syncronet_files_total', 'File inclusi nel PDF o ricostruiti', ('operation',))
+BYTES = REGISTRY.counter('syncronet_bytes_total', 'Byte dei file inclusi nel PDF o ricostruiti', ('operation',))
+PAGES = REGISTRY.counter('syncronet_pages_total', 'Pagine PDF scritte o lette', ('operation',))
+LINES = REGISTRY.counter('syncronet_lines_total', 'Righe impaginate o ricostruite', ('operation',))
+SKIPPED_FILES = REGISTRY.counter('syncronet_skipped_files_total',
+                                 'File non inclusi (binari, troppo grandi, minificati)', ('reason',))
+ENCODING_FALLBACKS = REGISTRY.counter('syncronet_encoding_fallbacks_total',
+                                      'File decodificati con una codifica di ripiego')
+RESTORE_MISMATCHES = REGISTRY.counter('syncronet_restore_mismatches_total',
+                                      'File ricostruiti diversi dal manifest o mancanti', ('kind',))
+RUNS = REGISTRY.counter('syncronet_runs_total', 'Operazioni completate per esito', ('operation', 'status'))
+RUN_SECONDS = REGISTRY.histogram('syncronet_run_seconds', 'Durata delle operazioni', ('operation',))
+STAGE_SECONDS = REGISTRY.histogram('syncronet_stage_seconds', 'Durata delle fasi delle operazioni',
+                                   ('operation', 'stage'))
+
+
+def write_metrics_file(path=METRICS_FILE):
+    """Scrive il file .prom; un errore di scrittura non interrompe l'operazione"""
+    try:
+        return REGISTRY.write_textfile(path)
+    except OSError as e:
+        print(f"Avviso: impossibile scrivere le metriche: {e}")
+        return None
+
+
+def timed_run(operation):
+    """
+    Decoratore delle operazioni: durata ed esito (errore se solleva un'eccezione o
+    restituisce False), poi scrittura del file delle metriche
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = 'errore'
+            try:
+                result = function(*args, **kwargs)
+                if result is not False:
+                    status = 'ok'
+                return result
+            finally:
+                RUN_SECONDS.observe(time.perf_counter() - started, operation=operation)
+                RUNS.inc(operation=operation, status=status)
+                write_metrics_file()
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Espone /metrics su host:porta in un thread in background; restituisce il server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metriche su http://{host}:{server.server_address[1]}/metrics")
+    return server
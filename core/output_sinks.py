@@ -0,0 +1,154 @@
+"""
+Modulo per le destinazioni della ricostruzione: albero di cartelle (default),
+archivio zip o tar scritto in sequenza, oppure mappa dei file in memoria
+"""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from core.journal import atomic_write_text, temporary_path
+
+# Formati di output della ricostruzione
+OUTPUT_FORMATS = ('directory', 'zip', 'tar', 'tar.gz', 'tar.xz', 'memory')
+
+# Modalità di scrittura in flusso di tarfile per formato
+_TAR_MODES = {'tar': 'w|', 'tar.gz': 'w|gz', 'tar.xz': 'w|xz'}
+
+
+def _member_name(project_name, relative_path):
+    """Nome del membro nell'archivio: sempre posix, senza '..' né radice assoluta"""
+    parts = [part for part in PurePosixPath(str(relative_path).replace('\\', '/')).parts
+             if part not in ('/', '.', '..')]
+    return '/'.join([project_name, *parts])
+
+
+class DirectorySink:
+    """
+    Scrive i file ricostruiti in <cartella di output>/<progetto>; ogni file viene
+    scritto con un nome temporaneo e poi rinominato
+    """
+
+    def __init__(self, output_folder, project_name):
+        self.root = Path(output_folder) / project_name
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def location(self):
+        return self.root
+
+    def write_text(self, relative_path, text):
+        full_path = self.root / relative_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(full_path, text)
+
+    def close(self):
+        return self.root
+
+
+class ZipSink:
+    """
+    Scrive i file direttamente in un archivio zip (percorso o file binario aperto).
+    Un archivio su disco compare con il suo nome solo quando è completo.
+    """
+
+    def __init__(self, target, project_name):
+        self.target = target
+        self.project_name = project_name
+        self._temp_path = temporary_path(target) if isinstance(target, (str, Path)) else None
+        self.archive = zipfile.ZipFile(self._temp_path or target, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.date_time = time.localtime()[:6]
+
+    @property
+    def location(self):
+        return self.target
+
+    def write_text(self, relative_path, text):
+        info = zipfile.ZipInfo(_member_name(self.project_name, relative_path), self.date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        self.archive.writestr(info, text.encode('utf-8'))
+
+    def close(self):
+        self.archive.close()
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.target)
+        return self.target
+
+
+class TarSink:
+    """
+    Scrive i file in un archivio tar in modalità flusso (percorso o file binario aperto).
+    Su disco l'archivio viene scritto con un nome temporaneo nella stessa cartella e
+    rinominato alla chiusura: compare con il suo nome solo quando è completo.
+    """
+
+    def __init__(self, target, project_name, output_format='tar'):
+        self.target = target
+        self.project_name = project_name
+        self.mtime = int(time.time())
+        self._temp_path = temporary_path(target) if isinstance(target, (str, Path)) else None
+        if self._temp_path is not None:
+            self.archive = tarfile.open(str(self._temp_path), _TAR_MODES[output_format])
+        else:
+            self.archive = tarfile.open(fileobj=target, mode=_TAR_MODES[output_format])
+
+    @property
+    def location(self):
+        return self.target
+
+    def write_text(self, relative_path, text):
+        data = text.encode('utf-8')
+        info = tarfile.TarInfo(_member_name(self.project_name, relative_path))
+        info.size = len(data)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.target)
+        return self.target
+
+
+class MemorySink:
+    """Conserva i file in un dizionario {percorso posix: byte UTF-8}"""
+
+    def __init__(self, project_name=None):
+        self.project_name = project_name
+        self.files = {}
+
+    @property
+    def location(self):
+        return f"<memoria: {len(self.files)} file>"
+
+    def write_text(self, relative_path, text):
+        self.files[PurePosixPath(str(relative_path).replace('\\', '/')).as_posix()] = text.encode('utf-8')
+
+    def close(self):
+        return self.files
+
+
+def create_sink(output_format, output, project_name):
+    """
+    Crea la destinazione per il formato richiesto. Per 'directory' output è la
+    cartella che conterrà <progetto>; per gli archivi è la cartella in cui creare
+    <progetto>.<formato>, il percorso dell'archivio o un file binario aperto.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato di output non valido: {output_format}")
+    if output_format == 'directory':
+        return DirectorySink(output, project_name)
+    if output_format == 'memory':
+        return MemorySink(project_name)
+
+    target = output
+    if isinstance(output, (str, Path)) and not str(output).lower().endswith(f".{output_format}"):
+        Path(output).mkdir(parents=True, exist_ok=True)
+        target = Path(output) / f"{project_name}.{output_format}"
+    if output_format == 'zip':
+        return ZipSink(target, project_name)
+    return TarSink(target, project_name, output_format)
@@ -3,24 +3,75 @@ Modulo per la conversione di progetti in documenti PDF
 """
 
 import os
+import codecs
+import datetime
+import hashlib
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
 import subprocess
 import sys
 from pathlib import Path
-from fpdf import FPDF
-from core.file_manager import FileManager
-from core.config import SUPPORTED_ENCODINGS, MAX_LINE_WIDTH
+from core.file_manager import FileManager, SKIP_MINIFIED, is_minified_content
+from core.config import (MAX_LINE_WIDTH, MAX_TEXT_FILE_SIZE, CACHE_DIR, PDF_CREATOR,
+                         STREAMING_THRESHOLD, STREAM_CHUNK_SIZE,
+                         SNAPSHOT_FORMAT_VERSION, WRAP_CONTINUATION_MARKER, MINIFIED_POLICIES,
+                         MINIFIED_FILE_POLICY, MINIFIED_TRUNCATE_BYTES, COMPACT_FONT_SIZE,
+                         COMPACT_LINE_WIDTH, COMPACT_LINE_HEIGHT)
+from core.encoding_detector import BINARY, EncodingCache, detect_encoding
 from core.emoji_mapping import EMOJI_MAPPING, REVERSE_EMOJI_MAPPING
+from core.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from core.delta import DELTA_ADDED, DELTA_KEY, DELTA_MODIFIED, compute_delta, load_base_manifest
+from core.integrity import MANIFEST_KEY, manifest_entry, manifest_id
+from core.journal import temporary_path
+from core.metrics import (BYTES, ENCODING_FALLBACKS, FILES, LINES, PAGES, REGISTRY, SKIPPED_FILES,
+                          STAGE_SECONDS, timed_run)
+from core.pdf_document import SnapshotPDF
+from core.planner import CapacityPlanner
+from core.sources import (SOURCE_MODES, ArchiveSource, FileEntry, as_entry, is_archive, list_git_index_entries,
+                          list_git_revision_entries, project_name)
+
+# Descrizione nel report dell'azione applicata ai file minificati
+MINIFIED_ACTIONS = {'compact': 'layout compatto', 'truncate': 'troncato', 'skip': 'saltato'}
+
+# Font usati nel documento, registrati sempre in quest'ordine (vedi SnapshotPDF.register_fonts)
+DOCUMENT_FONTS = (('Arial', ''), ('Arial', 'B'), ('Courier', ''))
+
+# Gruppi di file per processo nella creazione parallela (bilanciamento del carico)
+GROUPS_PER_WORKER = 4
 
 class PDFConverter:
     """Gestisce la conversione di progetti in PDF"""
     
     def __init__(self):
-        self.pdf = FPDF()
-        self.pdf.set_auto_page_break(auto=True, margin=15)
+        self.pdf = self._new_document()
         self.file_manager = FileManager()
+        self.instrumentation = NULL_INSTRUMENTATION
+        self.encoding_cache = EncodingCache(Path(CACHE_DIR) / 'encodings.json')
+        self.minified_policy = MINIFIED_FILE_POLICY
+        # Dimensione oltre la quale i file vengono letti a blocchi
+        self.streaming_threshold = STREAMING_THRESHOLD
+        # File minificati incontrati nell'ultima creazione: (percorso relativo, politica)
+        self.minified_files = []
         # Crea la cartella Saved all'inizializzazione
         self._ensure_saved_directory()
     
+    def _new_document(self):
+        """Crea un nuovo documento con Creator e metadati di SyncroNet"""
+        pdf = SnapshotPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.set_creator(PDF_CREATOR)
+        pdf.register_fonts(DOCUMENT_FONTS)
+        pdf.snapshot_metadata = {
+            'format': SNAPSHOT_FORMAT_VERSION,
+            'wrap_marker': WRAP_CONTINUATION_MARKER,
+            # Lunghezza originale delle righe spezzate: {file: {numero riga: caratteri}}
+            'wrapped_lines': {},
+            # SHA-256 e dimensione dei file inclusi: {percorso posix: voce}
+            MANIFEST_KEY: {}
+        }
+        return pdf
+    
     def _ensure_saved_directory(self):
         """Crea la cartella Saved se non esiste"""
         saved_dir = Path("saved")
@@ -31,8 +82,7 @@ class PDFConverter:
         if custom_output_path:
             return custom_output_path
         
-        project_name = Path(project_path).name
-        pdf_filename = f"{project_name}_Snapshot.pdf"
+        pdf_filename = f"{project_name(project_path)}_Snapshot.pdf"
         return Path("saved") / pdf_filename
     
     def _open_pdf(self, pdf_path):
@@ -98,13 +148,29 @@ class PDFConverter:
         
         return found_exclusions
     
+    @timed_run('create')
     def create_project_pdf(self, project_path, output_pdf=None, custom_exclusions=None, 
-                          progress_callback=None, include_excluded=False, open_after_creation=True):
-        """Crea un PDF dal progetto"""
+                          progress_callback=None, include_excluded=False, open_after_creation=True,
+                          profile=False, profile_capture=None, max_file_size=None,
+                          minified_policy=None, workers=1, source='directory', revision=None,
+                          remote_workers=None):
+        """
+        Crea un PDF dal progetto.
+        Con profile=True raccoglie tempi per fase e contatori (vedi self.instrumentation);
+        profile_capture ('cprofile' o 'tracemalloc') salva anche i dump accanto al PDF.
+        max_file_size (byte) sostituisce MAX_TEXT_FILE_SIZE per questa esecuzione.
+        minified_policy ('compact', 'truncate' o 'skip') sostituisce MINIFIED_FILE_POLICY.
+        Con workers > 1 i file vengono impaginati a gruppi in processi separati e le
+        pagine unite nell'ordine originale; con remote_workers (indirizzi 'host:porta')
+        i gruppi vengono inviati a worker anche su altri host (vedi core.distributed).
+        source='git' elenca i file tracciati dall'indice git invece di percorrere la cartella;
+        con revision (commit o tag) i file vengono letti dal repository senza checkout.
+        Se project_path è un archivio zip/tar (source='archive') i membri vengono letti
+        senza estrarli e le esclusioni si applicano ai loro percorsi prima della lettura.
+        """
         # Applica esclusioni personalizzate
         # REINIZIALIZZA il PDF ogni volta per evitare accumulo di pagine
-        self.pdf = FPDF()
-        self.pdf.set_auto_page_break(auto=True, margin=15)
+        self.pdf = self._new_document()
         if custom_exclusions:
             self.file_manager.update_exclusions(**custom_exclusions)
         
@@ -113,65 +179,393 @@ class PDFConverter:
         if not project_path.exists():
             raise ValueError(f"La cartella '{project_path}' non esiste.")
         
-        # Determina il percorso di output (usa sempre la cartella Saved)
-        final_output_pdf = self._get_saved_pdf_path(project_path, output_pdf)
+        if revision is not None:
+            source = 'git'
+        elif is_archive(project_path):
+            source = 'archive'
+        if source not in SOURCE_MODES:
+            raise ValueError(f"Sorgente non valida: {source}")
         
-        # Scansiona il progetto per trovare esclusioni effettive
-        actual_exclusions = self._scan_project_exclusions(project_path)
+        policy = minified_policy or MINIFIED_FILE_POLICY
+        if policy not in MINIFIED_POLICIES:
+            raise ValueError(f"Politica per i file minificati non valida: {policy}")
+        self.minified_policy = policy
+        self.minified_files = []
         
-        # Conta i file totali
-        if include_excluded:
-            # Se include_excluded è True, conta tutti i file
-            total_files = sum(1 for _ in project_path.rglob('*') if _.is_file())
+        # Strumentazione: a costo zero se disattivata
+        if profile or profile_capture:
+            self.instrumentation = Instrumentation(profile_capture)
         else:
-            # Altrimenti conta solo i file non esclusi
-            total_files = self.file_manager.count_project_files(project_path)     
+            self.instrumentation = NULL_INSTRUMENTATION
+        instrumentation = self.instrumentation
+        instrumentation.start()
+        archive = None
         
-        processed_count = 0
+        try:
+            # Determina il percorso di output (usa sempre la cartella Saved)
+            final_output_pdf = self._get_saved_pdf_path(project_path, output_pdf)
+            
+            self.file_manager.max_text_file_size = (
+                max_file_size if max_file_size is not None else MAX_TEXT_FILE_SIZE
+            )
+            
+            # File saltati perché binari o troppo grandi: (percorso relativo, motivo)
+            skipped_files = []
+            
+            with instrumentation.span('walk'), STAGE_SECONDS.time(operation='create', stage='walk'):
+                # Le esclusioni effettive servono solo per la pagina titolo
+                actual_exclusions = self._scan_project_exclusions(project_path) if include_excluded else None
+                
+                if source == 'git':
+                    # Solo file tracciati: l'output di build non tracciato non viene visitato
+                    if revision is not None:
+                        entries = list_git_revision_entries(project_path, revision)
+                    else:
+                        entries = list_git_index_entries(project_path)
+                    included_files = list(self.file_manager.filter_entries(entries, skipped_files, project_path))
+                elif source == 'archive':
+                    # I membri esclusi vengono scartati dall'intestazione; l'archivio resta
+                    # aperto (zip) o copiato in un file temporaneo (tar) fino alla fine della creazione
+                    archive = ArchiveSource(project_path)
+                    entries = archive.list_entries(self.file_manager.make_path_filter(),
+                                                   self.file_manager.max_text_file_size)
+                    included_files = list(self.file_manager.filter_entries(entries, skipped_files))
+                else:
+                    # Elenco dei file inclusi: le cartelle escluse non vengono visitate
+                    # e i file binari sono riconosciuti leggendo solo i primi KB
+                    included_files = list(self.file_manager.iter_project_files(project_path, skipped_files))
+            
+            instrumentation.count('skipped_files', len(skipped_files))
+            total_files = len(included_files)
+            render_started = time.perf_counter()
+            
+            # Pagina titolo
+            self._add_title_page(project_path, final_output_pdf, include_excluded, actual_exclusions, skipped_files)
+            
+            # Elenco file processati
+            processed_files = []
+            
+            # Processa tutti i file
+            with STAGE_SECONDS.time(operation='create', stage='render'):
+                if remote_workers and total_files > 0:
+                    file_results = self._render_files_distributed(included_files, remote_workers, progress_callback)
+                elif workers > 1 and total_files > 1:
+                    file_results = self._render_files_parallel(included_files, workers, progress_callback)
+                else:
+                    file_results = self._render_files(included_files, progress_callback)
+            
+            for relative_path, skip_reason in file_results:
+                if skip_reason:
+                    skipped_files.append((relative_path, skip_reason))
+                    SKIPPED_FILES.inc(reason=skip_reason)
+                else:
+                    processed_files.append(relative_path)
+                    instrumentation.count('files')
+            
+            # Salva il PDF
+            instrumentation.count('pages', self.pdf.page)
+            metadata = self.pdf.snapshot_metadata
+            metadata['snapshot_id'] = manifest_id(metadata[MANIFEST_KEY])
+            self._record_run_metrics('create', len(processed_files), metadata[MANIFEST_KEY].values())
+            with instrumentation.span('output'), STAGE_SECONDS.time(operation='create', stage='output'):
+                self._output_pdf_atomic(final_output_pdf)
+            
+            # Calibrazione della stima (solo esecuzioni in un processo, come le stime)
+            if workers <= 1 and not remote_workers and not instrumentation.enabled:
+                CapacityPlanner().record_run(len(processed_files), self.pdf.page, os.path.getsize(final_output_pdf),
+                                             time.perf_counter() - render_started)
+            
+            self.encoding_cache.save()
+            instrumentation.stop(final_output_pdf)
+        except BaseException:
+            # Errore: cProfile/tracemalloc vengono fermati senza salvare i dump
+            instrumentation.stop()
+            raise
+        finally:
+            if archive is not None:
+                archive.close()
+        self.write_creation_report(final_output_pdf, project_path, processed_files, skipped_files)
+        
+        # Apri il PDF dopo la creazione se richiesto
+        if open_after_creation:
+            self._open_pdf(final_output_pdf)
+        
+        return len(processed_files), str(final_output_pdf)
+    
+    def plan_project_pdf(self, project_path, custom_exclusions=None, max_file_size=None, minified_policy=None):
+        """
+        Stima pagine, righe spezzate, dimensione del PDF e durata senza creare il PDF
+        (vedi core.planner.CapacityPlanner), con le stesse esclusioni della creazione.
+        Restituisce un CapacityPlan con i file e le cartelle che pesano di più.
+        """
+        if custom_exclusions:
+            self.file_manager.update_exclusions(**custom_exclusions)
+        
+        project_path = Path(project_path)
+        if not project_path.is_dir():
+            raise ValueError(f"La cartella '{project_path}' non esiste.")
+        
+        policy = minified_policy or MINIFIED_FILE_POLICY
+        if policy not in MINIFIED_POLICIES:
+            raise ValueError(f"Politica per i file minificati non valida: {policy}")
+        self.file_manager.max_text_file_size = (
+            max_file_size if max_file_size is not None else MAX_TEXT_FILE_SIZE
+        )
+        return CapacityPlanner().plan(project_path, self.file_manager, self._new_document(), policy)
+    
+    @timed_run('delta')
+    def create_delta_pdf(self, base_manifest_or_pdf, project_path, output_pdf=None, custom_exclusions=None,
+                         progress_callback=None, open_after_creation=False, max_file_size=None,
+                         minified_policy=None, skip_unchanged=False):
+        """
+        Crea un PDF delta rispetto a uno snapshot precedente: base_manifest_or_pdf è il
+        PDF base (completo o delta), un file .json con il manifest o il dizionario del
+        manifest. Vengono impaginati solo i file aggiunti o modificati, con l'elenco dei
+        file eliminati nella pagina titolo e nei metadati.
+        I file con dimensione e mtime invariati non vengono letti né impaginati, quindi il
+        tempo dipende dalle modifiche (più la visita delle cartelle). Il manifest del nuovo
+        stato è completo: il delta può fare da base al successivo.
+        Con skip_unchanged, se non è cambiato nulla non viene scritto alcun PDF e
+        viene restituito (0, None).
+        """
+        self.pdf = self._new_document()
+        if custom_exclusions:
+            self.file_manager.update_exclusions(**custom_exclusions)
+        
+        project_path = Path(project_path)
+        if not project_path.is_dir():
+            raise ValueError(f"La cartella '{project_path}' non esiste.")
+        
+        policy = minified_policy or MINIFIED_FILE_POLICY
+        if policy not in MINIFIED_POLICIES:
+            raise ValueError(f"Politica per i file minificati non valida: {policy}")
+        self.minified_policy = policy
+        self.minified_files = []
+        self.instrumentation = NULL_INSTRUMENTATION
+        self.file_manager.max_text_file_size = (
+            max_file_size if max_file_size is not None else MAX_TEXT_FILE_SIZE
+        )
         
-        # Pagina titolo
-        self._add_title_page(project_path, final_output_pdf, include_excluded, actual_exclusions)
+        base_manifest, base_id = load_base_manifest(base_manifest_or_pdf)
+        
+        if output_pdf is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_pdf = Path("saved") / f"{project_name(project_path)}_Delta_{timestamp}.pdf"
+        
+        skipped_files = []
+        included_files = self.file_manager.iter_project_files(project_path, skipped_files)
+        with STAGE_SECONDS.time(operation='delta', stage='walk'):
+            changed_files, unchanged, deleted = compute_delta(base_manifest, included_files)
+        added = [Path(relative_path).as_posix() for _, relative_path, state in changed_files
+                 if state == DELTA_ADDED]
+        modified = [Path(relative_path).as_posix() for _, relative_path, state in changed_files
+                    if state == DELTA_MODIFIED]
+        print(f"🔀 Delta: {len(added)} aggiunti, {len(modified)} modificati, "
+              f"{len(deleted)} eliminati, {len(unchanged)} invariati")
+        if skip_unchanged and not changed_files and not deleted:
+            return 0, None
+        
+        self._add_delta_title_page(project_path, output_pdf, base_id, added, modified, deleted)
         
-        # Elenco file processati
         processed_files = []
-        excluded_files_found = []
+        with STAGE_SECONDS.time(operation='delta', stage='render'):
+            file_results = self._render_files([(file_path, relative_path)
+                                               for file_path, relative_path, _ in changed_files], progress_callback)
+        for relative_path, skip_reason in file_results:
+            if skip_reason:
+                skipped_files.append((relative_path, skip_reason))
+                SKIPPED_FILES.inc(reason=skip_reason)
+            else:
+                processed_files.append(relative_path)
         
-        # Processa tutti i file
-        for file_path in project_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(project_path)
-                
-                is_excluded = self.file_manager.should_exclude(file_path, relative_path)
-                
-                if not is_excluded:
-                    self._add_file_to_pdf(file_path, relative_path)
-                    processed_files.append(str(relative_path))
-                else:
-                    # Registra i file esclusi trovati (per debug/informazioni)
-                    excluded_files_found.append(str(relative_path))
+        # Manifest completo del nuovo stato: voci invariate della base + file impaginati
+        metadata = self.pdf.snapshot_metadata
+        self._record_run_metrics('delta', len(processed_files), metadata[MANIFEST_KEY].values())
+        metadata[MANIFEST_KEY].update(unchanged)
+        metadata['snapshot_id'] = manifest_id(metadata[MANIFEST_KEY])
+        metadata[DELTA_KEY] = {
+            'base_snapshot_id': base_id,
+            'added': added,
+            'modified': modified,
+            'deleted': deleted
+        }
+        with STAGE_SECONDS.time(operation='delta', stage='output'):
+            self._output_pdf_atomic(output_pdf)
+        self.encoding_cache.save()
+        self.write_creation_report(output_pdf, project_path, processed_files, skipped_files)
+        
+        if open_after_creation:
+            self._open_pdf(output_pdf)
+        
+        return len(processed_files), str(output_pdf)
+    
+    def _render_files(self, included_files, progress_callback=None):
+        """Impagina i file nel processo corrente; restituisce (percorso relativo, motivo di esclusione)"""
+        total_files = len(included_files)
+        results = []
+        for processed_count, (file_path, relative_path) in enumerate(included_files, 1):
+            skip_reason = self._add_file_to_pdf(file_path, relative_path)
+            results.append((str(relative_path), skip_reason))
 
-                # Aggiorna il progresso
-                processed_count += 1
+            # Aggiorna il progresso
+            if progress_callback:
+                progress_callback(processed_count, total_files)
+        return results
+    
+    def _record_run_metrics(self, operation, files_processed, manifest_entries):
+        """File, byte letti (dal manifest, anche per i gruppi dei worker) e pagine del PDF"""
+        FILES.inc(files_processed, operation=operation)
+        BYTES.inc(sum(entry['size'] for entry in manifest_entries), operation=operation)
+        PAGES.inc(self.pdf.page, operation=operation)
+    
+    def _render_files_parallel(self, included_files, workers, progress_callback=None):
+        """
+        Impagina gruppi contigui di file in un pool di processi. Ogni gruppo inizia su
+        una nuova pagina; le pagine, i metadati e i contatori dei worker vengono uniti
+        nell'ordine dei file.
+        """
+        groups = self._split_file_groups(included_files, workers * GROUPS_PER_WORKER)
+        options = {
+            'minified_policy': self.minified_policy,
+            'streaming_threshold': self.streaming_threshold,
+            'profile': self.instrumentation.enabled
+        }
+        total_files = len(included_files)
+        processed_count = 0
+        results = []
+        
+        print(f"⚙️ Impaginazione parallela: {len(groups)} gruppi su {workers} processi")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(options,)) as executor:
+            for group_result in executor.map(_render_file_group, groups):
+                self._merge_group_result(group_result)
+                results.extend(group_result['results'])
+                
+                processed_count += len(group_result['results'])
                 if progress_callback:
                     progress_callback(processed_count, total_files)
         
-        # Salva il PDF
-        self.pdf.output(str(final_output_pdf))
+        return results
+    
+    def _merge_group_result(self, group_result, merge_encodings=True, merge_metrics=True):
+        """Accoda pagine, metadati e contatori di un gruppo impaginato da un worker"""
+        with self.instrumentation.span('merge'):
+            self.pdf.append_pages(group_result['pages'])
+            self.pdf.snapshot_metadata['wrapped_lines'].update(group_result['wrapped_lines'])
+            self.pdf.snapshot_metadata[MANIFEST_KEY].update(group_result['manifest'])
+            self.minified_files.extend(group_result['minified_files'])
+            if merge_encodings:
+                for key, encoding in group_result['encodings'].items():
+                    self.encoding_cache.put(key, encoding)
+            if group_result['instrumentation']:
+                self.instrumentation.merge(group_result['instrumentation'])
+            if merge_metrics:
+                REGISTRY.merge(group_result['metrics'])
+    
+    def _render_files_distributed(self, included_files, remote_workers, progress_callback=None):
+        """
+        Impagina gruppi contigui di file su worker remoti (vedi core.distributed) e
+        unisce le pagine nell'ordine dei file, come _render_files_parallel
+        """
+        from core.distributed import RenderCoordinator
         
-        # Apri il PDF dopo la creazione se richiesto
-        if open_after_creation:
-            self._open_pdf(final_output_pdf)
+        groups = self._split_file_groups(included_files, len(remote_workers) * GROUPS_PER_WORKER)
+        options = {
+            'minified_policy': self.minified_policy,
+            'streaming_threshold': self.streaming_threshold,
+            'profile': self.instrumentation.enabled
+        }
+        total_files = len(included_files)
+        results = []
         
-        return len(processed_files), str(final_output_pdf)
+        def merge(group_result, mtimes, remote):
+            # I worker ricevono i file in memoria: l'mtime per i delta viene dal disco locale
+            manifest = group_result['manifest']
+            for relative_path, mtime_ns in mtimes.items():
+                if relative_path in manifest:
+                    manifest[relative_path]['mtime_ns'] = mtime_ns
+            # Le chiavi delle codifiche dei worker remoti non corrispondono ai file locali;
+            # i gruppi impaginati localmente hanno già aggiornato le metriche di questo processo
+            self._merge_group_result(group_result, merge_encodings=not remote, merge_metrics=remote)
+            results.extend(group_result['results'])
+            if progress_callback:
+                progress_callback(len(results), total_files)
+        
+        print(f"🌐 Impaginazione distribuita: {len(groups)} gruppi su {len(remote_workers)} worker")
+        RenderCoordinator(remote_workers).render(groups, options, merge)
+        return results
     
-    def _add_title_page(self, project_path, output_pdf, include_excluded, actual_exclusions):
+    @staticmethod
+    def _split_file_groups(included_files, group_count):
+        """Divide i file in gruppi contigui di dimensione totale simile"""
+        sizes = []
+        for file_path, relative_path in included_files:
+            try:
+                sizes.append(as_entry(file_path, relative_path).size)
+            except OSError:
+                sizes.append(0)
+        target = max(1, sum(sizes) // max(1, group_count))
+        
+        groups = []
+        current = []
+        current_size = 0
+        for entry, size in zip(included_files, sizes):
+            current.append(entry)
+            current_size += size
+            if current_size >= target:
+                groups.append(current)
+                current = []
+                current_size = 0
+        if current:
+            groups.append(current)
+        return groups
+    
+    def write_creation_report(self, pdf_path, project_path, processed_files, skipped_files=()):
+        """Scrive il report di creazione accanto al PDF"""
+        pdf_path = Path(pdf_path)
+        report_path = pdf_path.with_name(f"{pdf_path.stem}_REPORT.txt")
+        
+        report_content = f"""CREAZIONE PDF DA PROGETTO
+=========================
+
+Nome progetto: {project_name(project_path)}
+Data creazione: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Cartella progetto: {project_path.absolute()}
+PDF generato: {pdf_path}
+File inclusi: {len(processed_files)}
+File saltati: {len(skipped_files)}
+Pagine: {self.pdf.page}
+"""
+        
+        if skipped_files:
+            report_content += "\nFILE SALTATI:\n-------------\n"
+            for relative_path, reason in skipped_files:
+                report_content += f"- {relative_path} ({reason})\n"
+        
+        if self.minified_files:
+            report_content += "\nFILE MINIFICATI:\n----------------\n"
+            for relative_path, policy in self.minified_files:
+                report_content += f"- {relative_path} ({MINIFIED_ACTIONS[policy]})\n"
+        
+        if self.instrumentation.enabled:
+            report_content += f"""
+PROFILO PRESTAZIONI:
+--------------------
+{self.instrumentation.summary()}
+"""
+        
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report_content)
+        return report_path
+    
+    def _add_title_page(self, project_path, output_pdf, include_excluded, actual_exclusions, skipped_files=()):
         """Aggiunge la pagina titolo al PDF"""
         self.pdf.add_page()
         self.pdf.set_font('Arial', 'B', 20)
         self.pdf.cell(0, 20, "DOCUMENTAZIONE PROGETTO PYTHON", ln=True, align='C')
         self.pdf.ln(10)
         self.pdf.set_font('Arial', '', 12)
-        self.pdf.cell(0, 10, f'Progetto: {project_path.name}', ln=True)
+        self.pdf.cell(0, 10, f'Progetto: {project_name(project_path)}', ln=True)
         self.pdf.cell(0, 10, f'Cartella: {project_path.absolute()}', ln=True)
         self.pdf.cell(0, 10, f'PDF salvato in: {output_pdf}', ln=True)
         self.pdf.cell(0, 10, f'File esclusi inclusi: {"SI" if include_excluded else "NO"}', ln=True)
@@ -180,6 +574,45 @@ class PDFConverter:
         # Aggiungi informazioni sulle esclusioni SOLO se stiamo includendo i file esclusi
         if include_excluded:
             self._add_exclusions_info(actual_exclusions)
+        
+        if skipped_files:
+            self._add_skipped_files_info(skipped_files)
+    
+    def _add_delta_title_page(self, project_path, output_pdf, base_id, added, modified, deleted):
+        """Aggiunge la pagina titolo di un PDF delta con l'elenco dei file eliminati"""
+        self.pdf.add_page()
+        self.pdf.set_font('Arial', 'B', 20)
+        self.pdf.cell(0, 20, "DELTA PROGETTO PYTHON", ln=True, align='C')
+        self.pdf.ln(10)
+        self.pdf.set_font('Arial', '', 12)
+        self.pdf.cell(0, 10, f'Progetto: {project_name(project_path)}', ln=True)
+        self.pdf.cell(0, 10, f'Cartella: {project_path.absolute()}', ln=True)
+        self.pdf.cell(0, 10, f'PDF salvato in: {output_pdf}', ln=True)
+        self.pdf.cell(0, 10, f'Snapshot base: {base_id[:16]}', ln=True)
+        self.pdf.cell(0, 10, f'File aggiunti: {len(added)} - modificati: {len(modified)} - '
+                             f'eliminati: {len(deleted)}', ln=True)
+        self.pdf.ln(10)
+        
+        if deleted:
+            self.pdf.set_font('Arial', 'B', 14)
+            self.pdf.cell(0, 10, "FILE ELIMINATI:", ln=True)
+            self.pdf.ln(5)
+            self.pdf.set_font('Arial', '', 10)
+            for relative_path in deleted:
+                self.pdf.cell(0, 5, f" - {self._clean_text_for_pdf(relative_path)}", ln=True)
+            self.pdf.ln(10)
+    
+    def _add_skipped_files_info(self, skipped_files):
+        """Elenca i file non inclusi perché binari o troppo grandi"""
+        self.pdf.set_font('Arial', 'B', 14)
+        self.pdf.cell(0, 10, "FILE SALTATI (binari o troppo grandi):", ln=True)
+        self.pdf.ln(5)
+        self.pdf.set_font('Arial', '', 10)
+        
+        for relative_path, reason in skipped_files:
+            self.pdf.cell(0, 5, f" - {self._clean_text_for_pdf(relative_path)} ({reason})", ln=True)
+        
+        self.pdf.ln(10)
     
     def _add_exclusions_info(self, actual_exclusions):
         """Aggiunge informazioni sulle esclusioni EFFETTIVE trovate nel progetto"""
@@ -227,14 +660,39 @@ class PDFConverter:
         self.pdf.ln(10)
     
     def _add_file_to_pdf(self, file_path, relative_path):
-        """Aggiunge un file al PDF"""
+        """
+        Aggiunge un file al PDF.
+        Restituisce SKIP_MINIFIED se il file è minificato e la politica è 'skip', altrimenti None.
+        """
+        instrumentation = self.instrumentation
         try:
+            entry = as_entry(file_path, relative_path)
+            
+            # I file molto grandi vengono letti e impaginati a blocchi
+            if entry.size > self.streaming_threshold:
+                return self._add_streamed_file_to_pdf(entry, relative_path)
+
             # Leggi il contenuto del file
-            content = self._read_file_content(file_path)
+            with instrumentation.span('decode'):
+                content = self._read_file_content(entry)
+
+            # File minificati/generati: layout compatto, troncamento o esclusione
+            compact = False
+            if is_minified_content(content):
+                if self._register_minified_file(relative_path) == 'skip':
+                    self.pdf.snapshot_metadata[MANIFEST_KEY].pop(entry.relative_path.as_posix(), None)
+                    return SKIP_MINIFIED
+                if self.minified_policy == 'truncate':
+                    truncated = self._truncate_content(content, MINIFIED_TRUNCATE_BYTES)
+                    if truncated is not content:
+                        self._add_manifest_entry(entry, None, entry.size, partial='truncate')
+                    content = truncated
+                compact = True
 
             # Pulisci il testo PRIMA di qualsiasi operazione
-            content = self._clean_text_for_pdf(content)
-            relative_path_str = self._clean_text_for_pdf(str(relative_path))
+            with instrumentation.span('escape'):
+                content = self._clean_text_for_pdf(content)
+                relative_path_str = self._clean_text_for_pdf(str(relative_path))
 
             # Controlla se il contenuto è vuoto
             if not content.strip():
@@ -245,101 +703,302 @@ class PDFConverter:
                 self.pdf.ln(5)
                 self.pdf.set_font('Arial', '', 10)
                 self.pdf.cell(0, 10, 'File vuoto', ln=True)
-                return
+                return None
 
-            # Aggiungi una nuova pagina SOLO se necessario
-            # Controlla se c'è spazio sufficiente nella pagina corrente
-            current_y = self.pdf.get_y()
-            page_height = self.pdf.h - 2 * self.pdf.b_margin
-            
-            # Stima dell'altezza necessaria: intestazione (20) + spazio (10) + almeno 5 righe (20)
-            estimated_height = 50
-            
-            if current_y + estimated_height > page_height:
-                self.pdf.add_page()
-            
-            # Intestazione del file
-            self.pdf.set_font('Arial', 'B', 14)
-            self.pdf.cell(0, 10, f'File: {relative_path_str}', ln=True)
-            self.pdf.ln(5)
+            # Dividi il contenuto in linee (già pulite: la pulizia produce solo ASCII)
+            self._render_file_lines(content.split('\n'), relative_path_str, compact)
 
-            # Contenuto del file
-            self.pdf.set_font('Courier', '', 8)
+        except Exception as e:
+            self._add_file_error(relative_path, e)
+            self._add_manifest_entry(as_entry(file_path, relative_path), None, 0, partial='error')
+        return None
 
-            # Dividi il contenuto in linee
-            lines = content.split('\n')
-            line_height = 4
-            
-            for i, line in enumerate(lines, 1):
-                clean_line = self._clean_text_for_pdf(line)
-                
+    def _output_pdf_atomic(self, pdf_path):
+        """Scrittura atomica: un PDF esistente non viene mai lasciato a metà"""
+        temp_pdf = temporary_path(pdf_path)
+        try:
+            self.pdf.output(str(temp_pdf))
+            os.replace(temp_pdf, pdf_path)
+        except BaseException:
+            if temp_pdf.exists():
+                temp_pdf.unlink()
+            raise
+
+    def _add_manifest_entry(self, entry, sha256, size, text_sha256=None, partial=None):
+        """Registra nel manifest l'hash dei byte originali del file"""
+        mtime_ns = None
+        if isinstance(entry, FileEntry):
+            try:
+                mtime_ns = os.stat(entry.path).st_mtime_ns
+            except OSError:
+                pass
+        self.pdf.snapshot_metadata[MANIFEST_KEY][entry.relative_path.as_posix()] = manifest_entry(
+            sha256, size, text_sha256, partial, mtime_ns
+        )
+
+    def _add_streamed_file_to_pdf(self, entry, relative_path):
+        """
+        Aggiunge un file molto grande leggendolo a blocchi di STREAM_CHUNK_SIZE byte,
+        con decodifica incrementale e impaginazione riga per riga: la memoria usata
+        dipende dalla riga più lunga, non dalla dimensione del file.
+        """
+        instrumentation = self.instrumentation
+        instrumentation.count('streamed_files')
+        relative_path_str = self._clean_text_for_pdf(str(relative_path))
+
+        with instrumentation.span('decode'):
+            encoding = self._detect_stream_encoding(entry)
+        if encoding == BINARY:
+            message = f'Impossibile leggere il file {entry} - formato binario o codifica sconosciuta'
+            self._render_file_lines([message], relative_path_str, False)
+            self._add_manifest_entry(entry, None, entry.size, partial='error')
+            return None
+
+        chunks = self._iter_decoded_chunks(entry, encoding)
+        first_chunk = next(chunks, '')
+
+        compact = False
+        if is_minified_content(first_chunk):
+            if self._register_minified_file(relative_path) == 'skip':
+                chunks.close()
+                return SKIP_MINIFIED
+            if self.minified_policy == 'truncate':
+                content = first_chunk
+                while len(content) < MINIFIED_TRUNCATE_BYTES:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    content += chunk
+                chunks.close()
+                self._add_manifest_entry(entry, None, entry.size, partial='truncate')
+                content = self._clean_text_for_pdf(self._truncate_content(content, MINIFIED_TRUNCATE_BYTES))
+                self._render_file_lines(content.split('\n'), relative_path_str, True)
+                return None
+            compact = True
+
+        lines = self._iter_stream_lines(itertools.chain([first_chunk], chunks))
+        self._render_file_lines(map(self._clean_text_for_pdf, lines), relative_path_str, compact)
+        return None
+
+    def _detect_stream_encoding(self, entry):
+        """Rileva la codifica dal primo blocco del file, usando la cache delle codifiche"""
+        with entry.open() as file:
+            cache_key = entry.cache_key(file)
+            head = file.read(STREAM_CHUNK_SIZE)
+        encoding = self.encoding_cache.get(cache_key)
+        if encoding is not None:
+            self.instrumentation.count('encoding_cache_hits')
+            return encoding
+        encoding = detect_encoding(head, partial=True)
+        self.encoding_cache.put(cache_key, encoding)
+        return encoding
+
+    def _iter_decoded_chunks(self, entry, encoding):
+        """
+        Legge il file a blocchi e li decodifica con un decoder incrementale.
+        I byte non validi oltre il primo blocco vengono sostituiti: le pagine
+        precedenti sono già state impaginate. Letto tutto il file, ne registra
+        l'hash nel manifest.
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        sha256 = hashlib.sha256()
+        # Con codifiche diverse da UTF-8 serve anche l'hash del testo ricodificato
+        text_sha256 = hashlib.sha256() if encoding != 'utf-8' else None
+        size = 0
+        with entry.open() as file:
+            while True:
+                data = file.read(STREAM_CHUNK_SIZE)
+                if not data:
+                    break
+                self.instrumentation.count('bytes', len(data))
+                sha256.update(data)
+                size += len(data)
+                text = decoder.decode(data)
+                if text:
+                    if text_sha256 is not None:
+                        text_sha256.update(text.encode('utf-8', errors='surrogatepass'))
+                    yield text
+        text = decoder.decode(b'', final=True)
+        if text_sha256 is not None:
+            text_sha256.update(text.encode('utf-8', errors='surrogatepass'))
+        self._add_manifest_entry(entry, sha256.hexdigest(), size,
+                                 text_sha256.hexdigest() if text_sha256 is not None else None)
+        if text:
+            yield text
+
+    @staticmethod
+    def _iter_stream_lines(chunks):
+        """Divide i blocchi di testo in righe, come str.split('\\n')"""
+        pending = ''
+        for text in chunks:
+            parts = (pending + text).split('\n')
+            pending = parts.pop()
+            yield from parts
+        yield pending
+
+    def _register_minified_file(self, relative_path):
+        """Registra un file minificato e restituisce la politica applicata"""
+        self.instrumentation.count('minified_files')
+        self.minified_files.append((str(relative_path), self.minified_policy))
+        return self.minified_policy
+
+    def _render_file_lines(self, lines, relative_path_str, compact=False):
+        """Impagina le righe (già pulite) di un file, da una lista o da un iteratore"""
+        instrumentation = self.instrumentation
+
+        # Aggiungi una nuova pagina SOLO se necessario
+        # Controlla se c'è spazio sufficiente nella pagina corrente
+        current_y = self.pdf.get_y()
+        page_height = self.pdf.h - 2 * self.pdf.b_margin
+        
+        # Stima dell'altezza necessaria: intestazione (20) + spazio (10) + almeno 5 righe (20)
+        estimated_height = 50
+        
+        if current_y + estimated_height > page_height:
+            self.pdf.add_page()
+        
+        # Intestazione del file
+        self.pdf.set_font('Arial', 'B', 14)
+        self.pdf.cell(0, 10, f'File: {relative_path_str}', ln=True)
+        self.pdf.ln(5)
+
+        # Contenuto del file
+        if compact:
+            font_size, line_width, line_height = COMPACT_FONT_SIZE, COMPACT_LINE_WIDTH, COMPACT_LINE_HEIGHT
+        else:
+            font_size, line_width, line_height = 8, MAX_LINE_WIDTH, 4
+        self.pdf.set_font('Courier', '', font_size)
+
+        wrapped_lines = {}
+        line_count = 0
+        
+        with instrumentation.span('layout'):
+            for i, clean_line in enumerate(lines, 1):
+                line_count = i
                 # Controlla se serve una nuova pagina
                 current_y = self.pdf.get_y()
                 if current_y + line_height > page_height:
                     self.pdf.add_page()
                     # Ripristina il font dopo l'aggiunta della pagina
-                    self.pdf.set_font('Courier', '', 8)
+                    self.pdf.set_font('Courier', '', font_size)
 
-                if len(clean_line) <= MAX_LINE_WIDTH:
+                line_number = f'{i:4d}|'
+                if len(clean_line) <= line_width:
                     # Linea normale
-                    line_number = f'{i:4d}|'
-                    self.pdf.set_font('Courier', '', 8)
                     self.pdf.cell(len(line_number) * 1.5, line_height, line_number)
                     self.pdf.cell(0, line_height, clean_line, ln=True)
                 else:
                     # Linea lunga - dividi in più righe
-                    line_number = f'{i:4d}|'
-                    indent_spaces = " " * len(line_number)
-
-                    # Prima parte
-                    first_segment = clean_line[:MAX_LINE_WIDTH]
-                    self.pdf.set_font('Courier', '', 8)
-                    self.pdf.cell(len(line_number) * 1.5, line_height, line_number)
-                    self.pdf.cell(0, line_height, first_segment, ln=True)
-
-                    # Parti successive
-                    remaining_text = clean_line[MAX_LINE_WIDTH:]
-                    while remaining_text:
-                        # Controlla se serve nuova pagina
-                        current_y = self.pdf.get_y()
-                        if current_y + line_height > page_height:
-                            self.pdf.add_page()
-                            self.pdf.set_font('Courier', '', 8)
-                        
-                        segment_width = MAX_LINE_WIDTH - len(line_number) + 3
-                        if len(remaining_text) > segment_width:
-                            segment = remaining_text[:segment_width]
-                            remaining_text = remaining_text[segment_width:]
-                        else:
-                            segment = remaining_text
-                            remaining_text = ""
-                        
-                        self.pdf.set_font('Courier', '', 8)
-                        self.pdf.cell(len(line_number) * 1.5, line_height, indent_spaces)
-                        self.pdf.cell(0, line_height, segment, ln=True)
+                    wrapped_lines[str(i)] = len(clean_line)
+                    segments = self._write_wrapped_line(line_number, clean_line, line_width,
+                                                        line_height, page_height, font_size)
+                    instrumentation.count('wrapped_lines', segments)
 
             self.pdf.ln(5)
 
-        except Exception as e:
-            # In caso di errore, aggiungi un messaggio di errore
-            self.pdf.add_page()
-            self.pdf.set_font('Arial', 'B', 14)
-            self.pdf.cell(0, 10, f'File: {relative_path}', ln=True)
-            self.pdf.ln(5)
-            self.pdf.set_font('Arial', '', 10)
-            self.pdf.cell(0, 10, f'Errore nella lettura del file: {str(e)}', ln=True)
+        instrumentation.count('lines', line_count)
+        LINES.inc(line_count, operation='create')
+        if wrapped_lines:
+            self.pdf.snapshot_metadata['wrapped_lines'][relative_path_str] = wrapped_lines
+
+    def _add_file_error(self, relative_path, error):
+        """In caso di errore, aggiunge un messaggio di errore al posto del file"""
+        self.pdf.add_page()
+        self.pdf.set_font('Arial', 'B', 14)
+        self.pdf.cell(0, 10, f'File: {relative_path}', ln=True)
+        self.pdf.ln(5)
+        self.pdf.set_font('Arial', '', 10)
+        self.pdf.cell(0, 10, f'Errore nella lettura del file: {str(error)}', ln=True)
+
+    def _write_wrapped_line(self, line_number, text, line_width, line_height, page_height, font_size):
+        """
+        Scrive una riga lunga: il primo segmento dopo il numero di riga, i successivi
+        dopo il margine di continuazione. Avanza per offset senza copiare il resto della
+        riga e controlla il cambio pagina una volta per blocco di segmenti.
+        Restituisce il numero di segmenti di continuazione scritti.
+        """
+        pdf = self.pdf
+        gutter_width = len(line_number) * 1.5
+        # Margine delle continuazioni: spazi e marcatore al posto del pipe
+        continuation_gutter = ' ' * (len(line_number) - 1) + WRAP_CONTINUATION_MARKER
+        segment_width = line_width - len(line_number) + 3
+
+        pdf.cell(gutter_width, line_height, line_number)
+        pdf.cell(0, line_height, text[:line_width], ln=True)
+
+        offset = line_width
+        length = len(text)
+        segments = 0
+        while offset < length:
+            # Segmenti che stanno ancora nella pagina corrente
+            rows_left = int((page_height - pdf.get_y()) // line_height)
+            if rows_left <= 0:
+                pdf.add_page()
+                pdf.set_font('Courier', '', font_size)
+                continue
+            for _ in range(rows_left):
+                pdf.cell(gutter_width, line_height, continuation_gutter)
+                pdf.cell(0, line_height, text[offset:offset + segment_width], ln=True)
+                offset += segment_width
+                segments += 1
+                if offset >= length:
+                    break
+        return segments
+
+    def _truncate_content(self, content, max_bytes):
+        """Tronca il contenuto a max_bytes byte UTF-8 aggiungendo il marcatore di troncamento"""
+        data = content.encode('utf-8')
+        if len(data) <= max_bytes:
+            return content
+        return data[:max_bytes].decode('utf-8', errors='ignore') + '... [troncato]'
     
-    def _read_file_content(self, file_path):
-        """Legge il contenuto del file provando diverse codifiche"""
-        for encoding in SUPPORTED_ENCODINGS:
+    def _read_file_content(self, entry):
+        """
+        Legge il file (voce di sorgente) una sola volta e lo decodifica in memoria.
+        La codifica è rilevata dai byte (BOM, UTF-8, densità NUL) e memorizzata
+        in cache per (percorso, mtime, dimensione) o per id del blob.
+        """
+        try:
+            with entry.open() as file:
+                cache_key = entry.cache_key(file)
+                data = file.read()
+        except OSError as e:
+            self._add_manifest_entry(entry, None, 0, partial='error')
+            return f'Impossibile leggere il file {entry} - {e}'
+        
+        self.instrumentation.count('bytes', len(data))
+        encoding = self.encoding_cache.get(cache_key)
+        if encoding is not None:
+            self.instrumentation.count('encoding_cache_hits')
+        else:
+            encoding = detect_encoding(data)
+            self.encoding_cache.put(cache_key, encoding)
+        
+        text = None
+        if encoding != BINARY:
+            if encoding not in ('utf-8', 'utf-8-sig'):
+                self.instrumentation.count('encoding_fallbacks')
+                ENCODING_FALLBACKS.inc()
             try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    return file.read()
-            except (UnicodeDecodeError, Exception):
-                continue
+                text = data.decode(encoding)
+            except UnicodeDecodeError:
+                # Voce di cache non più valida: rileva di nuovo
+                encoding = detect_encoding(data)
+                self.encoding_cache.put(cache_key, encoding)
+                if encoding != BINARY:
+                    text = data.decode(encoding)
+        
+        if text is not None:
+            sha256 = hashlib.sha256(data).hexdigest()
+            text_sha256 = None
+            if encoding != 'utf-8':
+                text_sha256 = hashlib.sha256(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+            self._add_manifest_entry(entry, sha256, len(data), text_sha256)
+            return text
         
         # Se nessuna codifica funziona, restituisci messaggio di errore
-        return f'Impossibile leggere il file {file_path} - formato binario o codifica sconosciuta'
+        self._add_manifest_entry(entry, None, len(data), partial='error')
+        return f'Impossibile leggere il file {entry} - formato binario o codifica sconosciuta'
     
     def _encode_all_unicode_chars(self, text):
         """Codifica TUTTI i caratteri Unicode in formato sicuro per PDF"""
@@ -387,4 +1046,45 @@ class PDFConverter:
         except Exception as e:
             print(f"Errore imprevisto nella pulizia del testo: {e}")
             # Fallback estremo: mantieni solo caratteri ASCII
-            return "".join(c if ord(c) < 128 else '?' for c in text)
\ No newline at end of file
+            return "".join(c if ord(c) < 128 else '?' for c in text)
+
+
+# Convertitore e opzioni del processo worker, creati una sola volta da _init_render_worker
+_worker_converter = None
+_worker_options = None
+
+
+def _init_render_worker(options):
+    """Inizializza il convertitore di un processo del pool"""
+    global _worker_converter, _worker_options
+    _worker_options = options
+    _worker_converter = PDFConverter()
+    _worker_converter.minified_policy = options['minified_policy']
+    _worker_converter.streaming_threshold = options['streaming_threshold']
+
+
+def _render_file_group(files):
+    """Impagina un gruppo di file in un documento nuovo e restituisce pagine e metadati"""
+    converter = _worker_converter
+    converter.pdf = converter._new_document()
+    converter.pdf.add_page()
+    converter.minified_files = []
+    converter.encoding_cache.updated = {}
+    profile = _worker_options['profile']
+    converter.instrumentation = Instrumentation() if profile else NULL_INSTRUMENTATION
+    # Solo gli incrementi di questo gruppo: il processo impagina più gruppi
+    metrics_before = REGISTRY.snapshot()
+
+    results = converter._render_files(files)
+
+    pdf = converter.pdf
+    return {
+        'pages': [pdf.pages[n] for n in range(1, pdf.page + 1)],
+        'results': results,
+        'wrapped_lines': pdf.snapshot_metadata['wrapped_lines'],
+        'manifest': pdf.snapshot_metadata[MANIFEST_KEY],
+        'minified_files': converter.minified_files,
+        'encodings': converter.encoding_cache.updated,
+        'instrumentation': converter.instrumentation.as_dict() if profile else None,
+        'metrics': REGISTRY.since(metrics_before)
+    }
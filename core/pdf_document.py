@@ -0,0 +1,69 @@
+"""
+Documento PDF di SyncroNet: FPDF con un flusso di metadati JSON
+collegato al catalogo, letto dal ricostruttore
+"""
+
+import json
+import zlib
+from fpdf import FPDF
+
+# Chiave del catalogo che punta al flusso dei metadati
+METADATA_KEY = '/SyncroNet'
+
+
+class SnapshotPDF(FPDF):
+    """FPDF che incorpora snapshot_metadata come flusso JSON compresso"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot_metadata = {}
+        self._metadata_object = None
+
+    def register_fonts(self, fonts):
+        """
+        Registra i font in un ordine fisso, prima della prima pagina: i riferimenti
+        /F<n> nei content stream coincidono così tra documenti diversi
+        """
+        for family, style in fonts:
+            self.set_font(family, style, 8)
+
+    def append_pages(self, pages):
+        """Accoda i content stream di pagine impaginate da un altro SnapshotPDF con gli stessi font"""
+        for content in pages:
+            self.page += 1
+            self.pages[self.page] = content
+
+    def _putresources(self):
+        super()._putresources()
+        self._metadata_object = None
+        if not self.snapshot_metadata:
+            return
+
+        data = json.dumps(self.snapshot_metadata, ensure_ascii=True, separators=(',', ':')).encode('ascii')
+        if self.compress:
+            data = zlib.compress(data)
+        self._newobj()
+        self._metadata_object = self.n
+        self._out('<<')
+        if self.compress:
+            self._out('/Filter /FlateDecode')
+        self._out(f'/Length {len(data)}')
+        self._out('>>')
+        self._putstream(data)
+        self._out('endobj')
+
+    def _putcatalog(self):
+        super()._putcatalog()
+        if self._metadata_object is not None:
+            self._out(f'{METADATA_KEY} {self._metadata_object} 0 R')
+
+
+def read_snapshot_metadata(pdf_reader):
+    """Restituisce i metadati incorporati da SnapshotPDF, {} se assenti"""
+    try:
+        reference = pdf_reader.trailer['/Root'].get(METADATA_KEY)
+        if reference is None:
+            return {}
+        return json.loads(reference.get_object().get_data().decode('ascii'))
+    except Exception:
+        return {}
@@ -0,0 +1,331 @@
+"""
+Modulo per la stima della capacità prima della creazione: pagine, righe spezzate,
+dimensione del PDF e durata, da un campione dei file e dalle esecuzioni precedenti
+"""
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from core.config import (COMPACT_LINE_HEIGHT, COMPACT_LINE_WIDTH, MAX_LINE_WIDTH, MINIFIED_TRUNCATE_BYTES,
+                         PLANNER_BYTES_PER_PAGE, PLANNER_HISTORY_FILE, PLANNER_HISTORY_SIZE, PLANNER_SAMPLE_BYTES,
+                         PLANNER_SAMPLE_FILES, PLANNER_SAMPLE_LARGEST, PLANNER_SECONDS_PER_PAGE)
+from core.file_manager import SKIP_MINIFIED, is_minified_content
+from core.journal import atomic_write_text
+
+# Altezze (mm) usate da PDFConverter._render_file_lines e _add_title_page
+LINE_HEIGHT = 4
+FILE_HEADER_HEIGHT = 15
+FILE_FOOTER_HEIGHT = 5
+FILE_MIN_HEIGHT = 50
+TITLE_HEIGHT = 80
+SKIPPED_HEADER_HEIGHT = 25
+SKIPPED_ROW_HEIGHT = 5
+
+# Caratteri del numero di riga ('   1|')
+GUTTER_WIDTH = 5
+
+# Righe per riga di testo e byte per riga quando un'estensione non ha campioni
+DEFAULT_BYTES_PER_LINE = 40
+DEFAULT_ROWS_PER_LINE = 1.0
+
+
+def rows_for_line(length, line_width=MAX_LINE_WIDTH):
+    """Righe di layout di una riga di testo: la prima più i segmenti di continuazione"""
+    if length <= line_width:
+        return 1
+    segment_width = line_width - GUTTER_WIDTH + 3
+    return 1 + math.ceil((length - line_width) / segment_width)
+
+
+def exclusion_pattern(relative_path, is_dir=False):
+    """Pattern gitignore ancorato che esclude esattamente un file o una cartella del progetto"""
+    escaped = ''.join('\\' + c if c in '\\*?[' else c for c in Path(relative_path).as_posix())
+    return f"/{escaped}/" if is_dir else f"/{escaped}"
+
+
+def _sample_file(file_path, sample_bytes):
+    """
+    Legge l'inizio del file fino all'ultima riga completa del campione.
+    Restituisce (byte letti, testo, file letto per intero).
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read(sample_bytes + 1)
+    complete = len(data) <= sample_bytes
+    if not complete:
+        data = data[:sample_bytes]
+        cut = data.rfind(b'\n')
+        if cut >= 0:
+            data = data[:cut + 1]
+    return len(data), data.decode('utf-8', errors='replace'), complete
+
+
+class CapacityPlan:
+    """Stima di una creazione: totali, file più pesanti e cartelle principali"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        # Una voce per file incluso: percorso posix, byte, righe, righe di layout, pagine
+        self.files = []
+        self.skipped = []
+        self.total_bytes = 0
+        self.lines = 0
+        self.wrapped_lines = 0
+        self.pages = 0
+        self.pdf_bytes = 0
+        self.seconds = 0.0
+        self.walk_seconds = 0.0
+        self.sampled_files = 0
+        # Esecuzioni usate per la calibrazione (0: valori iniziali di config)
+        self.calibration_runs = 0
+
+    def top_files(self, count=10):
+        """File con più pagine stimate"""
+        return sorted(self.files, key=lambda item: item['pages'], reverse=True)[:count]
+
+    def top_directories(self, count=10):
+        """Cartelle di primo livello con più pagine stimate: {cartella: [pagine, file, byte]}"""
+        directories = {}
+        for item in self.files:
+            parts = item['path'].split('/')
+            if len(parts) < 2:
+                continue
+            totals = directories.setdefault(parts[0], [0.0, 0, 0])
+            totals[0] += item['pages']
+            totals[1] += 1
+            totals[2] += item['size']
+        return sorted(directories.items(), key=lambda item: item[1][0], reverse=True)[:count]
+
+    def summary(self, count=10):
+        """Riepilogo testuale della stima"""
+        calibration = (f"calibrata su {self.calibration_runs} esecuzioni" if self.calibration_runs
+                       else "valori iniziali, nessuna esecuzione precedente")
+        lines = [
+            f"Progetto: {self.project_path.name}",
+            f"File inclusi: {len(self.files)} ({self.total_bytes / (1024 * 1024):.2f} MB, "
+            f"{self.sampled_files} campionati)",
+            f"File saltati: {len(self.skipped)}",
+            f"Righe stimate: {self.lines} ({self.wrapped_lines} segmenti di continuazione)",
+            f"Pagine stimate: {self.pages}",
+            f"Dimensione PDF stimata: {self.pdf_bytes / (1024 * 1024):.2f} MB",
+            f"Durata stimata: {self.seconds:.1f}s con un processo ({calibration})",
+        ]
+        top_files = self.top_files(count)
+        if top_files:
+            lines.extend(["", "File più pesanti:"])
+            lines.extend(f"  {item['pages']:>8.1f} pag.  {item['path']}" for item in top_files)
+        top_directories = self.top_directories(count)
+        if top_directories:
+            lines.extend(["", "Cartelle più pesanti:"])
+            lines.extend(f"  {pages:>8.1f} pag.  {name}/ ({files} file)"
+                         for name, (pages, files, _) in top_directories)
+        return '\n'.join(lines)
+
+    def as_dict(self):
+        return {
+            'project': str(self.project_path),
+            'files': len(self.files),
+            'skipped': len(self.skipped),
+            'bytes': self.total_bytes,
+            'lines': self.lines,
+            'wrapped_lines': self.wrapped_lines,
+            'pages': self.pages,
+            'pdf_bytes': self.pdf_bytes,
+            'seconds': self.seconds,
+            'calibration_runs': self.calibration_runs,
+            'top_files': self.top_files(),
+            'top_directories': [{'path': name, 'pages': pages, 'files': files, 'bytes': size}
+                                for name, (pages, files, size) in self.top_directories()]
+        }
+
+
+class CapacityPlanner:
+    """
+    Stima pagine, dimensione e durata di una creazione senza impaginare. I file
+    inclusi vengono elencati con le stesse esclusioni della creazione (solo stat e
+    verdetti testo/binario in cache); di un campione per estensione, più i file più
+    grandi, vengono lette le prime righe per stimare byte per riga e righe spezzate.
+    L'impaginazione viene poi simulata con le stesse altezze del convertitore.
+    Secondi e byte per pagina vengono calibrati sulle creazioni precedenti
+    (record_run), salvate localmente in history_file.
+    """
+
+    def __init__(self, history_file=PLANNER_HISTORY_FILE, sample_files=PLANNER_SAMPLE_FILES,
+                 sample_largest=PLANNER_SAMPLE_LARGEST, sample_bytes=PLANNER_SAMPLE_BYTES):
+        self.history_file = Path(history_file)
+        self.sample_files = sample_files
+        self.sample_largest = sample_largest
+        self.sample_bytes = sample_bytes
+
+    # --- Calibrazione ---
+
+    def load_history(self):
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('runs', [])
+        except (OSError, ValueError):
+            return []
+
+    def record_run(self, files, pages, pdf_bytes, seconds):
+        """Registra una creazione completata (durata di impaginazione e scrittura, senza la visita)"""
+        if pages <= 0:
+            return
+        runs = self.load_history()
+        runs.append({'files': files, 'pages': pages, 'pdf_bytes': pdf_bytes, 'seconds': seconds})
+        runs = runs[-PLANNER_HISTORY_SIZE:]
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(self.history_file, json.dumps({'runs': runs}))
+        except OSError as e:
+            print(f"Avviso: impossibile salvare la calibrazione della stima: {e}")
+
+    def calibration(self):
+        """(secondi per pagina, byte per pagina, esecuzioni usate), pesati sulle esecuzioni più grandi"""
+        runs = self.load_history()
+        pages = sum(run['pages'] for run in runs)
+        if not pages:
+            return PLANNER_SECONDS_PER_PAGE, PLANNER_BYTES_PER_PAGE, 0
+        return (sum(run['seconds'] for run in runs) / pages,
+                sum(run['pdf_bytes'] for run in runs) / pages, len(runs))
+
+    # --- Stima ---
+
+    def _select_samples(self, files):
+        """Indici dei file da campionare: i più grandi e alcuni per estensione, distribuiti per dimensione"""
+        by_size = sorted(range(len(files)), key=lambda index: files[index][2], reverse=True)
+        selected = set(by_size[:self.sample_largest])
+        groups = {}
+        for index in by_size:
+            groups.setdefault(files[index][0].suffix.lower(), []).append(index)
+        for indexes in groups.values():
+            if len(indexes) <= self.sample_files:
+                selected.update(indexes)
+            else:
+                step = len(indexes) / self.sample_files
+                selected.update(indexes[int(i * step)] for i in range(self.sample_files))
+        return selected
+
+    def plan(self, project_path, file_manager, document, minified_policy):
+        """
+        Stima la creazione di project_path con le esclusioni di file_manager; document è
+        un documento vuoto del convertitore, da cui si leggono le dimensioni della pagina.
+        """
+        plan = CapacityPlan(project_path)
+        started = time.perf_counter()
+        files = []
+        for file_path, relative_path in file_manager.iter_project_files(project_path, sniff_content=False):
+            reason = file_manager.classify_file(file_path)
+            if reason is not None:
+                plan.skipped.append((str(relative_path), reason))
+                continue
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                continue
+            files.append((file_path, relative_path, size))
+        file_manager.content_cache.save()
+        plan.walk_seconds = time.perf_counter() - started
+
+        # Campioni: righe e righe di layout esatte per i file letti per intero,
+        # byte per riga e righe per riga per estensione per gli altri
+        sampled = {}
+        extension_stats = {}
+        for index in self._select_samples(files):
+            file_path, _, size = files[index]
+            try:
+                sample_size, text, complete = _sample_file(file_path, self.sample_bytes)
+            except OSError:
+                continue
+            minified = is_minified_content(text)
+            line_width = COMPACT_LINE_WIDTH if minified else MAX_LINE_WIDTH
+            text_lines = text.split('\n') if complete else text.splitlines()
+            rows = sum(rows_for_line(len(line), line_width) for line in text_lines)
+            sampled[index] = (sample_size, len(text_lines), rows, complete, minified)
+            if not minified and text_lines:
+                stats = extension_stats.setdefault(file_path.suffix.lower(), [0, 0, 0])
+                stats[0] += sample_size
+                stats[1] += len(text_lines)
+                stats[2] += rows
+        plan.sampled_files = len(sampled)
+
+        all_stats = [sum(values) for values in zip(*extension_stats.values())] or [0, 0, 0]
+        if all_stats[1]:
+            default_ratios = (all_stats[0] / all_stats[1], all_stats[2] / all_stats[1])
+        else:
+            default_ratios = (DEFAULT_BYTES_PER_LINE, DEFAULT_ROWS_PER_LINE)
+
+        file_rows = []
+        for index, (file_path, relative_path, size) in enumerate(files):
+            sample = sampled.get(index)
+            minified = sample is not None and sample[4]
+            if minified and minified_policy == 'skip':
+                plan.skipped.append((str(relative_path), SKIP_MINIFIED))
+                continue
+            if minified and minified_policy == 'truncate':
+                size = min(size, MINIFIED_TRUNCATE_BYTES)
+            if sample is not None and sample[3]:
+                lines, rows = sample[1], sample[2]
+            else:
+                if sample is not None and sample[1]:
+                    bytes_per_line, rows_per_line = sample[0] / sample[1], sample[2] / sample[1]
+                else:
+                    stats = extension_stats.get(file_path.suffix.lower())
+                    if stats and stats[1]:
+                        bytes_per_line, rows_per_line = stats[0] / stats[1], stats[2] / stats[1]
+                    else:
+                        bytes_per_line, rows_per_line = default_ratios
+                lines = max(1, round(size / max(bytes_per_line, 1)))
+                rows = max(lines, round(lines * rows_per_line))
+            # Le righe compatte sono più basse: convertite in righe normali equivalenti
+            height_rows = rows * COMPACT_LINE_HEIGHT / LINE_HEIGHT if minified else rows
+            plan.lines += lines
+            plan.wrapped_lines += rows - lines
+            plan.total_bytes += size
+            file_rows.append(height_rows)
+            plan.files.append({'path': relative_path.as_posix(), 'size': size, 'lines': lines, 'rows': rows,
+                               'pages': 0.0, 'sampled': sample is not None})
+
+        self._simulate_layout(plan, file_rows, document)
+        seconds_per_page, bytes_per_page, plan.calibration_runs = self.calibration()
+        plan.pdf_bytes = int(plan.pages * bytes_per_page)
+        plan.seconds = plan.walk_seconds + plan.pages * seconds_per_page
+        return plan
+
+    @staticmethod
+    def _simulate_layout(plan, file_rows, document):
+        """Simula l'impaginazione di _render_file_lines: pagine totali e pagine per file"""
+        top = document.t_margin
+        # Limite usato dal convertitore per il cambio pagina delle righe
+        bottom = document.h - 2 * document.b_margin
+        # Limite del cambio pagina automatico delle celle della pagina titolo
+        break_y = document.h - document.b_margin
+        rows_per_page = int((bottom - top) // LINE_HEIGHT)
+
+        pages = 1
+        y = top + TITLE_HEIGHT
+        if plan.skipped:
+            y += SKIPPED_HEADER_HEIGHT + SKIPPED_ROW_HEIGHT * len(plan.skipped)
+        if y > break_y:
+            extra = math.ceil((y - break_y) / (break_y - top))
+            pages += extra
+            y = top + (y - break_y) - (extra - 1) * (break_y - top)
+
+        for item, rows in zip(plan.files, file_rows):
+            rows = math.ceil(rows)
+            if y + FILE_MIN_HEIGHT > bottom:
+                pages += 1
+                y = top
+            y += FILE_HEADER_HEIGHT
+            fit = max(0, int((bottom - y) // LINE_HEIGHT))
+            if rows <= fit:
+                y += rows * LINE_HEIGHT
+            else:
+                remaining = rows - fit
+                extra = math.ceil(remaining / rows_per_page)
+                pages += extra
+                y = top + (remaining - (extra - 1) * rows_per_page) * LINE_HEIGHT
+            y += FILE_FOOTER_HEIGHT
+            # Quota di pagine del file, per ordinare i file più pesanti
+            item['pages'] = (rows * LINE_HEIGHT + FILE_HEADER_HEIGHT + FILE_FOOTER_HEIGHT) / (bottom - top)
+        plan.pages = pages
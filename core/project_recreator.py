@@ -6,10 +6,44 @@ con preservazione perfetta degli spazi e indentazione
 import re
 import os
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import PyPDF2
 from core.file_manager import FileManager
 from core.emoji_mapping import REVERSE_EMOJI_MAPPING
+from core.config import PDF_CREATOR
+from core.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from core.pdf_document import read_snapshot_metadata
+from core.output_sinks import create_sink
+from core.snapshot_cache import SnapshotCache
+from core.delta import DELTA_KEY, SnapshotChain
+from core.journal import ReconstructionJournal
+from core.metrics import BYTES, FILES, LINES, PAGES, RESTORE_MISMATCHES, STAGE_SECONDS, timed_run
+from core.integrity import (MANIFEST_KEY, VERIFY_WORKERS, digest_bytes, verify_directory,
+                            verify_manifest)
+
+# Operatori di testo scritti da FPDF per ogni cella: BT x y Td (testo) Tj ET
+_TEXT_OPERATOR_RE = re.compile(rb'BT ([-\d.]+) ([-\d.]+) Td \(((?:[^\\()]|\\.)*)\) Tj ET', re.S)
+# Cella con il numero di riga all'inizio di una riga di contenuto di PDFConverter
+_GUTTER_CELL_RE = re.compile(rb'BT [-\d.]+ [-\d.]+ Td \( *\d+\|')
+_ESCAPE_RE = re.compile(r'\\([0-7]{1,3}|.)', re.S)
+_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', 'b': '\b', 'f': '\f'}
+
+# Nei PDF senza marcatore le righe di continuazione iniziano con un margine di soli
+# spazi largo quanto il numero di riga ('   1|'), che ha al massimo tre spazi iniziali
+_CONTINUATION_GUTTER = ' ' * 5
+
+def _unescape_pdf_string(text):
+    """Rimuove l'escape delle stringhe letterali PDF"""
+    if '\\' not in text:
+        return text
+    def replace(match):
+        code = match.group(1)
+        if code[0] in '01234567':
+            return chr(int(code, 8))
+        return _ESCAPES.get(code, code)
+    return _ESCAPE_RE.sub(replace, text)
 
 class ProjectRecreator:
     """Gestisce la ricostruzione di progetti da PDF con preservazione spazi"""
@@ -18,12 +52,38 @@ class ProjectRecreator:
         self.files_data = {}
         self.metadata = {}
         self.file_manager = FileManager()
+        self.instrumentation = NULL_INSTRUMENTATION
+        # True se il testo è stato estratto direttamente dai content stream di SyncroNet
+        self.exact_layout = False
+        # Metadati incorporati dal convertitore (marcatore di continuazione, righe spezzate)
+        self.snapshot_metadata = {}
+        self._continuation_re = None
+        # Mappe dei file già analizzate, per hash del PDF
+        self.snapshot_cache = SnapshotCache()
+        # Esito dell'ultima verifica con il manifest di integrità (None se assente)
+        self.verification = None
     
     def extract_pdf_content(self, pdf_path):
-        """Estrae il contenuto dal PDF preservando il layout"""
+        """
+        Estrae il contenuto dal PDF preservando il layout.
+        I PDF generati da SyncroNet vengono letti direttamente dai content stream
+        (righe e spazi esatti); per gli altri PDF si usa extract_text di PyPDF2.
+        """
+        self.exact_layout = False
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
+                self.instrumentation.count('pages', len(pdf_reader.pages))
+                PAGES.inc(len(pdf_reader.pages), operation='restore')
+                self._load_snapshot_metadata(pdf_reader)
+                
+                if self._is_syncronet_pdf(pdf_reader):
+                    full_text = self._extract_syncronet_text(pdf_reader)
+                    if full_text:
+                        self.exact_layout = True
+                        return full_text
+                    print("⚠️ Estrazione diretta non riuscita, uso PyPDF2")
+                
                 full_text = ""
                 for page_num, page in enumerate(pdf_reader.pages):
                     page_text = page.extract_text()
@@ -35,17 +95,89 @@ class ProjectRecreator:
             print(f"❌ Errore nell'estrazione del PDF: {e}")
             return None
 
+    def _load_snapshot_metadata(self, pdf_reader):
+        """Legge i metadati incorporati; senza marcatore si usa l'unione euristica"""
+        self.snapshot_metadata = read_snapshot_metadata(pdf_reader)
+        marker = self.snapshot_metadata.get('wrap_marker')
+        self._continuation_re = re.compile(r'^\s*' + re.escape(marker)) if marker else None
+
+    def _is_syncronet_pdf(self, pdf_reader):
+        """
+        Riconosce i PDF scritti da PDFConverter: metadati /SyncroNet nel catalogo o
+        Creator di SyncroNet. Un PDF generico di PyFPDF (senza marcatori, come i PDF
+        SyncroNet meno recenti) viene letto in modo esatto solo se ha anche le celle
+        di PDFConverter; gli altri usano extract_text di PyPDF2.
+        """
+        if self.snapshot_metadata:
+            return True
+        try:
+            metadata = pdf_reader.metadata or {}
+        except Exception:
+            return False
+        creator = str(metadata.get('/Creator', ''))
+        producer = str(metadata.get('/Producer', ''))
+        if creator.startswith(PDF_CREATOR.split()[0]):
+            return True
+        return producer.startswith('PyFPDF') and self._has_converter_layout(pdf_reader)
+
+    @staticmethod
+    def _has_converter_layout(pdf_reader):
+        """Controlla le prime pagine: font Courier e celle con il numero di riga ('   1|')"""
+        try:
+            for page in pdf_reader.pages[:3]:
+                fonts = page['/Resources']['/Font']
+                if not any(font.get_object().get('/BaseFont') == '/Courier' for font in fonts.values()):
+                    continue
+                contents = page.get_contents()
+                if contents is not None and _GUTTER_CELL_RE.search(contents.get_data()):
+                    return True
+        except Exception:
+            return False
+        return False
+
+    def _extract_syncronet_text(self, pdf_reader):
+        """
+        Legge gli operatori di testo dei content stream nell'ordine in cui sono
+        scritti. Le celle con la stessa coordinata verticale formano una riga.
+        """
+        lines = []
+        for page_num, page in enumerate(pdf_reader.pages):
+            contents = page.get_contents()
+            if contents is None:
+                continue
+            data = contents.get_data()
+            
+            current_y = None
+            current_cells = []
+            for match in _TEXT_OPERATOR_RE.finditer(data):
+                y = match.group(2)
+                if y != current_y and current_cells:
+                    lines.append(''.join(current_cells))
+                    current_cells = []
+                current_y = y
+                current_cells.append(_unescape_pdf_string(match.group(3).decode('latin-1')))
+            if current_cells:
+                lines.append(''.join(current_cells))
+            print(f"📄 Pagina {page_num + 1} estratta")
+        
+        if not lines:
+            return None
+        return '\n'.join(lines) + '\n'
+
     def parse_files_from_pdf(self, pdf_text):
         """
         Analizza il PDF e estrae i file PRESERVANDO FEDELMENTE 
         TUTTI GLI SPAZI E TAB ORIGINALI
         unisce senza spazi indesiderati
         """
+        self.files_data = {}
         lines = pdf_text.split('\n')
         current_file = None
         current_content = []
         reading_file_content = False
         line_number_offset = 0
+        # Larghezza del margine con il numero di riga (solo in modalità esatta)
+        gutter_width = len(_CONTINUATION_GUTTER)
         
         print(f"🔍 Analizzando {len(lines)} linee dal PDF...")
         
@@ -54,10 +186,14 @@ class ProjectRecreator:
             raw_line = lines[i]
             
             # Cerca l'inizio di un nuovo file
-            file_match = re.match(r'^\s*File:\s*(.+)$', raw_line.strip())
+            # In modalità esatta le intestazioni non hanno spazi iniziali,
+            # le righe di contenuto iniziano sempre con il margine
+            header_line = raw_line if self.exact_layout else raw_line.strip()
+            file_match = re.match(r'^\s*File:\s*(.+)$', header_line)
             if file_match:
                 # Salva il file precedente se esiste
                 if current_file and current_content:
+                    self._verify_wrapped_lines(current_file, current_content)
                     full_content = '\n'.join(current_content)
                     if full_content.strip():
                         self.files_data[current_file] = full_content
@@ -76,7 +212,7 @@ class ProjectRecreator:
             # Se stiamo leggendo il contenuto di un file
             if reading_file_content and current_file:
                 # Controlla se è la fine della sezione file
-                stripped_line = raw_line.strip()
+                stripped_line = header_line
                 
                 # Pattern per fine sezione file
                 end_of_file_patterns = [
@@ -94,6 +230,7 @@ class ProjectRecreator:
                 if is_end_of_section:
                     # Fine della sezione file corrente
                     if current_file and current_content:
+                        self._verify_wrapped_lines(current_file, current_content)
                         full_content = '\n'.join(current_content)
                         if full_content.strip():
                             self.files_data[current_file] = full_content
@@ -108,7 +245,13 @@ class ProjectRecreator:
                     # Pattern per linea numerata: "numero | contenuto"
                     line_match = re.match(r'^\s*(\d+)\s*\|\s*(.*)$', raw_line)
                     
-                    if line_match:
+                    continuation = self._match_continuation(raw_line, gutter_width) if current_content else None
+                    
+                    if continuation is not None:
+                        # Continuazione di una riga lunga: concatenazione esatta
+                        current_content[-1] += continuation
+                    
+                    elif line_match:
                         line_num = int(line_match.group(1))
                         if line_number_offset == 0:
                             line_number_offset = line_num - len(current_content) - 1
@@ -118,7 +261,11 @@ class ProjectRecreator:
                         
                         if pipe_pos >= 0:
                             # Contenuto dopo il pipe
-                            content_after_pipe = raw_line[pipe_pos + 1:].rstrip()
+                            content_after_pipe = raw_line[pipe_pos + 1:]
+                            if self.exact_layout:
+                                gutter_width = pipe_pos + 1
+                            else:
+                                content_after_pipe = content_after_pipe.rstrip()
                             
                             # RICOSTRUZIONE ESATTA: preserva tutti gli spazi originali
                             preserved_line = content_after_pipe
@@ -156,6 +303,7 @@ class ProjectRecreator:
         
         # Salva l'ultimo file
         if current_file and current_content:
+            self._verify_wrapped_lines(current_file, current_content)
             full_content = '\n'.join(current_content)
             if full_content.strip():
                 self.files_data[current_file] = full_content
@@ -164,6 +312,26 @@ class ProjectRecreator:
         print(f"✅ Parsing completato. Trovati {len(self.files_data)} file")
         return self.files_data
 
+    def _match_continuation(self, raw_line, gutter_width):
+        """Restituisce il segmento di una riga di continuazione, None per le altre righe"""
+        if self._continuation_re is not None:
+            match = self._continuation_re.match(raw_line)
+            return raw_line[match.end():] if match else None
+        if self.exact_layout and raw_line.startswith(_CONTINUATION_GUTTER):
+            return raw_line[gutter_width:]
+        return None
+
+    def _verify_wrapped_lines(self, file_path, content_lines):
+        """Confronta le righe riunite con la lunghezza originale registrata nel PDF"""
+        expected_lengths = self.snapshot_metadata.get('wrapped_lines', {}).get(file_path)
+        if not expected_lengths:
+            return
+        for line_number, expected in expected_lengths.items():
+            index = int(line_number) - 1
+            if index >= len(content_lines) or len(content_lines[index]) != expected:
+                self.instrumentation.count('wrap_mismatches')
+                print(f"⚠️ {file_path}: riga {line_number} riunita con lunghezza diversa dall'originale")
+
     def _smart_merge_lines(self, last_line, continuation):
         """
         Unisce due linee in modo INTELLIGENTE senza spazi indesiderati
@@ -268,75 +436,280 @@ class ProjectRecreator:
         path = Path(file_path)
         return path.suffix.lower()
 
-    def recreate_project_structure(self, pdf_path, output_folder):
-        """Ricrea l'intera struttura del progetto dal PDF in una cartella dedicata"""
+    def load_snapshot(self, pdf_path, use_cache=True, allow_empty=False):
+        """
+        Restituisce (mappa dei file, nome del progetto) del PDF, oppure None.
+        Con use_cache un PDF già analizzato viene letto dalla cache senza
+        estrazione né parsing; altrimenti il risultato viene salvato in cache.
+        Una lista di PDF (snapshot completo seguito dai suoi delta) viene applicata
+        in ordine. allow_empty accetta PDF senza file (delta con sole eliminazioni).
+        """
+        if isinstance(pdf_path, (list, tuple)):
+            return self.load_snapshot_chain(pdf_path, use_cache)
+        
+        instrumentation = self.instrumentation
+        if use_cache:
+            with instrumentation.span('cache'):
+                cached = self.snapshot_cache.load(pdf_path)
+            if cached is not None:
+                print(f"⚡ Snapshot già analizzato: {len(cached)} file letti dalla cache")
+                instrumentation.count('cache_hits')
+                self.snapshot_metadata = cached.metadata
+                return cached, cached.project_name
+        
         print(f"📖 Leggendo il PDF: {pdf_path}")
-        pdf_text = self.extract_pdf_content(pdf_path)
+        with instrumentation.span('extract'):
+            pdf_text = self.extract_pdf_content(pdf_path)
         
         if not pdf_text:
             print("❌ Impossibile leggere il PDF")
-            return False
+            return None
         
         print("🔍 Analizzando il contenuto del PDF con PRESERVAZIONE SPAZI...")
         print("🎯 ALGORITMO INTELLIGENTE: Unione senza spazi indesiderati")
-        files_data = self.parse_files_from_pdf(pdf_text)
+        with instrumentation.span('parse'):
+            files_data = self.parse_files_from_pdf(pdf_text)
         
-        if not files_data:
+        if not files_data and not allow_empty:
             print("❌ Nessun file trovato nel PDF")
-            return False
+            return None
         
         print(f"📁 Trovati {len(files_data)} file nel PDF")
         
         # Estrai il nome del progetto dal PDF - MODIFICA: passa pdf_text
         project_name = self._extract_project_name(files_data, pdf_path, pdf_text)
         
-        # Crea il percorso di output completo con il nome esatto del progetto
-        output_path = Path(output_folder) / project_name
-        output_path.mkdir(parents=True, exist_ok=True)
-        
-        files_created = 0
-        errors = []
-        
-        for file_path, raw_content in files_data.items():
-            try:
-                full_path = output_path / file_path
-                
-                # Crea le directory necessarie
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Pulisci il contenuto PRESERVANDO TUTTI GLI SPAZI e DECODIFICANDO EMOJI
-                cleaned_content = self.clean_file_content(raw_content, file_path)
-                
-                # Scrivi il file con encoding UTF-8
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_content)
-                
-                files_created += 1
-                line_count = len(cleaned_content.splitlines())
-                
-                # ANALISI DETTAGLIATA del file creato
-                self._analyze_file_structure(file_path, cleaned_content, files_created)
-                
-            except Exception as e:
-                error_msg = f"❌ Errore con {file_path}: {str(e)}"
-                errors.append(error_msg)
-                print(error_msg)
+        if use_cache:
+            with instrumentation.span('cache'):
+                self.snapshot_cache.store(pdf_path, files_data, project_name, self.snapshot_metadata)
+        return files_data, project_name
+
+    def load_snapshot_chain(self, pdf_paths, use_cache=True):
+        """
+        Applica in ordine uno snapshot completo e i suoi delta: ogni delta sovrascrive
+        i file aggiunti o modificati e rimuove quelli eliminati. Restituisce
+        (SnapshotChain, nome del progetto) oppure None; snapshot_metadata diventa
+        quello dell'ultimo PDF, il cui manifest descrive lo stato finale.
+        """
+        chain = SnapshotChain()
+        project_name = None
+        previous_id = None
+        for index, pdf_path in enumerate(pdf_paths):
+            snapshot = self.load_snapshot(pdf_path, use_cache, allow_empty=index > 0)
+            if snapshot is None:
+                chain.close()
+                return None
+            files_data, name = snapshot
+            delta = self.snapshot_metadata.get(DELTA_KEY)
+            if index == 0:
+                project_name = name
+                if delta is not None:
+                    print(f"⚠️ {pdf_path} è un delta: la catena dovrebbe iniziare da uno snapshot completo")
+            elif delta is None:
+                print(f"⚠️ {pdf_path} non è un delta: sostituisce lo stato precedente")
+            elif previous_id and delta.get('base_snapshot_id') != previous_id:
+                print(f"⚠️ {pdf_path} è stato creato da un'altra base: la catena potrebbe non essere coerente")
+            chain.apply(files_data, delta.get('deleted', ()) if delta else (),
+                        replace=index > 0 and delta is None)
+            if delta is not None:
+                print(f"🔀 Delta applicato: {len(files_data)} file aggiornati, "
+                      f"{len(delta.get('deleted', ()))} eliminati")
+            previous_id = self.snapshot_metadata.get('snapshot_id')
+        print(f"📁 Stato finale della catena: {len(chain)} file")
+        return chain, project_name
+
+    def iter_recreated_files(self, pdf_path, use_cache=True):
+        """
+        Restituisce in modo lazy (percorso, byte UTF-8) per ogni file del PDF,
+        senza scrivere nulla: ogni file viene decodificato solo quando richiesto
+        """
+        snapshot = self.load_snapshot(pdf_path, use_cache)
+        if snapshot is None:
+            return
+        files_data = snapshot[0]
+        try:
+            for file_path, raw_content in files_data.items():
+                yield file_path, self.clean_file_content(raw_content, file_path).encode('utf-8')
+        finally:
+            self._close_files_data(files_data)
+
+    def _snapshot_hash(self, pdf_path):
+        """Hash del PDF; per una catena, l'insieme ordinato degli hash dei PDF"""
+        if isinstance(pdf_path, (list, tuple)):
+            return ','.join(self.snapshot_cache.pdf_hash(path) for path in pdf_path)
+        return self.snapshot_cache.pdf_hash(pdf_path)
+
+    @timed_run('restore')
+    def recreate_project_structure(self, pdf_path, output_folder, profile=False, profile_capture=None,
+                                   output_format='directory', use_cache=True, resume=False):
+        """
+        Ricrea l'intera struttura del progetto dal PDF in una cartella dedicata.
+        output_format ('zip', 'tar', 'tar.gz', 'tar.xz') scrive invece direttamente un
+        archivio <progetto>.<formato> in output_folder (o nel percorso/file indicato);
+        'memory' restituisce il dizionario {percorso: byte} senza scrivere su disco.
+        Con profile=True il report include tempi per fase e contatori;
+        profile_capture ('cprofile' o 'tracemalloc') salva anche i dump accanto all'output.
+        Con use_cache un PDF già ripristinato viene letto dalla cache degli snapshot.
+        Nelle cartelle un journal registra i file completati: con resume una ricostruzione
+        interrotta dello stesso PDF riprende saltando i file già scritti.
+        pdf_path può essere una lista [snapshot completo, delta, ...]: viene ricostruito
+        lo stato dopo l'ultimo delta.
+        """
+        if profile or profile_capture:
+            self.instrumentation = Instrumentation(profile_capture)
+        else:
+            self.instrumentation = NULL_INSTRUMENTATION
+        instrumentation = self.instrumentation
+        instrumentation.start()
         
-        # Scrivi un report di ricostruzione
-        self.write_reconstruction_report(output_path, files_created, errors, files_data, project_name)
+        try:
+            with STAGE_SECONDS.time(operation='restore', stage='load'):
+                snapshot = self.load_snapshot(pdf_path, use_cache)
+            if snapshot is None:
+                instrumentation.stop()
+                return False
+            files_data, project_name = snapshot
+            
+            # Destinazione: cartella con il nome esatto del progetto, archivio o memoria
+            sink = create_sink(output_format, output_folder, project_name)
+            
+            files_created = 0
+            errors = []
+            
+            # Manifest di integrità: le cartelle vengono verificate rileggendo i file scritti,
+            # per gli archivi e la memoria si calcola l'hash dei byte scritti in un pool di thread
+            self.verification = None
+            manifest = self.snapshot_metadata.get(MANIFEST_KEY)
+            hasher = None
+            digests = {}
+            if manifest and output_format != 'directory':
+                hasher = ThreadPoolExecutor(max_workers=VERIFY_WORKERS)
+            
+            # Journal di ripresa (solo cartelle: gli archivi vengono scritti in flusso)
+            journal = None
+            completed = set()
+            if output_format == 'directory':
+                journal = ReconstructionJournal(sink.location, self._snapshot_hash(pdf_path), project_name)
+                completed = journal.open(resume)
+                if completed:
+                    print(f"⏩ Ripresa: {len(completed)} file già completati vengono saltati")
+            
+            write_started = time.perf_counter()
+            for file_path, raw_content in files_data.items():
+                if file_path in completed and (sink.location / file_path).is_file():
+                    files_created += 1
+                    instrumentation.count('resumed_files')
+                    continue
+                try:
+                    # Pulisci il contenuto PRESERVANDO TUTTI GLI SPAZI e DECODIFICANDO EMOJI
+                    with instrumentation.span('decode'):
+                        cleaned_content = self.clean_file_content(raw_content, file_path)
+                    
+                    # Scrivi il file con encoding UTF-8
+                    with instrumentation.span('write'):
+                        sink.write_text(file_path, cleaned_content)
+                    if journal is not None:
+                        journal.record_file(file_path)
+                    data = cleaned_content.encode('utf-8', errors='surrogatepass')
+                    if hasher is not None:
+                        digests[file_path.replace('\\', '/')] = hasher.submit(digest_bytes, data)
+                    
+                    files_created += 1
+                    line_count = len(cleaned_content.splitlines())
+                    instrumentation.count('files')
+                    instrumentation.count('lines', line_count)
+                    instrumentation.count('bytes', len(data))
+                    FILES.inc(operation='restore')
+                    LINES.inc(line_count, operation='restore')
+                    BYTES.inc(len(data), operation='restore')
+                    
+                    # ANALISI DETTAGLIATA del file creato
+                    self._analyze_file_structure(file_path, cleaned_content, files_created)
+                    
+                except Exception as e:
+                    error_msg = f"❌ Errore con {file_path}: {str(e)}"
+                    errors.append(error_msg)
+                    print(error_msg)
+            
+            STAGE_SECONDS.observe(time.perf_counter() - write_started, operation='restore', stage='write')
+            
+            if manifest:
+                with instrumentation.span('verify'), STAGE_SECONDS.time(operation='restore', stage='verify'):
+                    if hasher is not None:
+                        self.verification = verify_manifest(
+                            manifest, lambda path: digests[path].result() if path in digests else None, 1
+                        )
+                        hasher.shutdown()
+                    else:
+                        self.verification = verify_directory(sink.location, manifest)
+                RESTORE_MISMATCHES.inc(len(self.verification.mismatched), kind='diverso')
+                RESTORE_MISMATCHES.inc(len(self.verification.missing), kind='mancante')
+                print(f"\n🔐 Verifica integrità:\n{self.verification.summary()}")
+            
+            # Ferma la strumentazione: i dump vanno accanto alla cartella di output
+            dump_folder = Path(output_folder) if isinstance(output_folder, (str, Path)) else Path('saved')
+            if str(dump_folder).lower().endswith(f".{output_format}"):
+                dump_folder = dump_folder.parent
+            instrumentation.stop(dump_folder / f"{project_name}_ricostruzione")
+        except BaseException:
+            # Errore: cProfile/tracemalloc vengono fermati senza salvare i dump
+            instrumentation.stop()
+            raise
+        
+        # Scrivi un report di ricostruzione (nell'archivio per gli output compressi;
+        # la mappa in memoria contiene solo i file del progetto)
+        output_location = sink.location
+        if output_format != 'memory':
+            self.write_reconstruction_report(output_location, files_created, errors, files_data, project_name,
+                                             sink=sink)
+        result = sink.close()
+        if journal is not None:
+            # Con errori il journal resta, per riprendere solo i file mancanti
+            journal.close(completed=not errors)
+        self._close_files_data(files_data)
         
         print(f"\n🎉 RICOSTRUZIONE COMPLETATA!")
         print(f"📁 Progetto: {project_name}")
         print(f"📊 File creati: {files_created}")
         print(f"❌ Errori: {len(errors)}")
-        print(f"📂 Output: {output_path.absolute()}")
+        print(f"📂 Output: {output_location.absolute() if isinstance(output_location, Path) else output_location}")
         
         if errors:
             print("\nErrori riscontrati:")
             for error in errors:
                 print(f"  - {error}")
         
-        return output_path
+        return result
+
+    @staticmethod
+    def _close_files_data(files_data):
+        """Chiude le mappe dei file lette dalla cache o da una catena di delta"""
+        close = getattr(files_data, 'close', None)
+        if close is not None:
+            close()
+
+    def verify_project(self, pdf_path, project_dir, workers=VERIFY_WORKERS):
+        """
+        Verifica una cartella di progetto esistente con il manifest del PDF, senza
+        scrivere nulla: legge solo i metadati, non le pagine.
+        Restituisce il VerificationResult, None se il PDF non ha un manifest.
+        """
+        try:
+            with open(pdf_path, 'rb') as file:
+                metadata = read_snapshot_metadata(PyPDF2.PdfReader(file))
+        except Exception as e:
+            print(f"❌ Errore nella lettura del PDF: {e}")
+            return None
+        
+        manifest = metadata.get(MANIFEST_KEY)
+        if not manifest:
+            print("⚠️ Il PDF non contiene un manifest di integrità")
+            return None
+        
+        print(f"🔐 Verifica di {project_dir} ({len(manifest)} file nel manifest)...")
+        self.verification = verify_directory(project_dir, manifest, workers)
+        print(self.verification.summary())
+        return self.verification
 
     def _extract_project_name(self, files_data, pdf_path, pdf_text):
         """Estrae il nome del progetto dal PDF"""
@@ -405,8 +778,9 @@ class ProjectRecreator:
             print(f"   📊 Statistiche: {line_count} linee, {max_indent} spazi max, {avg_indent} spazi medi")
             print(f"   📏 Lunghezza max riga: {max_line_length} caratteri")
 
-    def write_reconstruction_report(self, output_path, files_created, errors, files_data, project_name):
-        """Scrive un report dettagliato della ricostruzione"""
+    def write_reconstruction_report(self, output_path, files_created, errors, files_data, project_name,
+                                    sink=None):
+        """Scrive un report dettagliato della ricostruzione (in sink se indicato)"""
         report_content = f"""RICOSTRUZIONE PROGETTO DA PDF
 ===============================
 
@@ -436,7 +810,7 @@ STATISTICHE:
 -----------
 File totali nel PDF: {len(files_data)}
 File creati: {files_created}
-Success rate: {(files_created/len(files_data))*100:.1f}%
+Success rate: {(files_created/len(files_data))*100 if files_data else 100.0:.1f}%
 
 ESTENSIONI FILE RICOSTRUITE:
 ---------------------------
@@ -451,6 +825,20 @@ ESTENSIONI FILE RICOSTRUITE:
         for ext, count in sorted(extensions.items()):
             report_content += f"- {ext or 'Nessuna'}: {count} file\n"
 
+        if self.verification is not None:
+            report_content += f"""
+VERIFICA INTEGRITÀ (SHA-256):
+-----------------------------
+{self.verification.summary()}
+"""
+
+        if self.instrumentation.enabled:
+            report_content += f"""
+PROFILO PRESTAZIONI:
+--------------------
+{self.instrumentation.summary()}
+"""
+
         report_content += f"""
 TECNICA DI PRESERVAZIONE SPAZI:
 -------------------------------
@@ -471,5 +859,8 @@ ALGORITMO INTELLIGENTE:
 
 """
 
-        with open(output_path / "RICOSTRUZIONE_REPORT.txt", 'w', encoding='utf-8') as f:
+        if sink is not None:
+            sink.write_text("RICOSTRUZIONE_REPORT.txt", report_content)
+            return
+        with open(Path(output_path) / "RICOSTRUZIONE_REPORT.txt", 'w', encoding='utf-8') as f:
             f.write(report_content)
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Modulo per le statistiche dei progetti: file inclusi, esclusi e saltati con le stesse
+regole della creazione, righe, byte per estensione e file più grandi, con una cache
+per cartella che rende immediata la riapertura sullo stesso progetto
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from core.config import STATS_CACHE_DIR, STATS_LARGEST_FILES, STATS_WORKERS
+from core.ignore_rules import IGNORE_FILE_NAMES
+from core.journal import atomic_write_text
+
+# Stato dei file nella cache (oltre ai motivi di scarto SKIP_BINARY / SKIP_TOO_LARGE)
+STATUS_INCLUDED = 'incluso'
+STATUS_EXCLUDED = 'escluso'
+
+# Versione del formato della cache: un formato diverso viene ricalcolato
+STATS_CACHE_VERSION = 2
+
+_COUNT_CHUNK_SIZE = 1024 * 1024
+
+
+def count_lines(path):
+    """Conta le righe leggendo il file a blocchi (l'ultima riga può non terminare con a capo)"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    return lines + (last != b'\n')
+
+
+class ProjectStatsEngine:
+    """
+    Calcola le statistiche di un progetto in un thread qualsiasi (non tocca Tk).
+    La cache conserva per ogni cartella mtime, sottocartelle e file (dimensione, mtime,
+    stato, righe): una cartella con lo stesso mtime viene riusata senza elencarla né
+    leggere i suoi file. Aggiungere, eliminare o rinominare file cambia l'mtime della
+    cartella; una modifica sul posto no, quindi refresh=True ricontrolla ogni file
+    (le righe vengono ricontate solo per i file con dimensione o mtime diversi).
+    La cache dipende dalle esclusioni: regole diverse usano un file diverso. Ogni cartella
+    conserva anche l'impronta dei file .gitignore/.syncroignore suoi e delle cartelle
+    superiori: se uno di questi cambia, la cartella e le sottocartelle vengono rielencate.
+    """
+
+    def __init__(self, file_manager, cache_dir=STATS_CACHE_DIR, workers=STATS_WORKERS):
+        self.file_manager = file_manager
+        self.cache_dir = Path(cache_dir)
+        self.workers = max(1, workers)
+
+    def _cache_path(self, project_path):
+        file_manager = self.file_manager
+        try:
+            global_rules_mtime = os.stat(file_manager.global_ignore_file).st_mtime_ns
+        except OSError:
+            global_rules_mtime = None
+        key = json.dumps([str(project_path.resolve()), file_manager.get_exclusions(), global_rules_mtime,
+                          file_manager.max_text_file_size, file_manager.use_ignore_files], sort_keys=True)
+        return self.cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]}.json"
+
+    def _load_cache(self, cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != STATS_CACHE_VERSION:
+            return {}
+        return data.get('directories', {})
+
+    def _scan_directory(self, directory, relative_dir, excluded, mtime_ns, cached, ignore_engine):
+        """Elenca una cartella e classifica i file nuovi o cambiati"""
+        file_manager = self.file_manager
+        previous = {record[0]: record for record in cached['files']} if cached else {}
+        prefix = f"{relative_dir}/" if relative_dir else ''
+        matcher = None if excluded else ignore_engine.matcher_for(relative_dir)
+        dirs = []
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Come os.walk: le cartelle collegate non vengono attraversate
+                        if not entry.is_symlink():
+                            dirs.append([entry.name, excluded or entry.name in file_manager.excluded_dirs
+                                         or matcher.is_ignored(prefix + entry.name, True)])
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                record = previous.get(entry.name)
+                if record is not None and record[1] == stat_result.st_size and record[2] == stat_result.st_mtime_ns:
+                    files.append(record)
+                    continue
+                file_path = Path(entry.path)
+                if (excluded or file_manager.should_exclude(file_path, Path(prefix + entry.name))
+                        or matcher.is_ignored(prefix + entry.name, False)):
+                    status = STATUS_EXCLUDED
+                else:
+                    status = file_manager.classify_file(file_path) or STATUS_INCLUDED
+                files.append([entry.name, stat_result.st_size, stat_result.st_mtime_ns, status, None])
+        return {'mtime_ns': mtime_ns, 'excluded': excluded, 'dirs': sorted(dirs), 'files': files}
+
+    @staticmethod
+    def _rules_stamp(directory, parent_stamp):
+        """Impronta dei file di regole della cartella (dimensione e mtime) e delle cartelle superiori"""
+        parts = [parent_stamp]
+        for name in IGNORE_FILE_NAMES:
+            try:
+                stat_result = os.stat(directory / name)
+            except OSError:
+                continue
+            parts.append(f"{name}:{stat_result.st_size}:{stat_result.st_mtime_ns}")
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def compute(self, project_path, refresh=False):
+        """Restituisce il dizionario delle statistiche del progetto e aggiorna la cache"""
+        started = time.perf_counter()
+        project_path = Path(project_path)
+        if not project_path.is_dir():
+            raise ValueError(f"La cartella '{project_path}' non esiste.")
+        cache_path = self._cache_path(project_path)
+        cached_directories = self._load_cache(cache_path)
+        ignore_engine = self.file_manager.create_ignore_engine(project_path)
+
+        directories = {}
+        reused = 0
+        stack = [('', False, '')]
+        while stack:
+            relative_dir, excluded, parent_stamp = stack.pop()
+            directory = project_path / relative_dir if relative_dir else project_path
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            rules_stamp = self._rules_stamp(directory, parent_stamp)
+            cached = cached_directories.get(relative_dir)
+            if (not refresh and cached is not None and cached['mtime_ns'] == mtime_ns
+                    and cached['excluded'] == excluded and cached.get('rules') == rules_stamp):
+                entry = cached
+                reused += 1
+            else:
+                # Con regole cambiate gli stati salvati non valgono più: i file vengono riclassificati
+                previous = cached if cached is not None and cached.get('rules') == rules_stamp else None
+                try:
+                    entry = self._scan_directory(directory, relative_dir, excluded, mtime_ns, previous,
+                                                 ignore_engine)
+                except OSError:
+                    continue
+                entry['rules'] = rules_stamp
+            directories[relative_dir] = entry
+            prefix = f"{relative_dir}/" if relative_dir else ''
+            stack.extend((prefix + name, dir_excluded, rules_stamp) for name, dir_excluded in entry['dirs'])
+        self.file_manager.content_cache.save()
+
+        # Righe dei file inclusi nuovi o cambiati, lette in parallelo
+        to_count = [(record, project_path / relative_dir / record[0])
+                    for relative_dir, entry in directories.items()
+                    for record in entry['files'] if record[3] == STATUS_INCLUDED and record[4] is None]
+        if to_count:
+            def safe_count(path):
+                try:
+                    return count_lines(path)
+                except OSError:
+                    return 0
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for (record, _), lines in zip(to_count, executor.map(safe_count, [path for _, path in to_count])):
+                    record[4] = lines
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(cache_path, json.dumps({'version': STATS_CACHE_VERSION,
+                                                      'directories': directories}))
+        except OSError as e:
+            print(f"Avviso: impossibile salvare la cache delle statistiche: {e}")
+
+        stats = self._aggregate(project_path, directories)
+        stats['cached_directories'] = reused
+        stats['counted_files'] = len(to_count)
+        stats['seconds'] = time.perf_counter() - started
+        return stats
+
+    @staticmethod
+    def _aggregate(project_path, directories):
+        stats = {
+            'project': str(project_path),
+            'files': 0,
+            'bytes': 0,
+            'lines': 0,
+            # {estensione: {'files', 'bytes', 'lines'}} dei file inclusi
+            'extensions': {},
+            'largest': [],
+            'excluded': {'files': 0, 'bytes': 0},
+            # {motivo: {'files', 'bytes'}} dei file non esclusi ma saltati (binari, troppo grandi)
+            'skipped': {},
+            'directories': len(directories)
+        }
+        included = []
+        for relative_dir, entry in directories.items():
+            for name, size, _, status, lines in entry['files']:
+                if status == STATUS_INCLUDED:
+                    stats['files'] += 1
+                    stats['bytes'] += size
+                    stats['lines'] += lines or 0
+                    extension = os.path.splitext(name)[1].lower()
+                    totals = stats['extensions'].setdefault(extension, {'files': 0, 'bytes': 0, 'lines': 0})
+                    totals['files'] += 1
+                    totals['bytes'] += size
+                    totals['lines'] += lines or 0
+                    included.append((size, relative_dir, name, lines))
+                elif status == STATUS_EXCLUDED:
+                    stats['excluded']['files'] += 1
+                    stats['excluded']['bytes'] += size
+                else:
+                    totals = stats['skipped'].setdefault(status, {'files': 0, 'bytes': 0})
+                    totals['files'] += 1
+                    totals['bytes'] += size
+        stats['largest'] = [
+            {'path': f"{relative_dir}/{name}" if relative_dir else name, 'size': size, 'lines': lines}
+            for size, relative_dir, name, lines in heapq.nlargest(STATS_LARGEST_FILES, included)
+        ]
+        return stats
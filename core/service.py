@@ -0,0 +1,521 @@
+"""
+Modulo per il servizio locale di snapshot: API HTTP (solo libreria standard) per
+accodare creazioni e ricostruzioni, seguirne lo stato, annullarle e scaricarne il
+risultato. Ogni job gira in un processo separato, così può essere annullato anche
+durante l'esecuzione.
+
+    POST /jobs                  {"kind": "create", "project": "...", "exclusions": {...}, "options": {...}}
+                                {"kind": "recreate", "pdf": "..." o ["base", "delta", ...], "format": "zip"}
+    GET  /jobs                  elenco dei job
+    GET  /jobs/<id>             stato del job
+    POST /jobs/<id>/cancel      annulla (anche DELETE /jobs/<id>)
+    GET  /jobs/<id>/artifact    PDF o archivio prodotto, letto a blocchi dal disco
+    GET  /health                stato della coda
+    GET  /metrics               metriche in formato testo Prometheus (anche dei job)
+
+Ogni richiesta deve avere 'Authorization: Bearer <token>' con il token scritto all'avvio
+in SERVICE_TOKEN_FILE (leggibile solo dall'utente) e un'intestazione Host locale
+(127.0.0.1, localhost o [::1] con la porta del servizio); POST /jobs richiede anche
+'Content-Type: application/json'. Così una pagina web aperta nel browser non può
+accodare job né leggerne i risultati, neanche con il DNS rebinding.
+"""
+
+import datetime
+import hmac
+import json
+import multiprocessing
+import os
+import queue
+import secrets
+import shutil
+import sys
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from core.config import (SERVICE_HOST, SERVICE_JOB_RETENTION, SERVICE_JOBS_DIR, SERVICE_MAX_FINISHED_JOBS,
+                         SERVICE_PORT, SERVICE_QUEUE_SIZE, SERVICE_TOKEN_FILE, SERVICE_WORKERS)
+from core.journal import atomic_write_text
+from core.metrics import REGISTRY, write_metrics_file
+from core.output_sinks import OUTPUT_FORMATS
+from core.sources import project_name
+
+# Stati dei job
+JOB_QUEUED = 'in coda'
+JOB_RUNNING = 'in esecuzione'
+JOB_DONE = 'completato'
+JOB_FAILED = 'fallito'
+JOB_CANCELLED = 'annullato'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+JOB_KINDS = ('create', 'recreate')
+
+# Opzioni di create_project_pdf accettate dall'API
+CREATE_OPTIONS = ('max_file_size', 'minified_policy', 'workers', 'source', 'revision')
+
+# Formati di ricostruzione scaricabili come un unico file
+RECREATE_FORMATS = tuple(f for f in OUTPUT_FORMATS if f not in ('directory', 'memory'))
+
+# Secondi tra due controlli della richiesta di annullamento di un job in esecuzione
+_CANCEL_POLL_INTERVAL = 0.2
+
+# Blocchi inviati durante il download dei risultati
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_TYPES = {'.pdf': 'application/pdf', '.zip': 'application/zip', '.tar': 'application/x-tar',
+                  '.gz': 'application/gzip', '.xz': 'application/x-xz'}
+
+
+def _timestamp():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def _run_job_process(kind, params, job_dir):
+    """Processo di un job: output nel log del job, esito in result.json"""
+    job_dir = Path(job_dir)
+    with open(job_dir / 'job.log', 'w', encoding='utf-8') as log:
+        sys.stdout = sys.stderr = log
+        try:
+            if kind == 'create':
+                from core.pdf_converter import PDFConverter
+                converter = PDFConverter()
+                output_pdf = job_dir / f"{project_name(params['project'])}_Snapshot.pdf"
+                files_processed, pdf_path = converter.create_project_pdf(
+                    params['project'], output_pdf, params.get('exclusions'),
+                    open_after_creation=False, **params.get('options', {})
+                )
+                result = {'status': JOB_DONE, 'artifact': pdf_path, 'files': files_processed,
+                          'pages': converter.pdf.page}
+            else:
+                from core.project_recreator import ProjectRecreator
+                recreator = ProjectRecreator()
+                artifact = recreator.recreate_project_structure(params['pdf'], job_dir,
+                                                                output_format=params.get('format', 'zip'))
+                if not artifact:
+                    raise ValueError("Nessun file ricostruito dal PDF")
+                verification = recreator.verification
+                result = {'status': JOB_DONE, 'artifact': str(artifact),
+                          'verified': verification.ok if verification is not None else None}
+        except Exception as e:
+            traceback.print_exc()
+            result = {'status': JOB_FAILED, 'error': str(e)}
+    # Processo nuovo per ogni job: il registro contiene solo le metriche di questo job
+    result['metrics'] = REGISTRY.snapshot()
+    atomic_write_text(job_dir / 'result.json', json.dumps(result, ensure_ascii=False))
+
+
+class Job:
+    """Richiesta di creazione o ricostruzione con il suo stato"""
+
+    def __init__(self, kind, params, jobs_dir):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.dir = Path(jobs_dir) / self.id
+        self.status = JOB_QUEUED
+        self.created = _timestamp()
+        self.started = None
+        self.finished = None
+        # time.time() della conclusione, per la conservazione dei job conclusi
+        self.finished_at = None
+        self.error = None
+        self.artifact = None
+        # Dettagli dell'esito (file, pagine, verifica di integrità)
+        self.details = {}
+        self.cancel_event = threading.Event()
+
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+            'artifact': Path(self.artifact).name if self.artifact else None,
+            'links': {'self': f"/jobs/{self.id}", 'cancel': f"/jobs/{self.id}/cancel",
+                      'artifact': f"/jobs/{self.id}/artifact"}
+        }
+        data.update(self.details)
+        return data
+
+    def finish(self, status, error=None):
+        """Segna il job come concluso"""
+        self.status = status
+        if error is not None:
+            self.error = error
+        self.finished = _timestamp()
+        self.finished_at = time.time()
+
+
+def validate_job(request):
+    """Controlla una richiesta di job; restituisce (tipo, parametri) o solleva ValueError"""
+    if not isinstance(request, dict):
+        raise ValueError("Il corpo della richiesta deve essere un oggetto JSON")
+    kind = request.get('kind')
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Tipo di job non valido: {kind} (ammessi: {', '.join(JOB_KINDS)})")
+
+    if kind == 'create':
+        project = request.get('project')
+        if not project or not Path(project).exists():
+            raise ValueError(f"Progetto non trovato: {project}")
+        options = request.get('options') or {}
+        unknown = sorted(set(options) - set(CREATE_OPTIONS))
+        if unknown:
+            raise ValueError(f"Opzioni non valide: {', '.join(unknown)}")
+        return kind, {'project': str(Path(project).absolute()), 'exclusions': request.get('exclusions'),
+                      'options': options}
+
+    pdf = request.get('pdf')
+    pdf_paths = pdf if isinstance(pdf, list) else [pdf]
+    if not pdf or not all(isinstance(path, str) and Path(path).is_file() for path in pdf_paths):
+        raise ValueError(f"PDF non trovato: {pdf}")
+    output_format = request.get('format', 'zip')
+    if output_format not in RECREATE_FORMATS:
+        raise ValueError(f"Formato non valido: {output_format} (ammessi: {', '.join(RECREATE_FORMATS)})")
+    pdf_paths = [str(Path(path).absolute()) for path in pdf_paths]
+    return kind, {'pdf': pdf_paths if len(pdf_paths) > 1 else pdf_paths[0], 'format': output_format}
+
+
+class SnapshotService:
+    """
+    Coda limitata di job eseguiti da workers thread, ognuno dei quali avvia un processo
+    per job. Con queue_size job in attesa submit solleva queue.Full (429 via HTTP); i job
+    annullati in coda non occupano posti. I job conclusi restano consultabili per
+    retention secondi (al massimo max_finished), poi vengono eliminati con la loro cartella.
+    """
+
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS,
+                 queue_size=SERVICE_QUEUE_SIZE, jobs_dir=SERVICE_JOBS_DIR, token_file=SERVICE_TOKEN_FILE,
+                 retention=SERVICE_JOB_RETENTION, max_finished=SERVICE_MAX_FINISHED_JOBS):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._queue_size = queue_size
+        # Illimitata: la capienza si conta sui job ancora in attesa (vedi submit)
+        self._queue = queue.Queue()
+        self.retention = retention
+        self.max_finished = max_finished
+        # spawn: i processi dei job non ereditano i thread del server
+        self._context = multiprocessing.get_context('spawn')
+        self._worker_threads = []
+        self.httpd = None
+        self.token_file = Path(token_file)
+        self.token = None
+
+    @property
+    def queue_size(self):
+        return self._queue_size
+
+    # --- Job ---
+
+    def submit(self, request):
+        """Accoda un job; ValueError se la richiesta non è valida, queue.Full se la coda è piena"""
+        kind, params = validate_job(request)
+        job = Job(kind, params, self.jobs_dir)
+        self.prune_jobs()
+        with self._jobs_lock:
+            if sum(1 for queued in self.jobs.values() if queued.status == JOB_QUEUED) >= self._queue_size:
+                raise queue.Full
+            self.jobs[job.id] = job
+            self._queue.put_nowait(job)
+        print(f"📥 Job {job.id} accodato ({kind})")
+        return job
+
+    def get(self, job_id):
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._jobs_lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Annulla un job in coda o in esecuzione; None se il job non esiste"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.status == JOB_QUEUED:
+            job.finish(JOB_CANCELLED)
+        return job
+
+    def prune_jobs(self):
+        """Elimina i job conclusi oltre la conservazione, con le loro cartelle"""
+        limit = time.time() - self.retention
+        with self._jobs_lock:
+            finished = sorted((job for job in self.jobs.values() if job.status in FINISHED_STATES
+                               and job.finished_at is not None), key=lambda job: job.finished_at)
+            excess = len(finished) - self.max_finished
+            expired = [job for index, job in enumerate(finished) if index < excess or job.finished_at < limit]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.dir, ignore_errors=True)
+        return len(expired)
+
+    def _prune_stale_directories(self):
+        """Cartelle di job di esecuzioni precedenti del servizio più vecchie della conservazione"""
+        limit = time.time() - self.retention
+        try:
+            entries = list(os.scandir(self.jobs_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir() and entry.name not in self.jobs and entry.stat().st_mtime < limit:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if job.status == JOB_QUEUED:
+                try:
+                    self._execute(job)
+                except Exception as e:
+                    job.finish(JOB_FAILED, str(e))
+                self.prune_jobs()
+
+    def _execute(self, job):
+        """Esegue il job in un processo; lo termina se viene richiesto l'annullamento"""
+        job.dir.mkdir(parents=True, exist_ok=True)
+        job.status = JOB_RUNNING
+        job.started = _timestamp()
+        print(f"⚙️ Job {job.id} in esecuzione")
+        process = self._context.Process(target=_run_job_process, args=(job.kind, job.params, str(job.dir)))
+        process.start()
+        while process.is_alive():
+            if job.cancel_event.wait(_CANCEL_POLL_INTERVAL):
+                process.terminate()
+                process.join()
+                job.finish(JOB_CANCELLED)
+                print(f"🛑 Job {job.id} annullato")
+                return
+        process.join()
+
+        try:
+            with open(job.dir / 'result.json', 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            result = {'status': JOB_FAILED, 'error': f"processo terminato con codice {process.exitcode}"}
+        status = result.pop('status')
+        job.error = result.pop('error', None)
+        job.artifact = result.pop('artifact', None)
+        REGISTRY.merge(result.pop('metrics', {}))
+        write_metrics_file()
+        job.details = result
+        job.finish(status)
+        print(f"{'✅' if job.status == JOB_DONE else '❌'} Job {job.id} {job.status}")
+
+    # --- Server ---
+
+    def start_workers(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True)
+            thread.start()
+            self._worker_threads.append(thread)
+
+    def _write_token(self):
+        """Genera il token di questa istanza e lo scrive leggibile solo dall'utente"""
+        self.token = secrets.token_urlsafe(32)
+        self.token_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.remove(self.token_file)
+        except OSError:
+            pass
+        descriptor = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            f.write(self.token + '\n')
+
+    def allowed_hosts(self):
+        """Valori ammessi dell'intestazione Host (contro il DNS rebinding)"""
+        names = {'127.0.0.1', 'localhost', '[::1]', self.host}
+        return {f"{name}:{self.port}" for name in names}
+
+    def _bind(self):
+        """Apre il socket del server HTTP; con porta 0 viene scelta una porta libera"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _ServiceHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+        self.port = self.httpd.server_address[1]
+        self._write_token()
+        self._prune_stale_directories()
+        print(f"🔑 Token di accesso in {self.token_file}")
+        print(f"🌐 Servizio SyncroNet su http://{self.host}:{self.port} "
+              f"({self.workers} worker, coda di {self.queue_size} job)")
+
+    def serve_forever(self):
+        """Avvia worker e server HTTP e resta in ascolto fino a stop() o Ctrl+C"""
+        if not self._worker_threads:
+            self.start_workers()
+        if self.httpd is None:
+            self._bind()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def start(self):
+        """Avvia il servizio in un thread in background; restituisce la porta in ascolto"""
+        self.start_workers()
+        self._bind()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.port
+
+    def stop(self):
+        """Ferma il server, annulla i job in esecuzione e chiude i worker"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+        for job in self.list_jobs():
+            if job.status in (JOB_QUEUED, JOB_RUNNING):
+                self.cancel(job.id)
+        for _ in self._worker_threads:
+            self._queue.put(None)
+        for thread in self._worker_threads:
+            thread.join()
+        self._worker_threads = []
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """Richieste HTTP del servizio: corpo e risposte in JSON"""
+
+    server_version = 'SyncroNetService'
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {'error': message}, headers)
+
+    def _authorized(self):
+        """Controlla Host e token; in caso contrario risponde con l'errore e restituisce False"""
+        if self.headers.get('Host', '').lower() not in self.service.allowed_hosts():
+            self._send_error(403, "Host non ammesso")
+            return False
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode('utf-8'),
+                                                                 self.service.token.encode('utf-8')):
+            self._send_error(401, "Token mancante o non valido", {'WWW-Authenticate': 'Bearer'})
+            return False
+        return True
+
+    def _route(self):
+        """Restituisce (id del job o None, azione o None) dal percorso"""
+        parts = [part for part in self.path.split('?', 1)[0].split('/') if part]
+        if not parts or parts[0] != 'jobs':
+            return parts, None, None
+        return parts, (parts[1] if len(parts) > 1 else None), (parts[2] if len(parts) > 2 else None)
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts, job_id, action = self._route()
+        if parts == ['health']:
+            queued = sum(1 for job in self.service.list_jobs() if job.status == JOB_QUEUED)
+            self._send_json(200, {'status': 'ok', 'queued': queued, 'queue_size': self.service.queue_size,
+                                  'workers': self.service.workers})
+            return
+        if parts == ['metrics']:
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if parts == ['jobs']:
+            self._send_json(200, {'jobs': [job.to_dict() for job in self.service.list_jobs()]})
+            return
+        job = self.service.get(job_id) if job_id else None
+        if job is None:
+            self._send_error(404, "Job non trovato")
+        elif action is None:
+            self._send_json(200, job.to_dict())
+        elif action == 'artifact':
+            self._send_artifact(job)
+        else:
+            self._send_error(404, "Risorsa non trovata")
+
+    def _send_artifact(self, job):
+        """Invia il risultato leggendolo a blocchi, senza caricarlo in memoria"""
+        if job.status != JOB_DONE or not job.artifact:
+            self._send_error(409, f"Risultato non disponibile: job {job.status}")
+            return
+        artifact = Path(job.artifact)
+        try:
+            file = open(artifact, 'rb')
+        except OSError:
+            self._send_error(410, "Il risultato non è più presente sul disco")
+            return
+        with file:
+            self.send_response(200)
+            self.send_header('Content-Type', _CONTENT_TYPES.get(artifact.suffix.lower(), 'application/octet-stream'))
+            self.send_header('Content-Length', str(os.fstat(file.fileno()).st_size))
+            self.send_header('Content-Disposition', f'attachment; filename="{artifact.name}"')
+            self.end_headers()
+            shutil.copyfileobj(file, self.wfile, _STREAM_CHUNK_SIZE)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        parts, job_id, action = self._route()
+        if parts == ['jobs']:
+            content_type = self.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+            if content_type != 'application/json':
+                self._send_error(415, "Il corpo deve essere application/json")
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                job = self.service.submit(request)
+            except queue.Full:
+                self._send_error(429, "Coda piena: riprovare più tardi", {'Retry-After': '5'})
+            except ValueError as e:
+                self._send_error(400, str(e))
+            else:
+                self._send_json(202, job.to_dict(), {'Location': f"/jobs/{job.id}"})
+        elif job_id and action == 'cancel':
+            self._cancel(job_id)
+        else:
+            self._send_error(404, "Risorsa non trovata")
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        parts, job_id, action = self._route()
+        if job_id and action is None:
+            self._cancel(job_id)
+        else:
+            self._send_error(404, "Risorsa non trovata")
+
+    def _cancel(self, job_id):
+        job = self.service.cancel(job_id)
+        if job is None:
+            self._send_error(404, "Job non trovato")
+        else:
+            self._send_json(200, job.to_dict())
@@ -0,0 +1,195 @@
+"""
+Modulo per la cache degli snapshot già analizzati: la mappa dei file estratta
+da un PDF viene salvata in un file binario compatto, letto con mmap, così un
+ripristino successivo dello stesso PDF salta estrazione e parsing
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from core.config import SNAPSHOT_CACHE_DIR, SNAPSHOT_CACHE_MAX_BYTES
+from core.encoding_detector import EncodingCache
+
+# Intestazione: firma, versione del formato, lunghezza dell'indice JSON.
+# La versione va incrementata quando cambia il parsing del ricostruttore.
+_MAGIC = b'SYNCSNAP'
+_HEADER = struct.Struct('<8sIQ')
+CACHE_FORMAT_VERSION = 1
+
+# Estensione dei file di cache
+_SUFFIX = '.snap'
+
+# Blocchi letti per calcolare l'hash del PDF
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CachedSnapshot(Mapping):
+    """
+    Mappa {percorso: contenuto} di uno snapshot in cache. Il file resta mappato
+    in memoria e ogni contenuto viene decodificato solo quando richiesto.
+    """
+
+    def __init__(self, cache_file):
+        self._file = open(cache_file, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_length = _HEADER.unpack_from(self._data, 0)
+            if magic != _MAGIC or version != CACHE_FORMAT_VERSION:
+                raise ValueError("Formato della cache non valido")
+            index_start = _HEADER.size
+            index = json.loads(self._data[index_start:index_start + index_length].decode('utf-8'))
+        except Exception:
+            self.close()
+            raise
+        self.project_name = index['project_name']
+        self.metadata = index['metadata']
+        data_start = index_start + index_length
+        self._entries = {path: (data_start + offset, data_start + offset + length)
+                         for path, offset, length in index['files']}
+
+    def __getitem__(self, path):
+        start, end = self._entries[path]
+        return self._data[start:end].decode('utf-8', errors='surrogatepass')
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        """Rilascia la mappatura e il file"""
+        data = getattr(self, '_data', None)
+        if data is not None:
+            data.close()
+            self._data = None
+        self._file.close()
+
+
+class SnapshotCache:
+    """Cache su disco degli snapshot analizzati, con eliminazione LRU per dimensione"""
+
+    def __init__(self, cache_dir=SNAPSHOT_CACHE_DIR, max_bytes=SNAPSHOT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Hash già calcolati per (percorso, mtime, dimensione): evita di rileggere il PDF
+        self.hash_cache = EncodingCache(self.cache_dir / 'pdf_hashes.json')
+
+    def pdf_hash(self, pdf_path):
+        """SHA-256 del contenuto del PDF"""
+        stat_result = os.stat(pdf_path)
+        key = EncodingCache.make_key(pdf_path, stat_result)
+        digest = self.hash_cache.get(key)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with open(pdf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            self.hash_cache.put(key, digest)
+            self.hash_cache.save()
+        return digest
+
+    def _cache_file(self, pdf_path):
+        return self.cache_dir / f"{self.pdf_hash(pdf_path)}{_SUFFIX}"
+
+    def load(self, pdf_path):
+        """Restituisce il CachedSnapshot del PDF, None se non presente o non valido"""
+        try:
+            cache_file = self._cache_file(pdf_path)
+        except OSError:
+            return None
+        if not cache_file.exists():
+            return None
+        try:
+            snapshot = CachedSnapshot(cache_file)
+        except (OSError, ValueError, KeyError):
+            self._remove(cache_file)
+            return None
+        # La data di modifica indica l'ultimo utilizzo per l'eliminazione LRU
+        try:
+            os.utime(cache_file)
+        except OSError:
+            pass
+        return snapshot
+
+    def store(self, pdf_path, files_data, project_name, metadata=None):
+        """Salva la mappa dei file analizzati dal PDF ed elimina le voci in eccesso"""
+        files = []
+        blobs = []
+        offset = 0
+        for path, content in files_data.items():
+            blob = content.encode('utf-8', errors='surrogatepass')
+            files.append((path, offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+        index = json.dumps({
+            'project_name': project_name,
+            'metadata': metadata or {},
+            'files': files
+        }, separators=(',', ':')).encode('utf-8')
+
+        try:
+            cache_file = self._cache_file(pdf_path)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix('.tmp')
+            with open(temp_file, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, CACHE_FORMAT_VERSION, len(index)))
+                f.write(index)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"Avviso: impossibile salvare lo snapshot in cache: {e}")
+            return
+        self.evict()
+
+    def _entries(self):
+        """File di cache con (percorso, dimensione, ultimo utilizzo)"""
+        entries = []
+        if not self.cache_dir.is_dir():
+            return entries
+        for cache_file in self.cache_dir.glob(f"*{_SUFFIX}"):
+            try:
+                stat_result = cache_file.stat()
+            except OSError:
+                continue
+            entries.append((cache_file, stat_result.st_size, stat_result.st_mtime))
+        return entries
+
+    def _remove(self, cache_file):
+        try:
+            cache_file.unlink()
+            return True
+        except OSError:
+            # Su Windows un file mappato da un'altra istanza non si può eliminare
+            return False
+
+    def evict(self):
+        """Elimina gli snapshot usati meno di recente finché la cache supera max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for cache_file, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(cache_file):
+                total -= size
+
+    def stats(self):
+        """Restituisce (numero di snapshot, byte occupati)"""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def purge(self):
+        """Svuota la cache; restituisce (snapshot eliminati, byte liberati)"""
+        removed = 0
+        freed = 0
+        for cache_file, size, _ in self._entries():
+            if self._remove(cache_file):
+                removed += 1
+                freed += size
+        return removed, freed
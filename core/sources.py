@@ -0,0 +1,481 @@
+"""
+Modulo per le sorgenti dei file da convertire: file su disco, indice git,
+commit/tag git letti con 'git cat-file --batch' senza checkout e archivi
+zip/tar letti senza estrarli in una cartella
+"""
+
+import atexit
+import io
+import os
+import shutil
+import stat
+import subprocess
+import tarfile
+import tempfile
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+from core.encoding_detector import EncodingCache
+
+# Modalità di enumerazione dei file del progetto
+SOURCE_MODES = ('directory', 'git', 'archive')
+
+# Suffissi degli archivi supportati (i composti prima dei semplici)
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.xz', '.tar.bz2', '.tgz', '.txz', '.tbz2', '.tar', '.zip')
+
+# Modo git dei link simbolici: il contenuto è il percorso di destinazione
+_GIT_SYMLINK_MODE = '120000'
+
+
+class FileEntry:
+    """File del progetto letto dal disco"""
+
+    __slots__ = ('path', 'relative_path')
+
+    def __init__(self, path, relative_path):
+        self.path = Path(path)
+        self.relative_path = Path(relative_path)
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def open(self):
+        """Apre il file in lettura binaria"""
+        return open(self.path, 'rb')
+
+    def cache_key(self, file=None):
+        """Chiave per la cache delle codifiche; con file aperto usa fstat"""
+        stat_result = os.fstat(file.fileno()) if file is not None else os.stat(self.path)
+        return EncodingCache.make_key(self.path, stat_result)
+
+    def __str__(self):
+        return str(self.path)
+
+
+class GitBlobEntry:
+    """File di un commit git, letto come blob senza checkout"""
+
+    __slots__ = ('repo_path', 'object_id', 'relative_path', 'size')
+
+    def __init__(self, repo_path, object_id, relative_path, size):
+        self.repo_path = str(repo_path)
+        self.object_id = object_id
+        self.relative_path = Path(relative_path)
+        self.size = size
+
+    def open(self):
+        """Restituisce il contenuto del blob come file binario in memoria"""
+        return io.BytesIO(_get_cat_file(self.repo_path).read_blob(self.object_id))
+
+    def cache_key(self, file=None):
+        """I blob sono indirizzati per contenuto: l'id è una chiave sempre valida"""
+        return f"git:{self.object_id}"
+
+    def __str__(self):
+        return f"{self.object_id[:12]}:{self.relative_path.as_posix()}"
+
+
+class ZipMemberEntry:
+    """Membro di un archivio zip: viene decompresso solo quando letto"""
+
+    __slots__ = ('archive_key', 'member_name', 'relative_path', 'size', 'crc')
+
+    def __init__(self, archive_key, member_name, relative_path, size, crc):
+        # (percorso, mtime_ns, dimensione) dell'archivio elencato
+        self.archive_key = tuple(archive_key)
+        self.member_name = member_name
+        self.relative_path = Path(relative_path)
+        self.size = size
+        self.crc = crc
+
+    @property
+    def archive_path(self):
+        return self.archive_key[0]
+
+    def open(self):
+        """Apre il membro come flusso decompresso"""
+        return _get_zip_file(*self.archive_key).open(self.member_name)
+
+    def cache_key(self, file=None):
+        return f"zip:{self.crc:08x}|{self.size}"
+
+    def __str__(self):
+        return f"{self.archive_path}:{self.member_name}"
+
+
+class MemoryEntry:
+    """File già letto in memoria (gruppi inviati ai worker remoti)"""
+
+    __slots__ = ('label', 'relative_path', 'data', 'mtime')
+
+    def __init__(self, label, relative_path, data, mtime=0):
+        self.label = label
+        self.relative_path = Path(relative_path)
+        self.data = data
+        self.mtime = mtime
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    def open(self):
+        return io.BytesIO(self.data)
+
+    def cache_key(self, file=None):
+        return f"{self.label}|{self.mtime}|{len(self.data)}"
+
+    def __str__(self):
+        return self.label
+
+
+def as_entry(file_path, relative_path):
+    """Restituisce una voce di sorgente per un percorso su disco (o la voce stessa)"""
+    if hasattr(file_path, 'open') and hasattr(file_path, 'cache_key'):
+        return file_path
+    return FileEntry(file_path, relative_path)
+
+
+def _run_git(repo_path, *args):
+    """Esegue un comando git nella cartella e restituisce lo stdout in byte"""
+    try:
+        result = subprocess.run(['git', '-C', str(repo_path), *args],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    except FileNotFoundError:
+        raise ValueError("Git non è installato o non è nel PATH.")
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode('utf-8', errors='replace').strip()
+        raise ValueError(f"Errore git in '{repo_path}': {message}")
+    return result.stdout
+
+
+def list_git_index_entries(project_path):
+    """
+    Elenca i file tracciati nell'indice git (git ls-files -z), relativi alla cartella
+    del progetto. Il contenuto viene letto dal disco; i file cancellati sono ignorati.
+    """
+    project_path = Path(project_path)
+    output = _run_git(project_path, 'ls-files', '-z', '--cached')
+    entries = []
+    for raw_path in output.split(b'\0'):
+        if not raw_path:
+            continue
+        relative_path = Path(os.fsdecode(raw_path))
+        file_path = project_path / relative_path
+        if file_path.is_file():
+            entries.append(FileEntry(file_path, relative_path))
+    return entries
+
+
+def list_git_revision_entries(project_path, revision):
+    """
+    Elenca i file di un commit o tag (git ls-tree -r -z -l) sotto la cartella del
+    progetto. I blob vengono letti in seguito con 'git cat-file --batch'.
+    """
+    project_path = Path(project_path)
+    output = _run_git(project_path, 'ls-tree', '-r', '-z', '-l', revision)
+    entries = []
+    for record in output.split(b'\0'):
+        if not record:
+            continue
+        # "<modo> <tipo> <id> <dimensione>\t<percorso>"
+        header, _, raw_path = record.partition(b'\t')
+        mode, object_type, object_id, size = header.decode('ascii').split()
+        # Sottomoduli e link simbolici non hanno contenuto da documentare
+        if object_type != 'blob' or mode == _GIT_SYMLINK_MODE:
+            continue
+        entries.append(GitBlobEntry(project_path, object_id, os.fsdecode(raw_path), int(size)))
+    return entries
+
+
+class GitCatFile:
+    """Processo 'git cat-file --batch' che fornisce i blob in sequenza su una pipe"""
+
+    def __init__(self, repo_path):
+        try:
+            self.process = subprocess.Popen(['git', '-C', str(repo_path), 'cat-file', '--batch'],
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except FileNotFoundError:
+            raise ValueError("Git non è installato o non è nel PATH.")
+        self.lock = threading.Lock()
+
+    def read_blob(self, object_id):
+        """Legge il contenuto di un blob"""
+        with self.lock:
+            self.process.stdin.write(object_id.encode('ascii') + b'\n')
+            self.process.stdin.flush()
+            # "<id> blob <dimensione>\n" oppure "<id> missing\n"
+            header = self.process.stdout.readline().split()
+            if len(header) != 3:
+                raise OSError(f"Oggetto git non trovato: {object_id}")
+            data = self.process.stdout.read(int(header[2]))
+            self.process.stdout.read(1)
+            return data
+
+    def close(self):
+        """Chiude il processo git"""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+# Un processo cat-file per repository e per processo Python (anche nei worker)
+_cat_files = {}
+_cat_files_lock = threading.Lock()
+
+
+def _get_cat_file(repo_path):
+    """Restituisce il processo cat-file del repository, avviandolo se necessario"""
+    with _cat_files_lock:
+        cat_file = _cat_files.get(repo_path)
+        if cat_file is None:
+            cat_file = _cat_files[repo_path] = GitCatFile(repo_path)
+        return cat_file
+
+
+@atexit.register
+def close_cat_files():
+    """Chiude tutti i processi cat-file aperti"""
+    with _cat_files_lock:
+        for cat_file in _cat_files.values():
+            cat_file.close()
+        _cat_files.clear()
+
+
+def is_archive(path):
+    """Indica se il percorso è un archivio zip o tar supportato"""
+    return Path(path).is_file() and str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def project_name(project_path):
+    """Nome del progetto: il nome della cartella o dell'archivio senza suffisso"""
+    name = Path(project_path).name
+    lower_name = name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if lower_name.endswith(suffix) and Path(project_path).is_file():
+            return name[:-len(suffix)]
+    return name
+
+
+def _strip_common_root(names):
+    """Rimuove dai nomi la cartella radice comune (es. 'progetto-1.0/') se tutti la condividono"""
+    roots = {PurePosixPath(name).parts[0] for name in names if PurePosixPath(name).parts}
+    if len(roots) == 1 and all(len(PurePosixPath(name).parts) > 1 for name in names):
+        root = roots.pop()
+        return lambda name: PurePosixPath(name).relative_to(root).as_posix()
+    return lambda name: PurePosixPath(name).as_posix()
+
+
+class ArchiveSource:
+    """
+    Archivio zip o tar(.gz/.xz/.bz2) letto come sorgente per una sola creazione.
+    Gli zip restano aperti fino a close() e i membri vengono decompressi solo quando
+    letti. I tar compressi si leggono solo in sequenza: in un unico passaggio ('r|*')
+    i membri inclusi vengono copiati a blocchi in un file temporaneo, così la memoria
+    resta costante qualunque sia la dimensione dell'archivio (lo spazio su disco è
+    quello dei membri inclusi). close() chiude lo zip ed elimina il file temporaneo.
+    """
+
+    def __init__(self, archive_path):
+        self.archive_path = Path(archive_path)
+        self._zip_key = None
+        self._spool_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def list_entries(self, is_included=None, max_size=None):
+        """
+        Elenca i file dell'archivio. is_included(percorso relativo) e max_size vengono
+        valutati sull'intestazione del membro: i membri esclusi o troppo grandi non
+        vengono letti né, per gli zip, decompressi.
+        """
+        if zipfile.is_zipfile(self.archive_path):
+            return self._list_zip_entries(is_included)
+        return self._list_tar_entries(is_included, max_size)
+
+    def _list_zip_entries(self, is_included):
+        """Elenca i membri di uno zip dalla directory centrale"""
+        self._zip_key = _acquire_zip_file(self.archive_path)
+        members = [info for info in _get_zip_file(*self._zip_key).infolist()
+                   if not info.is_dir() and not stat.S_ISLNK(info.external_attr >> 16)]
+        relative_name = _strip_common_root([info.filename for info in members])
+        entries = []
+        for info in members:
+            relative_path = Path(relative_name(info.filename))
+            if is_included is not None and not is_included(relative_path):
+                continue
+            entries.append(ZipMemberEntry(self._zip_key, info.filename, relative_path, info.file_size, info.CRC))
+        return entries
+
+    def _list_tar_entries(self, is_included, max_size):
+        """
+        Legge il tar in un solo passaggio sequenziale: i membri esclusi vengono saltati,
+        quelli inclusi copiati nel file temporaneo. La cartella radice è quella del primo
+        membro, come negli archivi creati con 'tar -c cartella'.
+        """
+        entries = []
+        root = None
+        descriptor, spool_path = tempfile.mkstemp(prefix='syncronet_tar_', suffix='.spool')
+        self._spool_path = spool_path
+        try:
+            with os.fdopen(descriptor, 'wb') as spool, tarfile.open(self.archive_path, 'r|*') as tar:
+                for index, member in enumerate(tar):
+                    name = PurePosixPath(member.name)
+                    if index == 0 and member.isdir() and len(name.parts) == 1:
+                        root = name.parts[0]
+                    if not member.isfile():
+                        continue
+                    if root is not None and len(name.parts) > 1 and name.parts[0] == root:
+                        name = name.relative_to(root)
+                    relative_path = Path(name.as_posix())
+                    if is_included is not None and not is_included(relative_path):
+                        continue
+                    if max_size is not None and member.size > max_size:
+                        # Elencato senza contenuto: la classificazione lo segnala come troppo grande
+                        entries.append(_OversizedEntry(relative_path, member.size))
+                        continue
+                    offset = spool.tell()
+                    shutil.copyfileobj(tar.extractfile(member), spool, _SPOOL_CHUNK_SIZE)
+                    entries.append(SpooledEntry(f"{self.archive_path}:{member.name}", relative_path,
+                                                spool_path, offset, member.size, member.mtime))
+        except tarfile.TarError as e:
+            raise ValueError(f"Archivio non leggibile '{self.archive_path}': {e}")
+        return entries
+
+    def close(self):
+        """Chiude lo zip ed elimina il file temporaneo dei membri del tar"""
+        if self._zip_key is not None:
+            _release_zip_file(self._zip_key)
+            self._zip_key = None
+        if self._spool_path is not None:
+            try:
+                os.remove(self._spool_path)
+            except OSError:
+                pass
+            self._spool_path = None
+
+
+# Blocchi usati per copiare i membri dei tar nel file temporaneo
+_SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+class SpooledEntry:
+    """Membro di un tar copiato nel file temporaneo di ArchiveSource: (offset, dimensione)"""
+
+    __slots__ = ('label', 'relative_path', 'spool_path', 'offset', 'size', 'mtime')
+
+    def __init__(self, label, relative_path, spool_path, offset, size, mtime=0):
+        self.label = label
+        self.relative_path = Path(relative_path)
+        self.spool_path = spool_path
+        self.offset = offset
+        self.size = size
+        self.mtime = mtime
+
+    def open(self):
+        """Apre il tratto del file temporaneo che contiene il membro"""
+        return io.BufferedReader(_FileSlice(self.spool_path, self.offset, self.size))
+
+    def cache_key(self, file=None):
+        return f"{self.label}|{self.mtime}|{self.size}"
+
+    def __str__(self):
+        return self.label
+
+
+class _FileSlice(io.RawIOBase):
+    """Lettura limitata a size byte a partire da offset"""
+
+    def __init__(self, path, offset, size):
+        self._file = open(path, 'rb')
+        self._file.seek(offset)
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        count = self._file.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= count
+        return count
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class _OversizedEntry:
+    """Membro troppo grande di un tar, elencato solo per il report dei file saltati"""
+
+    __slots__ = ('relative_path', 'size')
+
+    def __init__(self, relative_path, size):
+        self.relative_path = relative_path
+        self.size = size
+
+    def open(self):
+        raise OSError("Membro non letto: supera la dimensione massima")
+
+    def cache_key(self, file=None):
+        return f"oversized|{self.relative_path}|{self.size}"
+
+
+# ZipFile aperti, per (percorso, mtime_ns, dimensione): un archivio sostituito allo stesso
+# percorso viene riaperto. {chiave: [ZipFile, ArchiveSource che lo usano]}
+_zip_files = {}
+_zip_files_lock = threading.Lock()
+
+
+def _zip_key(archive_path):
+    stat_result = os.stat(archive_path)
+    return str(archive_path), stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _get_zip_file(archive_path, mtime_ns, size):
+    """
+    Restituisce lo ZipFile della versione indicata dell'archivio, aprendolo se necessario
+    (nei processi del pool resta aperto fino all'uscita del processo)
+    """
+    key = (archive_path, mtime_ns, size)
+    with _zip_files_lock:
+        item = _zip_files.get(key)
+        if item is None:
+            item = _zip_files[key] = [zipfile.ZipFile(archive_path), 0]
+        return item[0]
+
+
+def _acquire_zip_file(archive_path):
+    """Apre lo zip per una ArchiveSource e ne restituisce la chiave"""
+    key = _zip_key(archive_path)
+    _get_zip_file(*key)
+    with _zip_files_lock:
+        _zip_files[key][1] += 1
+    return key
+
+
+def _release_zip_file(key):
+    """Chiude lo zip quando nessuna ArchiveSource lo usa più (su Windows libera il file)"""
+    with _zip_files_lock:
+        item = _zip_files.get(key)
+        if item is None:
+            return
+        item[1] -= 1
+        if item[1] <= 0:
+            item[0].close()
+            del _zip_files[key]
+
+
+@atexit.register
+def close_zip_files():
+    """Chiude gli archivi zip aperti"""
+    with _zip_files_lock:
+        for zip_file, _ in _zip_files.values():
+            zip_file.close()
+        _zip_files.clear()
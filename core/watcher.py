@@ -0,0 +1,235 @@
+"""
+Modulo per la modalità watch: tiene aggiornato lo snapshot di una cartella mentre
+viene modificata, con uno snapshot completo seguito da PDF delta dei soli file cambiati
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from core.config import WATCH_DEBOUNCE, WATCH_FULL_SCAN_INTERVAL, WATCH_MAX_DELTAS, WATCH_POLL_INTERVAL
+from core.pdf_converter import PDFConverter
+from core.sources import project_name
+
+
+class ProjectWatcher:
+    """
+    Controlla periodicamente dimensione e mtime dei file inclusi (solo stat, senza
+    leggere i contenuti); quando le modifiche si fermano per debounce secondi scrive
+    un PDF delta con i soli file cambiati. Dopo max_deltas delta ricrea uno snapshot
+    completo ed elimina la catena precedente. Tra un controllo e l'altro il thread
+    attende su un Event: a riposo non usa CPU.
+    Ogni controllo legge l'mtime delle cartelle e rielenca solo quelle cambiate (file
+    aggiunti, eliminati o rinominati); i file vengono ricontrollati solo nelle cartelle
+    cambiate negli ultimi full_scan_interval secondi. Ogni full_scan_interval secondi
+    un controllo completo rielenca tutto e trova le modifiche sul posto altrove.
+    La catena corrente è in output_dir (000_Snapshot.pdf, 001_Delta.pdf, ...) e si
+    ripristina passando i PDF in ordine al ricostruttore.
+    """
+
+    def __init__(self, project_path, output_dir=None, interval=WATCH_POLL_INTERVAL, debounce=WATCH_DEBOUNCE,
+                 max_deltas=WATCH_MAX_DELTAS, on_update=None, on_error=None,
+                 full_scan_interval=WATCH_FULL_SCAN_INTERVAL):
+        self.project_path = Path(project_path)
+        if not self.project_path.is_dir():
+            raise ValueError(f"La cartella '{self.project_path}' non esiste.")
+        self.output_dir = Path(output_dir) if output_dir else Path('saved') / f"{project_name(self.project_path)}_Watch"
+        self.interval = interval
+        self.debounce = debounce
+        self.max_deltas = max_deltas
+        self.full_scan_interval = full_scan_interval
+        # Chiamata dopo ogni aggiornamento con (percorso del PDF, file impaginati, catena corrente)
+        self.on_update = on_update
+        # Chiamata con il messaggio di errore se un aggiornamento fallisce (il watch continua)
+        self.on_error = on_error
+        self.converter = PDFConverter()
+        # PDF della catena corrente, nell'ordine di applicazione
+        self.chain = []
+        # Metadati dell'ultimo PDF scritto: manifest e identificativo della base del prossimo delta
+        self._base = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Stato della visita: {cartella relativa: [mtime_ns, sottocartelle, {nome: (dimensione, mtime)}]}
+        self._directories = {}
+        # Ultima modifica vista per cartella (time.monotonic), per ricontrollarne i file
+        self._changed_at = {}
+        self._ignore_engine = None
+        self._last_full_scan = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _list_directory(self, directory, relative_dir):
+        """Sottocartelle e file inclusi di una cartella, con le regole di iter_project_files"""
+        file_manager = self.converter.file_manager
+        matcher = self._ignore_engine.matcher_for(relative_dir)
+        prefix = f"{relative_dir}/" if relative_dir else ''
+        dirs = []
+        files = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Come os.walk: le cartelle collegate non vengono attraversate
+                        if (not entry.is_symlink() and entry.name not in file_manager.excluded_dirs
+                                and not matcher.is_ignored(prefix + entry.name, True)):
+                            dirs.append(entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if (file_manager.should_exclude(Path(entry.path), Path(prefix + entry.name))
+                            or matcher.is_ignored(prefix + entry.name, False)):
+                        continue
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return sorted(dirs), files
+
+    @staticmethod
+    def _stat_files(directory, files):
+        """Ricontrolla dimensione e mtime dei file già elencati di una cartella"""
+        current = {}
+        for name in files:
+            try:
+                stat_result = os.stat(directory / name)
+            except OSError:
+                # Eliminato: anche l'mtime della cartella cambia
+                continue
+            current[name] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return current
+
+    def _scan(self):
+        """Firma dello stato: {percorso relativo: (dimensione, mtime)} dei file inclusi"""
+        now = time.monotonic()
+        full = self._last_full_scan is None or now - self._last_full_scan >= self.full_scan_interval
+        if full:
+            # Le regole gitignore vengono rilette a ogni controllo completo
+            self._ignore_engine = self.converter.file_manager.create_ignore_engine(self.project_path)
+            self._last_full_scan = now
+
+        directories = {}
+        stack = ['']
+        while stack:
+            relative_dir = stack.pop()
+            directory = self.project_path / relative_dir if relative_dir else self.project_path
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            cached = self._directories.get(relative_dir)
+            if full or cached is None or cached[0] != mtime_ns:
+                try:
+                    dirs, files = self._list_directory(directory, relative_dir)
+                except OSError:
+                    continue
+            else:
+                dirs, files = cached[1], cached[2]
+                if now - self._changed_at.get(relative_dir, -self.full_scan_interval) < self.full_scan_interval:
+                    files = self._stat_files(directory, files)
+            if cached is not None and (cached[1] != dirs or cached[2] != files):
+                self._changed_at[relative_dir] = now
+            directories[relative_dir] = [mtime_ns, dirs, files]
+            prefix = f"{relative_dir}/" if relative_dir else ''
+            stack.extend(prefix + name for name in dirs)
+
+        self._directories = directories
+        self._changed_at = {name: changed for name, changed in self._changed_at.items() if name in directories}
+        signature = {}
+        for relative_dir, (_, _, files) in directories.items():
+            prefix = f"{relative_dir}/" if relative_dir else ''
+            for name, value in files.items():
+                signature[prefix + name] = value
+        return signature
+
+    def _safe_update(self):
+        """Aggiorna la catena; un errore viene segnalato senza fermare il watch"""
+        try:
+            self.update()
+        except Exception as e:
+            message = f"Errore nell'aggiornamento dello snapshot: {e}"
+            print(f"❌ {message}")
+            if self.on_error:
+                self.on_error(message)
+
+    @staticmethod
+    def _remove_pdf(pdf_path):
+        """Elimina un PDF della catena e il suo report"""
+        for path in (pdf_path, pdf_path.with_name(f"{pdf_path.stem}_REPORT.txt")):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _write_full_snapshot(self):
+        """Scrive un nuovo snapshot completo ed elimina i delta precedenti"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        pdf_path = self.output_dir / "000_Snapshot.pdf"
+        files_processed, _ = self.converter.create_project_pdf(self.project_path, pdf_path,
+                                                               open_after_creation=False)
+        # Anche i delta lasciati da un'esecuzione precedente non appartengono più alla catena
+        for delta_path in sorted(self.output_dir.glob('*_Delta.pdf')):
+            self._remove_pdf(delta_path)
+        self.chain = [pdf_path]
+        self._base = self.converter.pdf.snapshot_metadata
+        print(f"📸 Snapshot completo aggiornato: {pdf_path} ({files_processed} file)")
+        return pdf_path, files_processed
+
+    def _write_delta(self):
+        """Scrive un delta rispetto all'ultimo PDF; None se non è cambiato nulla"""
+        pdf_path = self.output_dir / f"{len(self.chain):03d}_Delta.pdf"
+        files_processed, written = self.converter.create_delta_pdf(self._base, self.project_path, pdf_path,
+                                                                   skip_unchanged=True)
+        if written is None:
+            return None
+        self.chain.append(pdf_path)
+        self._base = self.converter.pdf.snapshot_metadata
+        print(f"🔀 Delta {len(self.chain) - 1} scritto: {pdf_path} ({files_processed} file)")
+        return pdf_path, files_processed
+
+    def update(self):
+        """Aggiorna la catena: delta dei file cambiati, o snapshot completo ogni max_deltas delta"""
+        if not self.chain or len(self.chain) > self.max_deltas:
+            result = self._write_full_snapshot()
+        else:
+            result = self._write_delta()
+        if result is not None and self.on_update:
+            self.on_update(result[0], result[1], list(self.chain))
+        return result
+
+    def run(self):
+        """Ciclo di controllo bloccante (headless); termina con stop()"""
+        print(f"👁️ Watch di {self.project_path} (controllo ogni {self.interval}s, attesa {self.debounce}s)")
+        # Se lo snapshot iniziale fallisce viene ritentato alla prossima modifica
+        self._safe_update()
+        signature = self._scan()
+        while not self._stop_event.wait(self.interval):
+            current = self._scan()
+            if current == signature:
+                continue
+            # Debounce: aggiorna solo quando i file smettono di cambiare
+            while not self._stop_event.wait(self.debounce):
+                settled = self._scan()
+                if settled == current:
+                    break
+                current = settled
+            else:
+                break
+            self._safe_update()
+            signature = current
+        print("⏹️ Watch terminato")
+
+    def start(self):
+        """Avvia il ciclo di controllo in un thread in background"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ferma il ciclo; un aggiornamento in corso viene completato"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
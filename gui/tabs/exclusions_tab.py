@@ -6,7 +6,9 @@ import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
 from pathlib import Path
 from datetime import datetime
-from core.config import DEFAULT_EXCLUSIONS
+from core.config import DEFAULT_EXCLUSIONS, GLOBAL_IGNORE_FILE
+from core.file_manager import FileManager
+from core.ignore_rules import IgnoreRuleEngine, load_rules_file, parse_rules, save_rules_file
 
 class ExclusionsTab:
     """Scheda per la gestione delle esclusioni"""
@@ -24,6 +26,7 @@ class ExclusionsTab:
         self._create_dirs_section()
         self._create_files_section()
         self._create_extensions_section()
+        self._create_rules_section()
         self._create_buttons()
     
     def _create_description_section(self):
@@ -38,6 +41,8 @@ I file e cartelle esclusi non verranno inclusi nel PDF generato.
 🔤 Estensioni: Tipi di file da escludere per estensione (es: .jpg, .exe)
 
 Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
+📜 Regole: sintassi .gitignore (/build, **/generated/**, !keep.log), applicate insieme
+ai file .gitignore e .syncroignore trovati nel progetto
         """
         
         desc_label = tk.Label(
@@ -143,6 +148,109 @@ Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
         # Inserisci i valori predefiniti
         self.extensions_text.insert('1.0', ", ".join(sorted(self.current_exclusions['extensions'])))
     
+    def _create_rules_section(self):
+        """Crea la sezione regole con sintassi .gitignore e il tester dei percorsi"""
+        rules_section = ttk.LabelFrame(self.frame, text="📜 Regole (sintassi .gitignore)", style='Section.TLabelframe')
+        rules_section.pack(fill='x', pady=(0, 15), padx=15)
+        
+        # Etichetta
+        rules_label = tk.Label(
+            rules_section,
+            text=f"Una regola per riga, salvate in {GLOBAL_IGNORE_FILE}:",
+            font=('Segoe UI', 10, 'bold'),
+            bg='#1e1e1e',
+            fg='#ffffff'
+        )
+        rules_label.pack(anchor='w', padx=12, pady=(8, 5))
+        
+        # Area di testo per le regole
+        self.rules_text = scrolledtext.ScrolledText(
+            rules_section,
+            height=6,
+            width=90,
+            font=('Consolas', 9),
+            bg='#1e1e1e',
+            fg='#d4d4d4',
+            relief='flat',
+            borderwidth=1
+        )
+        self.rules_text.pack(fill='x', padx=12, pady=(0, 8))
+        self.rules_text.insert('1.0', "\n".join(load_rules_file(GLOBAL_IGNORE_FILE)))
+        
+        # Tester: verifica un percorso relativo con le esclusioni e le regole correnti
+        test_frame = tk.Frame(rules_section, bg='#1e1e1e')
+        test_frame.pack(fill='x', padx=12, pady=(0, 8))
+        
+        test_label = tk.Label(
+            test_frame,
+            text="Percorso da verificare:",
+            font=('Segoe UI', 9),
+            bg='#1e1e1e',
+            fg='#d4d4d4'
+        )
+        test_label.pack(side='left')
+        
+        self.test_path_var = tk.StringVar()
+        test_entry = tk.Entry(
+            test_frame,
+            textvariable=self.test_path_var,
+            font=('Consolas', 9),
+            bg='#3c3c3c',
+            fg='#ffffff',
+            insertbackground='#ffffff',
+            relief='flat',
+            width=50
+        )
+        test_entry.pack(side='left', padx=8)
+        test_entry.bind('<Return>', lambda event: self._test_path())
+        
+        test_btn = tk.Button(
+            test_frame,
+            text="🧪 Verifica",
+            command=self._test_path,
+            bg='#569cd6',
+            fg='#000000',
+            relief='flat',
+            width=12
+        )
+        test_btn.pack(side='left')
+        
+        self.test_result_label = tk.Label(
+            rules_section,
+            text="Termina con / per verificare una cartella (es: build/)",
+            font=('Segoe UI', 9),
+            bg='#1e1e1e',
+            fg='#9cdcfe'
+        )
+        self.test_result_label.pack(anchor='w', padx=12, pady=(0, 8))
+    
+    def _test_path(self):
+        """Verifica se un percorso relativo verrebbe escluso e da quale regola"""
+        path = self.test_path_var.get().strip().replace('\\', '/')
+        if not path:
+            return
+        is_dir = path.endswith('/')
+        path = path.strip('/')
+        
+        # Esclusioni di base: cartelle, file ed estensioni
+        file_manager = FileManager()
+        file_manager.update_exclusions(**self.get_current_exclusions())
+        relative_path = Path(path)
+        if file_manager.should_exclude(relative_path, relative_path) or (
+                is_dir and relative_path.name in file_manager.excluded_dirs):
+            self.test_result_label.config(text=f"⛔ {path}: escluso da cartelle/file/estensioni", fg='#f48771')
+            return
+        
+        # Regole gitignore del riquadro (anche non ancora salvate)
+        rules = parse_rules(self.rules_text.get(1.0, tk.END).splitlines(), source='regole')
+        ignored, rule = IgnoreRuleEngine(global_rules=rules).match(path, is_dir)
+        if ignored:
+            self.test_result_label.config(text=f"⛔ {path}: escluso dalla regola {rule}", fg='#f48771')
+        elif rule is not None:
+            self.test_result_label.config(text=f"✅ {path}: incluso dalla regola {rule}", fg='#4ec9b0')
+        else:
+            self.test_result_label.config(text=f"✅ {path}: incluso", fg='#4ec9b0')
+    
     def _create_buttons(self):
         """Crea i pulsanti di gestione"""
         button_frame = tk.Frame(self.frame, bg='#1e1e1e')
@@ -217,6 +325,9 @@ Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
                 'extensions': set(extensions)
             }
             
+            # Le regole gitignore vengono salvate nel file globale letto dal FileManager
+            save_rules_file(GLOBAL_IGNORE_FILE, self.rules_text.get(1.0, tk.END))
+            
             messagebox.showinfo("Successo", "Esclusioni salvate con successo!")
             self._show_status("Configurazione esclusioni salvata")
             
@@ -237,6 +348,8 @@ Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
         self.extensions_text.delete(1.0, tk.END)
         self.extensions_text.insert('1.0', ", ".join(sorted(self.current_exclusions['extensions'])))
         
+        self.rules_text.delete(1.0, tk.END)
+        
         self._show_status("Esclusioni ripristinate ai valori predefiniti")
     
     def _export_exclusions(self):
@@ -262,6 +375,9 @@ Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
 
 [EXTENSIONS]
 {self.extensions_text.get(1.0, tk.END).strip()}
+
+[RULES]
+{self.rules_text.get(1.0, tk.END).strip()}
 """
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write(config)
@@ -283,6 +399,12 @@ Separare i valori con virgole. Usa * per i pattern (es: *.tmp)
                 with open(path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
+                # Le regole possono contenere '[': la sezione RULES è l'ultima e va letta per intero
+                content, rules_marker, rules_content = content.partition('[RULES]')
+                if rules_marker:
+                    self.rules_text.delete(1.0, tk.END)
+                    self.rules_text.insert('1.0', rules_content.strip())
+                
                 # Parsing del file di configurazione
                 sections = content.split('[')
                 for section in sections:
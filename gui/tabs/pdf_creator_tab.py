@@ -7,7 +7,10 @@ import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext
 from pathlib import Path
 import threading
+from core.file_manager import FileManager
 from core.pdf_converter import PDFConverter
+from core.planner import exclusion_pattern
+from core.watcher import ProjectWatcher
 
 class PDFCreatorTab:
     """Scheda per la creazione di PDF da progetti"""
@@ -17,6 +20,10 @@ class PDFCreatorTab:
         self.title = "📝 Crea PDF da Progetto"
         self.pdf_converter = PDFConverter()
         self.include_excluded_files = tk.BooleanVar(value=False)  # Nuovo flag
+        # Modalità watch attiva sul progetto selezionato (None se ferma)
+        self.watcher = None
+        # Pattern gitignore dei file e cartelle esclusi dalla finestra di stima
+        self.plan_patterns = []
         self._create_tab()
     
     def _create_tab(self):
@@ -208,7 +215,7 @@ class PDFCreatorTab:
         )
         export_log_btn.pack(side='left', padx=5)
         
-        stats_btn = tk.Button(
+        self.stats_btn = tk.Button(
             left_button_frame,
             text="📈 Statistiche Progetto",
             command=self._show_project_stats,
@@ -216,7 +223,7 @@ class PDFCreatorTab:
             fg='#000000',
             relief='flat'
         )
-        stats_btn.pack(side='left', padx=5)
+        self.stats_btn.pack(side='left', padx=5)
         
         # Pulsanti destra
         right_button_frame = tk.Frame(button_frame, bg='#1e1e1e')
@@ -235,6 +242,16 @@ class PDFCreatorTab:
             cursor='hand2'
         )
         self.create_pdf_btn.pack(side='right', padx=5)
+        
+        self.watch_btn = tk.Button(
+            right_button_frame,
+            text="👁️ Avvia Watch",
+            command=self._toggle_watch,
+            bg='#569cd6',
+            fg='#000000',
+            relief='flat'
+        )
+        self.watch_btn.pack(side='right', padx=5)
     
     def _browse_project(self):
         """Apri dialogo per selezione cartella progetto"""
@@ -273,32 +290,78 @@ class PDFCreatorTab:
                 f.write(content)
             self._log_message(f"Log esportato: {Path(path).name}")
     
-    def _show_project_stats(self):
-        """Mostra statistiche del progetto"""
+    def _show_project_stats(self, refresh=False):
+        """Calcola le statistiche del progetto in un thread: la finestra si apre al termine"""
         if not self.project_path.get():
             tk.messagebox.showwarning("Attenzione", "Seleziona prima un progetto valido")
             return
         
+        self.stats_btn.config(state='disabled', bg='#666666')
+        self._log_message("📈 Calcolo statistiche...")
+        # FileManager separato (la creazione può usare quello del convertitore in parallelo)
+        # con le stesse esclusioni della creazione
+        file_manager = FileManager()
+        file_manager.update_exclusions(**self.pdf_converter.file_manager.get_exclusions())
+        thread = threading.Thread(target=self._project_stats_thread,
+                                  args=(file_manager, self.project_path.get(), refresh))
+        thread.daemon = True
+        thread.start()
+    
+    def _project_stats_thread(self, file_manager, project_path, refresh):
+        """Thread per il calcolo delle statistiche"""
         try:
-            from core.file_manager import FileManager
-            fm = FileManager()
-            stats = fm.get_project_stats(self.project_path.get())
-            
-            stats_text = f"""
-Statistiche Progetto: {Path(self.project_path.get()).name}
-
-File totali: {stats['total_files']}
-Dimensione totale: {stats['total_size_mb']:.2f} MB
+            stats = file_manager.get_project_stats(project_path, refresh)
+        except Exception as e:
+            self.frame.after(0, self._on_project_stats_error, e)
+            return
+        self.frame.after(0, self._display_project_stats, stats)
+    
+    def _on_project_stats_error(self, error):
+        self.stats_btn.config(state='normal', bg='#9cdcfe')
+        tk.messagebox.showerror("Errore", f"Errore nel calcolo statistiche: {str(error)}")
+    
+    def _display_project_stats(self, stats):
+        """Mostra le statistiche calcolate (thread di Tk)"""
+        self.stats_btn.config(state='normal', bg='#9cdcfe')
+        self._log_message(f"📈 Statistiche in {stats['seconds']:.2f}s "
+                          f"({stats['cached_directories']}/{stats['directories']} cartelle dalla cache)")
+        
+        megabyte = 1024 * 1024
+        stats_text = f"""Statistiche Progetto: {Path(stats['project']).name}
 
-Estensioni principali:
+File inclusi: {stats['files']} ({stats['bytes'] / megabyte:.2f} MB, {stats['lines']} righe)
+File esclusi: {stats['excluded']['files']} ({stats['excluded']['bytes'] / megabyte:.2f} MB)
 """
-            for ext, count in sorted(stats['extensions'].items(), key=lambda x: x[1], reverse=True)[:10]:
-                stats_text += f" {ext or 'Nessuna'}: {count} file\n"
-            
-            tk.messagebox.showinfo("📈 Statistiche Progetto", stats_text)
-            
-        except Exception as e:
-            tk.messagebox.showerror("Errore", f"Errore nel calcolo statistiche: {str(e)}")
+        for reason, totals in stats['skipped'].items():
+            stats_text += f"File saltati ({reason}): {totals['files']} ({totals['bytes'] / megabyte:.2f} MB)\n"
+        
+        stats_text += "\nEstensioni principali:\n"
+        extensions = sorted(stats['extensions'].items(), key=lambda item: item[1]['bytes'], reverse=True)
+        for ext, totals in extensions[:10]:
+            stats_text += (f" {ext or 'Nessuna'}: {totals['files']} file, "
+                           f"{totals['bytes'] / 1024:.0f} KB, {totals['lines']} righe\n")
+        
+        stats_text += "\nFile più grandi:\n"
+        for item in stats['largest']:
+            stats_text += f" {item['path']}: {item['size'] / 1024:.0f} KB, {item['lines']} righe\n"
+        
+        dialog = tk.Toplevel(self.frame, bg='#1e1e1e')
+        dialog.title("📈 Statistiche Progetto")
+        dialog.transient(self.frame.winfo_toplevel())
+        tk.Label(dialog, text=stats_text, justify='left', font=('Segoe UI', 10),
+                 bg='#1e1e1e', fg='#ffffff').pack(anchor='w', padx=15, pady=(15, 10))
+        
+        def refresh():
+            dialog.destroy()
+            self._show_project_stats(refresh=True)
+        
+        button_frame = tk.Frame(dialog, bg='#1e1e1e')
+        button_frame.pack(fill='x', padx=15, pady=15)
+        tk.Button(button_frame, text="Chiudi", command=dialog.destroy, bg='#569cd6', fg='#000000',
+                  relief='flat').pack(side='right', padx=5)
+        # Le modifiche sul posto non cambiano l'mtime delle cartelle: ricontrolla ogni file
+        tk.Button(button_frame, text="🔄 Ricalcola", command=refresh, bg='#9cdcfe', fg='#000000',
+                  relief='flat').pack(side='right', padx=5)
     
     def _start_create_pdf(self):
         """Avvia la creazione del PDF"""
@@ -311,13 +374,91 @@ Estensioni principali:
             return
         
         self.create_pdf_btn.config(state='disabled', bg='#666666')
-        self._log_message("🔄 Avvio creazione PDF...")
-        
-        # Avvia in un thread separato
-        thread = threading.Thread(target=self._create_pdf_thread)
+        self._start_plan([])
+    
+    def _start_plan(self, patterns):
+        """Calcola la stima in un thread: la finestra di conferma si apre al termine"""
+        self._log_message("📐 Stima di pagine, dimensione e durata...")
+        thread = threading.Thread(target=self._plan_thread, args=(patterns,))
         thread.daemon = True
         thread.start()
     
+    def _plan_thread(self, patterns):
+        """Thread per la stima della creazione"""
+        try:
+            plan = self.pdf_converter.plan_project_pdf(self.project_path.get(), {'patterns': patterns})
+        except Exception as e:
+            self.frame.after(0, self._on_plan_error, e)
+            return
+        self.frame.after(0, self._confirm_plan, plan, patterns)
+    
+    def _on_plan_error(self, error):
+        self._log_message(f"❌ Errore nella stima: {error}")
+        tk.messagebox.showerror("Errore", f"Errore nella stima:\n{error}")
+        self.create_pdf_btn.config(state='normal', bg='#388a34')
+    
+    def _confirm_plan(self, plan, patterns):
+        """
+        Mostra la stima prima della creazione, con i file e le cartelle che pesano di
+        più: quelli selezionati vengono esclusi (Ricalcola aggiorna la stima)
+        """
+        self._log_message(f"📐 Stima: {plan.pages} pagine, {plan.pdf_bytes / (1024 * 1024):.1f} MB, "
+                          f"{plan.seconds:.0f}s")
+        dialog = tk.Toplevel(self.frame, bg='#1e1e1e')
+        dialog.title("📐 Stima della creazione")
+        dialog.transient(self.frame.winfo_toplevel())
+        
+        summary = plan.summary(count=0)
+        if patterns:
+            summary += f"\nEsclusi da questa finestra: {len(patterns)}"
+        tk.Label(dialog, text=summary, justify='left', font=('Segoe UI', 10),
+                 bg='#1e1e1e', fg='#ffffff').pack(anchor='w', padx=15, pady=(15, 10))
+        
+        tk.Label(dialog, text="Seleziona i contributi da escludere:", font=('Segoe UI', 10, 'bold'),
+                 bg='#1e1e1e', fg='#9cdcfe').pack(anchor='w', padx=15)
+        choices = []
+        contributors = [(f"📁 {name}/ - {pages:.1f} pag., {files} file", exclusion_pattern(name, True))
+                        for name, (pages, files, _) in plan.top_directories(5)]
+        contributors += [(f"📄 {item['path']} - {item['pages']:.1f} pag.", exclusion_pattern(item['path']))
+                         for item in plan.top_files(10)]
+        for text, pattern in contributors:
+            selected = tk.BooleanVar(value=False)
+            tk.Checkbutton(dialog, text=text, variable=selected, font=('Segoe UI', 9),
+                           bg='#1e1e1e', fg='#d4d4d4', selectcolor='#3c3c3c',
+                           activebackground='#1e1e1e', activeforeground='#d4d4d4').pack(anchor='w', padx=25)
+            choices.append((selected, pattern))
+        
+        def selected_patterns():
+            return patterns + [pattern for selected, pattern in choices if selected.get()]
+        
+        def recalculate():
+            dialog.destroy()
+            self._start_plan(selected_patterns())
+        
+        def confirm():
+            self.plan_patterns = selected_patterns()
+            dialog.destroy()
+            self._log_message("🔄 Avvio creazione PDF...")
+            thread = threading.Thread(target=self._create_pdf_thread)
+            thread.daemon = True
+            thread.start()
+        
+        def cancel():
+            dialog.destroy()
+            self._log_message("⏹️ Creazione annullata")
+            self.create_pdf_btn.config(state='normal', bg='#388a34')
+        
+        button_frame = tk.Frame(dialog, bg='#1e1e1e')
+        button_frame.pack(fill='x', padx=15, pady=15)
+        tk.Button(button_frame, text="✅ Genera PDF", command=confirm, bg='#388a34', fg='#000000',
+                  font=('Segoe UI', 10, 'bold'), relief='flat').pack(side='right', padx=5)
+        tk.Button(button_frame, text="🔄 Ricalcola", command=recalculate, bg='#569cd6', fg='#000000',
+                  relief='flat').pack(side='right', padx=5)
+        tk.Button(button_frame, text="Annulla", command=cancel, bg='#ce9178', fg='#000000',
+                  relief='flat').pack(side='right', padx=5)
+        dialog.protocol('WM_DELETE_WINDOW', cancel)
+        dialog.grab_set()
+    
     def _create_pdf_thread(self):
         """Thread per la creazione del PDF"""
         try:
@@ -327,8 +468,8 @@ Estensioni principali:
             self._log_message(f"⚙️ Includi file esclusi: {self.include_excluded_files.get()}")
 
             
-            # Prepara le esclusioni
-            custom_exclusions = {}
+            # Prepara le esclusioni: file e cartelle esclusi dalla finestra di stima
+            custom_exclusions = {'patterns': list(self.plan_patterns)}
             
             # Reset barra di progresso
             self._update_progress(0, 100)
@@ -361,6 +502,40 @@ Estensioni principali:
         finally:
             self.create_pdf_btn.config(state='normal', bg='#388a34')
     
+    def _toggle_watch(self):
+        """Avvia o ferma la modalità watch sul progetto selezionato"""
+        if self.watcher is not None and self.watcher.is_running:
+            # Non attende il thread: un aggiornamento in corso termina in background
+            self.watcher.stop(timeout=0)
+            self.watcher = None
+            self.watch_btn.config(text="👁️ Avvia Watch", bg='#569cd6')
+            self._log_message("⏹️ Watch fermato")
+            return
+        
+        if not self.project_path.get():
+            tk.messagebox.showerror("Errore", "Seleziona una cartella progetto")
+            return
+        
+        try:
+            self.watcher = ProjectWatcher(self.project_path.get(), on_update=self._on_watch_update,
+                                          on_error=self._on_watch_error)
+        except ValueError as e:
+            tk.messagebox.showerror("Errore", str(e))
+            return
+        self.watcher.start()
+        self.watch_btn.config(text="⏹️ Ferma Watch", bg='#ce9178')
+        self._log_message(f"👁️ Watch avviato: catena di PDF in {self.watcher.output_dir}")
+    
+    def _on_watch_update(self, pdf_path, files_processed, chain):
+        """Chiamata dal thread del watch dopo ogni aggiornamento"""
+        self.frame.after(0, self._log_message,
+                         f"🔄 Snapshot aggiornato: {Path(pdf_path).name} "
+                         f"({files_processed} file, catena di {len(chain)} PDF)")
+    
+    def _on_watch_error(self, message):
+        """Chiamata dal thread del watch quando un aggiornamento fallisce (il watch resta attivo)"""
+        self.frame.after(0, self._log_message, f"❌ Watch: {message}")
+    
     def _update_progress(self, current, total):
         """Aggiorna la barra di progresso"""
         if total > 0:
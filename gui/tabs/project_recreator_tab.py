@@ -9,6 +9,14 @@ import threading
 import os
 from core.project_recreator import ProjectRecreator
 
+# Formati di output selezionabili: cartella (default) o archivio scritto direttamente
+OUTPUT_FORMAT_LABELS = (
+    ('directory', "📁 Cartella"),
+    ('zip', "🗜️ ZIP"),
+    ('tar.gz', "📦 TAR.GZ"),
+    ('tar.xz', "📦 TAR.XZ"),
+)
+
 class ProjectRecreatorTab:
     """Scheda per la ricostruzione di progetti da PDF"""
     
@@ -114,6 +122,35 @@ class ProjectRecreatorTab:
             width=15
         )
         browse_output_btn.grid(row=0, column=2, padx=8, pady=8)
+        
+        # Formato di output: cartella o archivio
+        format_label = tk.Label(
+            output_section,
+            text="Formato:",
+            font=('Segoe UI', 10, 'bold'),
+            bg='#1e1e1e',
+            fg='#ffffff'
+        )
+        format_label.grid(row=1, column=0, sticky='w', pady=(0, 12), padx=12)
+        
+        format_frame = tk.Frame(output_section, bg='#1e1e1e')
+        format_frame.grid(row=1, column=1, columnspan=2, sticky='w', padx=8, pady=(0, 12))
+        
+        self.output_format = tk.StringVar(value='directory')
+        for value, label in OUTPUT_FORMAT_LABELS:
+            format_rb = tk.Radiobutton(
+                format_frame,
+                text=label,
+                value=value,
+                variable=self.output_format,
+                font=('Segoe UI', 9),
+                bg='#1e1e1e',
+                fg='#d4d4d4',
+                selectcolor='#3c3c3c',
+                activebackground='#1e1e1e',
+                activeforeground='#d4d4d4'
+            )
+            format_rb.pack(side='left', padx=(0, 10))
     
     def _create_options_section(self):
         """Crea la sezione opzioni"""
@@ -167,6 +204,21 @@ class ProjectRecreatorTab:
             activeforeground='#d4d4d4'
         )
         overwrite_cb.pack(side='left', padx=10)
+        
+        # Checkbutton per riprendere una ricostruzione interrotta
+        self.resume_reconstruction = tk.BooleanVar(value=False)
+        resume_cb = tk.Checkbutton(
+            options_frame,
+            text="Riprendi ricostruzione interrotta",
+            variable=self.resume_reconstruction,
+            font=('Segoe UI', 9),
+            bg='#1e1e1e',
+            fg='#d4d4d4',
+            selectcolor='#3c3c3c',
+            activebackground='#1e1e1e',
+            activeforeground='#d4d4d4'
+        )
+        resume_cb.pack(side='left', padx=10)
     
     def _create_log_section(self):
         """Crea la sezione log"""
@@ -244,6 +296,19 @@ class ProjectRecreatorTab:
             cursor='hand2'
         )
         self.recreate_btn.pack(side='right', padx=5)
+        
+        self.verify_btn = tk.Button(
+            right_button_frame,
+            text="🔐 Verifica Cartella",
+            command=self._start_verify_project,
+            bg='#9cdcfe',
+            fg='#000000',
+            font=('Segoe UI', 10, 'bold'),
+            height=2,
+            relief='flat',
+            cursor='hand2'
+        )
+        self.verify_btn.pack(side='right', padx=5)
     
     # Modifica _browse_pdf per partire dalla cartella Saved
     def _browse_pdf(self):
@@ -322,16 +387,20 @@ class ProjectRecreatorTab:
         try:
             self._log_message("🔄 Inizio ricostruzione progetto...")
             self._log_message(f"📄 PDF sorgente: {self.pdf_to_read.get()}")
-            self._log_message(f"📁 Output: {self.reconstruction_output.get()}")
+            self._log_message(f"📁 Output: {self.reconstruction_output.get()} ({self.output_format.get()})")
             
             # Ricrea il progetto
             success = self.project_recreator.recreate_project_structure(
                 self.pdf_to_read.get(),
-                self.reconstruction_output.get()
+                self.reconstruction_output.get(),
+                output_format=self.output_format.get(),
+                resume=self.resume_reconstruction.get()
             )
             
             if success:
                 self._log_message("✅ Progetto ricostruito con successo!")
+                if self.output_format.get() != 'directory':
+                    self._log_message(f"🗜️ Archivio creato: {success}")
                 
                 # Apri la cartella se richiesto
                 if self.auto_open_folder.get():
@@ -349,6 +418,48 @@ class ProjectRecreatorTab:
         finally:
             self.recreate_btn.config(state='normal', bg='#388a34')
     
+    def _start_verify_project(self):
+        """Verifica una cartella esistente con il manifest del PDF, senza scrivere nulla"""
+        if not self.pdf_to_read.get() or not os.path.exists(self.pdf_to_read.get()):
+            messagebox.showerror("Errore", "Seleziona un file PDF esistente")
+            return
+        
+        directory = filedialog.askdirectory(
+            title="🔐 Seleziona la cartella del progetto da verificare",
+            initialdir=self.reconstruction_output.get() or None
+        )
+        if not directory:
+            return
+        
+        self.verify_btn.config(state='disabled')
+        thread = threading.Thread(target=self._verify_project_thread, args=(directory,))
+        thread.daemon = True
+        thread.start()
+    
+    def _verify_project_thread(self, directory):
+        """Thread per la verifica di integrità"""
+        try:
+            self._log_message(f"🔐 Verifica di {directory}...")
+            verification = self.project_recreator.verify_project(self.pdf_to_read.get(), directory)
+            if verification is None:
+                self._log_message("⚠️ Il PDF non contiene un manifest di integrità")
+                messagebox.showwarning("Attenzione", "Il PDF non contiene un manifest di integrità")
+                return
+            for line in verification.summary().splitlines():
+                self._log_message(line)
+            if verification.ok:
+                messagebox.showinfo("Verifica", "✅ Tutti i file corrispondono allo snapshot")
+            else:
+                messagebox.showwarning(
+                    "Verifica",
+                    f"❌ {len(verification.mismatched)} file diversi, {len(verification.missing)} mancanti"
+                )
+        except Exception as e:
+            self._log_message(f"❌ Errore durante la verifica: {str(e)}")
+            messagebox.showerror("Errore", f"Errore durante la verifica:\n{str(e)}")
+        finally:
+            self.verify_btn.config(state='normal')
+    
     def _log_message(self, message):
         """Aggiunge un messaggio al log"""
         from datetime import datetime
@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import webbrowser
 from core.config import APP_CONFIG
+from core.snapshot_cache import SnapshotCache
 
 class SettingsTab:
     """Scheda per le impostazioni e informazioni"""
@@ -122,6 +123,19 @@ class SettingsTab:
             width=18
         )
         update_btn.pack(side='left', padx=8)
+        
+        # Pulsante svuota cache snapshot
+        purge_cache_btn = tk.Button(
+            utils_frame,
+            text="🗑️ Svuota Cache",
+            command=self._purge_snapshot_cache,
+            bg='#ce9178',
+            fg='#000000',
+            font=('Segoe UI', 9),
+            relief='flat',
+            width=18
+        )
+        purge_cache_btn.pack(side='left', padx=8)
     
     def _create_about_section(self):
         """Crea la sezione about"""
@@ -188,6 +202,22 @@ class SettingsTab:
             "Per controllare aggiornamenti futuri, visita il repository GitHub."
         )
     
+    def _purge_snapshot_cache(self):
+        """Svuota la cache degli snapshot già analizzati"""
+        cache = SnapshotCache()
+        count, size = cache.stats()
+        if not count:
+            messagebox.showinfo("Cache", "La cache degli snapshot è vuota.")
+            return
+        if not messagebox.askyesno(
+            "Svuota Cache",
+            f"Eliminare {count} snapshot in cache ({size / 1024 / 1024:.1f} MB)?\n\n"
+            "I prossimi ripristini rianalizzeranno i PDF."
+        ):
+            return
+        removed, freed = cache.purge()
+        self._show_status(f"Cache svuotata: {removed} snapshot, {freed / 1024 / 1024:.1f} MB liberati")
+    
     def _open_repository(self):
         """Apre il repository GitHub"""
         webbrowser.open(APP_CONFIG['repository'])